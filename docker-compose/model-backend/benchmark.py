@@ -0,0 +1,58 @@
+"""Benchmark the compiled inference engines against sklearn on the default models.
+
+Usage: python benchmark.py [--rows 1000] [--repeat 20]
+"""
+import argparse
+import time
+
+import numpy as np
+
+import main
+
+
+def best_time(fn, X, repeat: int) -> float:
+    """Best wall time of fn(X) over repeat runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def benchmark_trees(X: np.ndarray, repeat: int):
+    """Compare TreeEnsemble.predict with sklearn's predict_proba for each default tree model"""
+    print(f"{'model':<28}{'rows':>6}{'sklearn ms':>12}{'compiled ms':>13}{'speedup':>9}")
+    for model_id, model in main.models.items():
+        if not main.TreeEnsemble.supports(model):
+            continue
+
+        ensemble = main.TreeEnsemble(model)
+        _, probabilities = ensemble.predict(X)
+        np.testing.assert_array_equal(probabilities, model.predict_proba(X))
+
+        for rows in (X[:1], X):
+            reference = best_time(model.predict_proba, rows, repeat)
+            compiled = best_time(ensemble.predict, rows, repeat)
+            print(f"{model_id:<28}{len(rows):>6}{reference:>12.3f}{compiled:>13.3f}{reference / compiled:>8.1f}x")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000, help="passengers per batch")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement")
+    args = parser.parse_args()
+
+    main.load_dataset()
+    if not main.load_default_models_from_cache():
+        main.train_default_models()
+
+    # Sample passenger rows from the training data
+    features = main.train_df[main.CORE_FEATURES].values
+    X = features[np.random.default_rng(42).integers(0, len(features), args.rows)]
+
+    benchmark_trees(X, args.repeat)
+
+
+if __name__ == "__main__":
+    main_cli()
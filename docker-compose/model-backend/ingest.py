@@ -0,0 +1,25 @@
+"""Append passenger CSV files to the ingested training data, streaming them in chunks.
+
+Usage: python ingest.py passengers.csv [more.csv ...] [--chunk-rows 10000]
+"""
+import argparse
+import json
+
+import main
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="CSV files with the Titanic train.csv columns")
+    parser.add_argument("--chunk-rows", type=int, default=main.INGEST_CHUNK_ROWS, help="rows parsed per chunk")
+    args = parser.parse_args()
+
+    for path in args.files:
+        upload = main.ingest_store.ingest(path, path, chunk_rows=args.chunk_rows)
+        print(f"{path}: {upload['rows']} rows in {upload['chunks']} chunks ({upload['total_rows']} rows in total)")
+
+    print(json.dumps(main.ingest_store.summary(), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main_cli()
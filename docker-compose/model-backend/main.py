@@ -1,23 +1,43 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 import pandas as pd
 import numpy as np
 import pickle
 import os
+import math
+import multiprocessing
+import asyncio
+import threading
+import uuid
+import hashlib
+import shutil
+import json
+import platform
+import copy
+import sqlite3
+import fcntl
+import time
+from contextlib import contextmanager
+from collections import OrderedDict
 from datetime import datetime
 import logging
+import sklearn
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.neighbors import KNeighborsClassifier
+from sklearn.neighbors import BallTree, KDTree, KNeighborsClassifier
 from sklearn.svm import SVC
 from sklearn.linear_model import LogisticRegression, Perceptron, SGDClassifier
 from sklearn.naive_bayes import GaussianNB
-from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score
+from sklearn.model_selection import train_test_split, StratifiedKFold, cross_val_score, ParameterGrid
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.metrics import accuracy_score
+from scipy.special import expit
 import joblib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -57,10 +77,37 @@ class PredictionResponse(BaseModel):
     predictions: Dict[str, Dict[str, Any]]  # model_name -> {prediction, probability}
 
 
+class BatchPredictionRequest(BaseModel):
+    passengers: List[PassengerData]
+    model_names: List[str]
+
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[Dict[str, Dict[str, Any]]]  # one model_name -> {prediction, probability} per passenger
+
+
 class TrainModelRequest(BaseModel):
     model_name: str
     algorithm: str  # "random_forest", "decision_tree", "knn", "svm", "logistic_regression", etc.
     features: List[str]
+    out_of_core: bool = False  # train on the ingested data, streaming it chunk by chunk
+
+
+class LabeledPassenger(PassengerData):
+    survived: int
+
+
+class IncrementalUpdateRequest(BaseModel):
+    passengers: List[LabeledPassenger]
+
+
+class TuneRequest(BaseModel):
+    model_name: str
+    algorithm: str
+    features: List[str]
+    search_space: Dict[str, List[Any]]  # parameter -> values to try; candidates are their combinations
+    max_candidates: Optional[int] = None
+    halving_factor: int = 3
 
 
 class ModelInfo(BaseModel):
@@ -73,25 +120,15 @@ class ModelInfo(BaseModel):
     is_default: bool
 
 
-class PassengerFeatures(BaseModel):
-    Pclass: Optional[int]
-    Sex: Optional[str]
-    Age: Optional[float]
-    SibSp: Optional[int]
-    Parch: Optional[int]
-    Fare: Optional[float]
-    Embarked: Optional[str]
-    Title: Optional[str]
-    CabinLetter: Optional[str]
-
-
 # Global variables
 models = {}
 model_metadata = {}
 train_df = None
 test_df = None
 combined_data = None
+feature_engineer = None
 feature_encoders = {}
+feature_bins = {}
 trained_model_features = {}
 model_accuracy = {}
 
@@ -107,197 +144,2106 @@ ALGORITHMS = {
     "gaussian_nb": GaussianNB
 }
 
+# Algorithms whose custom models can be updated with new rows through partial_fit
+INCREMENTAL_ALGORITHMS = ["sgd", "perceptron", "gaussian_nb"]
+
+# Hyperparameters for the default models (based on the notebook)
+DEFAULT_MODEL_PARAMS = {
+    "random_forest": {"n_estimators": 100, "criterion": "gini", "max_depth": 5, "min_samples_split": 10,
+                      "min_samples_leaf": 1, "max_features": "sqrt", "random_state": 42},
+    "decision_tree": {"criterion": "gini", "max_depth": 5, "min_samples_split": 10, "random_state": 42},
+    "knn": {"n_neighbors": 5, "weights": "uniform", "algorithm": "auto", "p": 2},
+    "svm": {"kernel": "linear", "C": 0.025, "probability": True, "random_state": 42},
+    "logistic_regression": {"penalty": "l2", "C": 0.1, "solver": "lbfgs", "max_iter": 1000, "random_state": 42},
+    "perceptron": {"penalty": "l2", "alpha": 0.0001, "max_iter": 1000, "tol": 1e-3, "random_state": 42},
+    "sgd": {"loss": "modified_huber", "penalty": "l2", "max_iter": 1000, "tol": 1e-3, "random_state": 42},
+    "gaussian_nb": {}
+}
+
+# Hyperparameters for custom models trained through the API
+CUSTOM_MODEL_PARAMS = {
+    "random_forest": {"n_estimators": 100, "criterion": "gini", "max_depth": None, "min_samples_split": 2,
+                      "min_samples_leaf": 1, "random_state": 42},
+    "decision_tree": {"criterion": "gini", "max_depth": None, "random_state": 42},
+    "svm": {"kernel": "rbf", "gamma": "auto", "C": 1.0, "probability": True, "random_state": 42},
+    "knn": {"n_neighbors": 3, "weights": "uniform", "algorithm": "auto", "p": 2},
+    "logistic_regression": {"penalty": "l2", "solver": "lbfgs", "max_iter": 1000, "random_state": 42},
+    "perceptron": {"penalty": "l2", "alpha": 0.0001, "max_iter": 1000, "tol": 1e-3, "random_state": 42},
+    "sgd": {"loss": "modified_huber", "penalty": "l2", "max_iter": 1000, "tol": 1e-3, "random_state": 42},
+    "gaussian_nb": {}
+}
+
+# Map feature names to dataset columns
+FEATURE_MAPPING = {
+    "Pclass": "Pclass",
+    "Sex": "Sex_encoded",
+    "Age": "Age",
+    "SibSp": "SibSp",
+    "Parch": "Parch",
+    "Fare": "Fare",
+    "Embarked": "Embarked_encoded",
+    "Title": "Title_encoded",
+    "FamilySize": "FamilySize",
+    "IsAlone": "IsAlone",
+    "Age_Class": "Age_Class",
+    "CabinLetter": "Cabin_encoded",
+    "AgeBin": "AgeBin",
+    "FareBin": "FareBin",
+    "FamilySizeBin": "FamilySizeBin"
+}
+
+# Core features used by all default models
+CORE_FEATURES = [
+    'Pclass', 'Sex_encoded', 'Age', 'SibSp', 'Parch', 'Fare',
+    'Embarked_encoded', 'Title_encoded'
+]
+
+# Column positions of passenger feature rows built by preprocess_passenger_data
+FEATURE_POSITIONS = {feature: i for i, feature in enumerate(CORE_FEATURES)}
+PCLASS, SEX, AGE, SIBSP, PARCH, FARE, EMBARKED, TITLE = (
+    FEATURE_POSITIONS[feature] for feature in
+    ['Pclass', 'Sex_encoded', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked_encoded', 'Title_encoded']
+)
+EMBARKED_CODES = {"S": 0, "C": 1, "Q": 2}
+TITLE_CODES = {"Mr": 0, "Miss": 1, "Mrs": 2, "Master": 3, "Rare": 4}
+
+# Directory of saved model artifacts, and the default location of the other stores below
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+
+# Artifact cache for the default models
+DATA_FILES = ["data/train.csv", "data/test.csv"]
+LEGACY_DEFAULT_CACHE_PATH = os.path.join(MODEL_DIR, "default_models.json")
+
+# Model artifacts: joblib compression level (0-9) and whether large float arrays are stored as float32
+ARTIFACT_COMPRESSION = int(os.getenv("ARTIFACT_COMPRESSION", "3"))
+ARTIFACT_FLOAT32 = os.getenv("ARTIFACT_FLOAT32", "true").lower() == "true"
+# Seconds the last load of each artifact path took
+artifact_load_seconds = {}
+
+# SQLite manifest of every saved model: metadata, artifact paths, checksums and scores
+MODEL_MANIFEST_PATH = os.getenv("MODEL_MANIFEST_PATH", os.path.join(MODEL_DIR, "manifest.db"))
+manifest_ready = False
+# Held while the manifest is created; reentrant because migrating legacy models writes to it
+manifest_lock = threading.RLock()
+
+# Map titles to standardized categories; anything else is 'Rare'
+TITLE_MAPPING = {
+    'Mr': 'Mr',
+    'Miss': 'Miss',
+    'Mrs': 'Mrs',
+    'Master': 'Master',
+    'Dr': 'Rare',
+    'Rev': 'Rare',
+    'Col': 'Rare',
+    'Major': 'Rare',
+    'Mlle': 'Miss',
+    'Mme': 'Mrs',
+    'Ms': 'Miss',
+    'Lady': 'Rare',
+    'Sir': 'Rare',
+    'Capt': 'Rare',
+    'the Countess': 'Rare',
+    'Jonkheer': 'Rare',
+    'Don': 'Rare'
+}
+
+# Columns read from the raw CSVs and their types
+RAW_COLUMN_DTYPES = {
+    "Survived": "float64",
+    "Pclass": "int64",
+    "Name": "object",
+    "Sex": "object",
+    "Age": "float64",
+    "SibSp": "int64",
+    "Parch": "int64",
+    "Fare": "float64",
+    "Cabin": "object",
+    "Embarked": "object"
+}
+
+# Ingested training data: rows read per chunk, and distinct values a quantile sketch keeps exactly
+INGEST_DIR = os.getenv("INGEST_DIR", os.path.join(MODEL_DIR, "ingested"))
+INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "10000"))
+SKETCH_MAX_VALUES = int(os.getenv("SKETCH_MAX_VALUES", "4096"))
+# Out-of-core training on the ingested data: sample budget of algorithms without partial_fit, epochs of those with it
+OUT_OF_CORE_MEMORY_MB = int(os.getenv("OUT_OF_CORE_MEMORY_MB", "256"))
+OUT_OF_CORE_EPOCHS = int(os.getenv("OUT_OF_CORE_EPOCHS", "5"))
+
+# Memory-mapped cache of the engineered dataset; bump the version when feature engineering changes
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", os.path.join(MODEL_DIR, "dataset_cache"))
+DATASET_CACHE_VERSION = 3
+
+# Compact schema of the engineered dataset kept in memory. Columns not listed (the raw Name and Cabin text
+# and the interval bands behind AgeBin, FareBin and FamilySizeBin) are dropped after feature engineering.
+# Age, Fare and Age_Class stay float64: they are model inputs, and values such as 0.42 or 71.2833 have no
+# exact float32 representation
+DATASET_SCHEMA = {
+    "Survived": "float32",  # 0, 1, or NaN for test rows
+    "Pclass": "int8",
+    "Sex": "category",
+    "Age": "float64",
+    "SibSp": "int8",
+    "Parch": "int8",
+    "Fare": "float64",
+    "Embarked": "category",
+    "original_index": "int16",
+    "Title": "category",
+    "FamilySize": "int8",
+    "IsAlone": "int8",
+    "FamilySizeBin": "int8",
+    "CabinLetter": "category",
+    "AgeBin": "int8",
+    "Age_Class": "float64",
+    "FareBin": "int8",
+    "Sex_encoded": "int8",
+    "Embarked_encoded": "int8",
+    "Title_encoded": "int8",
+    "Cabin_encoded": "int8"
+}
+# Before/after memory report of the last dataset compaction, for /metrics
+dataset_memory = {}
+
+# Number of processes used to train the default models (1 trains sequentially, 0 uses every core)
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", "1"))
+
+# Background training jobs submitted through the API
+TRAINING_JOB_WORKERS = int(os.getenv("TRAINING_JOB_WORKERS", "1"))
+MAX_TRAINING_JOBS = int(os.getenv("MAX_TRAINING_JOBS", "100"))
+training_executor = ThreadPoolExecutor(max_workers=TRAINING_JOB_WORKERS, thread_name_prefix="training")
+
+# Hyperparameter search: processes per search (at most one per core; 0 uses every core, 1 searches in
+# the serving process), CV folds and the most grid points tried (larger grids are sampled)
+TUNING_WORKERS = int(os.getenv("TUNING_WORKERS", "2"))
+TUNING_CV_FOLDS = int(os.getenv("TUNING_CV_FOLDS", "5"))
+TUNING_MAX_CANDIDATES = int(os.getenv("TUNING_MAX_CANDIDATES", "64"))
+# Search data of a tuning process pool worker, set by init_tuning_worker
+tuning_data = None
+
+# Startup mode: "blocking" trains default models before serving, "background" serves while they warm up
+STARTUP_MODE = os.getenv("STARTUP_MODE", "blocking")
+# Default models trained first in background mode (anonymous users may only use these)
+DEFAULT_TRAINING_PRIORITY = [
+    algo_name.strip() for algo_name in os.getenv("DEFAULT_TRAINING_PRIORITY", "random_forest,svm").split(",")
+]
+# Default models still being trained in background mode: model_id -> display name
+warming_models = {}
+
+# Score linear models with LinearScorer instead of sklearn
+LINEAR_KERNELS = os.getenv("LINEAR_KERNELS", "true").lower() == "true"
+
+# Evaluate random forests and decision trees with TreeEnsemble instead of sklearn
+TREE_KERNELS = os.getenv("TREE_KERNELS", "true").lower() == "true"
+
+# Prediction result cache for /api/predict (0 entries disables it, 0 seconds never expires)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "10000"))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+
+# Precompute default model predictions over LOOKUP_GRID after default training
+LOOKUP_TABLES = os.getenv("LOOKUP_TABLES", "false").lower() == "true"
+# One axis of values per feature row position; rows with every value on its axis hit the tables
+LOOKUP_GRID = {
+    PCLASS: [1, 2, 3],
+    SEX: [0, 1],
+    AGE: np.arange(0, 81),
+    SIBSP: np.arange(0, 3),
+    PARCH: np.arange(0, 3),
+    FARE: np.unique(np.r_[np.arange(0, 101, 5), 32.2]),
+    EMBARKED: sorted(set(EMBARKED_CODES.values())),
+    TITLE: sorted(set(TITLE_CODES.values()))
+}
+
+# Coalesce concurrent /api/predict calls into one inference per model every PREDICTION_BATCH_WINDOW_MS
+PREDICTION_BATCHING = os.getenv("PREDICTION_BATCHING", "false").lower() == "true"
+PREDICTION_BATCH_WINDOW_MS = float(os.getenv("PREDICTION_BATCH_WINDOW_MS", "5"))
+PREDICTION_BATCH_MAX_SIZE = int(os.getenv("PREDICTION_BATCH_MAX_SIZE", "64"))
+
+# Threads running CPU-bound inference and how many more calls may wait for one; beyond that
+# requests get 503 with Retry-After
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "32"))
+INFERENCE_RETRY_AFTER = int(os.getenv("INFERENCE_RETRY_AFTER", "1"))
+
+# Serving worker processes; above 1 the parent publishes every model to MODEL_CATALOG_DIR once and
+# the workers memory-map them, picking up later changes every CATALOG_POLL_INTERVAL seconds
+SERVING_WORKERS = int(os.getenv("SERVING_WORKERS", "1"))
+MODEL_CATALOG_DIR = os.getenv("MODEL_CATALOG_DIR", os.path.join(MODEL_DIR, "catalog"))
+CATALOG_POLL_INTERVAL = float(os.getenv("CATALOG_POLL_INTERVAL", "1"))
+
+# Memory budget for custom models, which are loaded on first use; idle ones are dropped after
+# CUSTOM_MODEL_IDLE_SECONDS (0 keeps them until the budget is exceeded)
+CUSTOM_MODEL_MEMORY_MB = float(os.getenv("CUSTOM_MODEL_MEMORY_MB", "512"))
+CUSTOM_MODEL_IDLE_SECONDS = float(os.getenv("CUSTOM_MODEL_IDLE_SECONDS", "3600"))
+
+# Largest number of passengers accepted by /api/predict/batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+
+
+class LinearScorer:
+    """Pure-NumPy scorer for the binary linear models (logistic regression, linear SVM, perceptron, SGD).
+
+    Every model's coefficients are laid out over the passenger feature row, so one matmul scores all
+    linear models at once; each model's link function then turns its column into labels and
+    probabilities the way sklearn's predict/predict_proba would.
+    """
+
+    def __init__(self, entries):
+        entries = list(entries)
+        self.position = {model_id: j for j, (model_id, _, _) in enumerate(entries)}
+        self.coef = np.zeros((len(FEATURE_POSITIONS), len(entries)))
+        self.intercept = np.zeros(len(entries))
+        self.links = []
+        self.classes = []
+        self.platt = {}
+
+        for j, (model_id, model, columns) in enumerate(entries):
+            self.coef[columns, j] = model.coef_[0]
+            self.intercept[j] = model.intercept_[0]
+            self.links.append(self.link(model))
+            self.classes.append(model.classes_)
+            if isinstance(model, SVC):
+                self.platt[model_id] = (float(model.probA_[0]), float(model.probB_[0]))
+
+    @staticmethod
+    def link(model) -> Optional[str]:
+        """How a model's decision value becomes a prediction, or None if it is not supported"""
+        if len(getattr(model, "classes_", [])) != 2:
+            return None
+        if isinstance(model, LogisticRegression):
+            return "logistic"
+        if isinstance(model, Perceptron):
+            return "sign"
+        if isinstance(model, SGDClassifier):
+            return {"modified_huber": "modified_huber", "log_loss": "logistic", "hinge": "sign"}.get(model.loss)
+        if isinstance(model, SVC) and model.kernel == "linear":
+            return "platt" if model.probability else "sign"
+        return None
+
+    def decision(self, X: np.ndarray) -> np.ndarray:
+        """Decision values of every linear model for every row of X"""
+        return X @ self.coef + self.intercept
+
+    def predict(self, model_id: str, decision: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Labels and probabilities of one model from the decision() matrix"""
+        j = self.position[model_id]
+        z = decision[:, j]
+        labels = self.classes[j][(z > 0).astype(int)]
+
+        link = self.links[j]
+        if link == "logistic":
+            positive = expit(z)
+        elif link == "modified_huber":
+            positive = (np.clip(z, -1, 1) + 1.0) / 2.0
+        elif link == "platt":
+            A, B = self.platt[model_id]
+            return labels, svc_pair_probabilities(z, A, B)
+        else:
+            return labels, None
+
+        return labels, np.column_stack([1 - positive, positive])
+
+
+class TreeEnsemble:
+    """RandomForest or DecisionTree compiled into flat node arrays.
+
+    The nodes of every tree are concatenated into contiguous feature, threshold, children and
+    leaf-probability arrays, and leaves point back at themselves, so a batch of rows walks all
+    trees at once with one gather per tree level.
+    """
+
+    def __init__(self, model):
+        estimators = model.estimators_ if isinstance(model, RandomForestClassifier) else [model]
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            roots.append(offset)
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold))
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :]
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+            offset += tree.node_count
+
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds)
+        # children[2 * node] is the left child and children[2 * node + 1] the right one
+        self.children = np.column_stack([np.concatenate(lefts), np.concatenate(rights)]).ravel().astype(np.intp)
+        self.value = np.concatenate(values)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.depth = max(estimator.tree_.max_depth for estimator in estimators)
+        self.classes = model.classes_
+
+    ARRAYS = ("feature", "threshold", "children", "value", "roots", "classes")
+
+    def save(self, directory: str):
+        """Write the node arrays as .npy files that load() can memory-map"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        np.save(os.path.join(directory, "depth.npy"), np.array(self.depth))
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "TreeEnsemble":
+        """Map the node arrays written by save(); processes mapping the same files share their pages"""
+        ensemble = cls.__new__(cls)
+        for name in cls.ARRAYS:
+            setattr(ensemble, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode))
+        ensemble.depth = int(np.load(os.path.join(directory, "depth.npy")))
+        return ensemble
+
+    @staticmethod
+    def supports(model) -> bool:
+        """Whether a model is a fitted single-output RandomForest or DecisionTree"""
+        return isinstance(model, (RandomForestClassifier, DecisionTreeClassifier)) \
+            and hasattr(model, "classes_") and getattr(model, "n_outputs_", 1) == 1
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Labels and probabilities for every row of X, as predict/predict_proba would return them"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat = X.ravel()
+        row_offsets = (np.arange(len(X)) * X.shape[1])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+
+        for _ in range(self.depth):
+            go_right = flat[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+
+        probabilities = self.value[nodes].sum(axis=1) / len(self.roots)
+        return self.classes[probabilities.argmax(axis=1)], probabilities
+
+
+class PredictionCache:
+    """LRU cache of prediction results keyed by model ID and normalized passenger feature row.
+
+    Entries expire after ttl seconds (0 keeps them until evicted) and at most max_entries are kept.
+    invalidate() drops a model's entries and bumps its version, so a prediction that was started
+    before the model changed is not stored afterwards.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.versions = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(model_id: str, row: np.ndarray) -> Tuple[str, bytes]:
+        return model_id, row.tobytes()
+
+    def version(self, model_id: str) -> int:
+        return self.versions.get(model_id, 0)
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[Dict[str, Any]]:
+        """Cached result for a key, or None on a miss"""
+        if not self.max_entries:
+            return None
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self.entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple[str, bytes], result: Dict[str, Any], version: int):
+        """Store a result computed while the model was at the given version"""
+        if not self.max_entries:
+            return
+
+        with self.lock:
+            if self.version(key[0]) != version:
+                return
+            self.entries[key] = (time.monotonic(), result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, model_id: str):
+        """Drop every cached result of a model"""
+        with self.lock:
+            self.versions[model_id] = self.version(model_id) + 1
+            for key in [key for key in self.entries if key[0] == model_id]:
+                del self.entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+class LookupTables:
+    """Predictions of the default models precomputed over a discretized passenger grid.
+
+    Each table holds an int8 label and a float64 survival probability per grid point (NaN for
+    models without probabilities), so lookups return the model's exact survival probability; the
+    probability of dying is 1 - survival, which can differ from the model's in the last bit.
+    Feature rows whose values all lie on the grid axes are answered by an index lookup; any other
+    row falls through to the model.
+    """
+
+    def __init__(self, grid: Dict[int, np.ndarray], chunk_size: int = 65536):
+        self.axes = [np.asarray(grid[position], dtype=np.float64) for position in range(len(grid))]
+        self.shape = tuple(len(axis) for axis in self.axes)
+        self.positions = [{value: i for i, value in enumerate(axis.tolist())} for axis in self.axes]
+        self.size = int(np.prod(self.shape))
+        self.chunk_size = chunk_size
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def points(self):
+        """Grid points as chunks of feature rows, in table order"""
+        for start in range(0, self.size, self.chunk_size):
+            index = np.unravel_index(np.arange(start, min(start + self.chunk_size, self.size)), self.shape)
+            yield np.column_stack([axis[i] for axis, i in zip(self.axes, index)])
+
+    def build(self, model_id: str, model, score):
+        """Score every grid point with score(X) -> (labels, probabilities) and store the table,
+        unless the model was replaced in the meantime"""
+        labels = np.empty(self.size, dtype=np.int8)
+        survived = np.full(self.size, np.nan, dtype=np.float64)
+
+        start = 0
+        for X in self.points():
+            chunk_labels, probabilities = score(X)
+            labels[start:start + len(X)] = chunk_labels
+            if probabilities is not None:
+                survived[start:start + len(X)] = probabilities[:, 1]
+            start += len(X)
+
+        with self.lock:
+            if models.get(model_id) is model:
+                self.tables = {**self.tables, model_id: (labels, None if np.isnan(survived).all() else survived)}
+
+    def invalidate(self, model_id: str):
+        with self.lock:
+            self.tables = {key: value for key, value in self.tables.items() if key != model_id}
+
+    def lookup(self, model_id: str, X: np.ndarray) -> Optional[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Labels and probabilities of every row of X, or None unless the model has a table and
+        all rows lie on the grid"""
+        table = self.tables.get(model_id)
+        if table is None:
+            return None
+
+        flat = self.index(X)
+        hits = int((flat >= 0).sum())
+        self.lookups += len(X)
+        self.hits += hits
+        if hits < len(X):
+            return None
+
+        labels, survived = table
+        if survived is None:
+            return labels[flat], None
+        positive = survived[flat]
+        return labels[flat], np.column_stack([1 - positive, positive])
+
+    def index(self, X: np.ndarray) -> np.ndarray:
+        """Flat table index of every row of X, -1 for rows off the grid"""
+        if len(X) == 1:
+            # Dictionary lookups beat eight searchsorted calls for a single row
+            flat = 0
+            for value, positions in zip(X[0].tolist(), self.positions):
+                i = positions.get(value)
+                if i is None:
+                    return np.array([-1])
+                flat = flat * len(positions) + i
+            return np.array([flat])
+
+        flat = np.zeros(len(X), dtype=np.intp)
+        on_grid = np.ones(len(X), dtype=bool)
+        for position, axis in enumerate(self.axes):
+            values = X[:, position]
+            index = np.minimum(np.searchsorted(axis, values), len(axis) - 1)
+            on_grid &= axis[index] == values
+            flat = flat * len(axis) + index
+        return np.where(on_grid, flat, -1)
+
+    def stats(self) -> Dict[str, Any]:
+        tables = self.tables
+        return {
+            "enabled": LOOKUP_TABLES,
+            "models": sorted(tables),
+            "grid_points": self.size,
+            "bytes": sum(labels.nbytes + (0 if survived is None else survived.nbytes)
+                         for labels, survived in tables.values()),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0
+        }
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference executor has no free worker or queue slot"""
+
+
+class InferenceExecutor:
+    """Thread pool for CPU-bound inference with a bounded number of waiting tasks.
+
+    At most workers tasks run and queue_size more wait; submit() raises InferenceQueueFull
+    instead of queueing beyond that, so overload turns into fast rejections rather than
+    unbounded latency.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args) -> Future:
+        with self.lock:
+            if self.in_flight >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise InferenceQueueFull(f"Inference queue is full ({self.queue_size} waiting)")
+            self.in_flight += 1
+
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _):
+        with self.lock:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": min(self.in_flight, self.workers),
+            "queued": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+
+class PredictionBatcher:
+    """Coalesces concurrent single-passenger predictions into one inference per model.
+
+    submit() queues a feature row for a model and returns a future. A worker task on the event
+    loop collects everything queued within window_ms of the first row, or until max_batch_size
+    rows are waiting, then scores each model once over its stacked rows on the inference executor
+    and resolves the futures.
+    """
+
+    def __init__(self, window_ms: float, max_batch_size: int):
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.queue = None
+        self.worker = None
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+
+    def submit(self, model_id: str, model_name: str, row: np.ndarray) -> asyncio.Future:
+        """Queue a feature row for a model; the future resolves to its prediction result"""
+        loop = asyncio.get_running_loop()
+        if self.worker is None or self.worker.done() or self.worker.get_loop() is not loop:
+            self.queue = asyncio.Queue()
+            self.worker = loop.create_task(self.run())
+
+        future = loop.create_future()
+        self.queue.put_nowait((model_id, model_name, row, future))
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window_ms / 1000
+            while len(batch) < self.max_batch_size:
+                if self.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+
+            self.dispatch(batch)
+
+    def dispatch(self, batch):
+        """Score a batch on the inference executor without waiting, so the next batch keeps gathering"""
+        self.batches += 1
+        self.rows += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        try:
+            work = inference_executor.submit(self.score, batch)
+        except InferenceQueueFull as e:
+            self.resolve(batch, [e] * len(batch))
+            return
+
+        def done(work):
+            error = work.exception()
+            self.resolve(batch, [error] * len(batch) if error else work.result())
+
+        asyncio.wrap_future(work).add_done_callback(done)
+
+    @staticmethod
+    def score(batch) -> List[Any]:
+        """Score each model once over the rows queued for it; one result or exception per row"""
+        by_model = {}
+        for i, (model_id, _, _, _) in enumerate(batch):
+            by_model.setdefault(model_id, []).append(i)
+
+        results = [None] * len(batch)
+        for model_id, indexes in by_model.items():
+            X = np.stack([batch[i][2] for i in indexes])
+            try:
+                model_results = format_predictions(*score_feature_rows(model_id, X))
+            except Exception as e:
+                # Fall back to one row at a time so a bad row does not fail the others
+                logger.warning(f"Coalesced prediction with {model_id} failed, isolating rows: {e}")
+                model_results = []
+                for j in range(len(X)):
+                    try:
+                        model_results.append(format_predictions(*score_feature_rows(model_id, X[j:j + 1]))[0])
+                    except Exception as row_error:
+                        model_results.append(row_error)
+
+            for i, result in zip(indexes, model_results):
+                results[i] = result
+        return results
+
+    @staticmethod
+    def resolve(batch, results):
+        for (_, _, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": PREDICTION_BATCHING,
+            "window_ms": self.window_ms,
+            "max_batch_size": self.max_batch_size,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "average_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch
+        }
+
+
+def model_nbytes(obj, seen: Optional[Dict[int, Any]] = None) -> int:
+    """Approximate resident size of a fitted model: the bytes of every NumPy array it references"""
+    # Keep visited objects alive so temporary __getstate__ results never share an id
+    seen = {} if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen[id(obj)] = obj
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (list, tuple)):
+        return sum(model_nbytes(value, seen) for value in obj)
+    if isinstance(obj, dict):
+        return sum(model_nbytes(value, seen) for value in obj.values())
+    if hasattr(obj, "__dict__"):
+        return model_nbytes(vars(obj), seen)
+    # Cython trees (Tree, KDTree, BallTree) expose their arrays through __getstate__
+    if type(obj).__module__.startswith("sklearn."):
+        return model_nbytes(obj.__getstate__(), seen)
+    return 0
+
+
+class LazyModelCache:
+    """Custom models loaded on first use and kept in an LRU bounded by a memory budget.
+
+    add() registers how to load a model; get() returns it, loading it at most once even when
+    several requests need it at the same time. Loaded models are attached to the registry and
+    detached again when they are the least recently used ones over budget_bytes or have been
+    idle for idle_seconds (0 never expires them).
+    """
+
+    def __init__(self, budget_bytes: int, idle_seconds: float):
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self.sources = {}
+        self.resident = OrderedDict()
+        self.sizes = {}
+        self.load_seconds = {}
+        self.loads = {}
+        self.loading = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def add(self, model_id: str, source, model=None):
+        """Make a model loadable through source(); a model that is already in memory counts as resident"""
+        with self.lock:
+            self.sources[model_id] = source
+            if model is not None:
+                self.sizes[model_id] = model_nbytes(model)
+                self.resident[model_id] = time.monotonic()
+            else:
+                # A replaced model is loaded again from its new source
+                self.resident.pop(model_id, None)
+        if model is not None:
+            self.evict(keep=model_id)
+
+    def discard(self, model_id: str):
+        with self.lock:
+            for index in (self.sources, self.resident, self.sizes, self.load_seconds, self.loads):
+                index.pop(model_id, None)
+
+    def get(self, model_id: str):
+        """The model, loading it if needed; models not added here must already be registered"""
+        model = models.get(model_id)
+        if model_id not in self.sources:
+            if model is None:
+                raise KeyError(f"Model '{model_id}' is not loaded")
+            return model
+
+        with self.lock:
+            if model is not None and model_id in self.resident:
+                self.resident[model_id] = time.monotonic()
+                self.resident.move_to_end(model_id)
+                self.hits += 1
+                return model
+
+            future = self.loading.get(model_id)
+            owner = future is None
+            if owner:
+                future = self.loading[model_id] = Future()
+                self.misses += 1
+                source = self.sources[model_id]
+
+        if not owner:
+            return future.result()
+
+        try:
+            started = time.perf_counter()
+            model = source()
+            elapsed = time.perf_counter() - started
+            nbytes = model_nbytes(model)
+
+            with self.lock:
+                # Deleted while loading; hand the model to the waiting requests but do not keep it
+                if model_id in self.sources:
+                    registry.attach(model_id, model)
+                    self.resident[model_id] = time.monotonic()
+                    self.sizes[model_id] = nbytes
+                    self.load_seconds[model_id] = elapsed
+                    self.loads[model_id] = self.loads.get(model_id, 0) + 1
+
+            logger.info(f"Loaded {model_id} on first use in {elapsed * 1000:.1f} ms ({nbytes / 2 ** 20:.1f} MiB)")
+            future.set_result(model)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.loading.pop(model_id, None)
+
+        self.evict(keep=model_id)
+        return model
+
+    def evict(self, keep: Optional[str] = None):
+        """Detach idle models and then the least recently used ones until the budget is met"""
+        with self.lock:
+            now = time.monotonic()
+            evicted = [model_id for model_id, last_used in self.resident.items()
+                       if model_id != keep and self.idle_seconds and now - last_used > self.idle_seconds]
+            for model_id in evicted:
+                del self.resident[model_id]
+
+            for model_id in list(self.resident):
+                if self.resident_bytes() <= self.budget_bytes:
+                    break
+                if model_id != keep:
+                    del self.resident[model_id]
+                    evicted.append(model_id)
+
+            for model_id in evicted:
+                registry.detach(model_id)
+                self.evictions += 1
+                logger.info(f"Evicted {model_id} from memory")
+
+    def resident_bytes(self) -> int:
+        return sum(self.sizes.get(model_id, 0) for model_id in self.resident)
+
+    def describe(self, model_id: str) -> Dict[str, Any]:
+        """Residency of one model, for GET /api/models/{model_id}"""
+        if model_id not in self.sources:
+            return {}
+        return {
+            "resident": model_id in self.resident,
+            "resident_bytes": self.sizes.get(model_id),
+            "load_seconds": self.load_seconds.get(model_id),
+            "loads": self.loads.get(model_id, 0)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget_bytes": self.budget_bytes,
+            "resident_bytes": self.resident_bytes(),
+            "resident_models": len(self.resident),
+            "known_models": len(self.sources),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "models": {model_id: self.describe(model_id) for model_id in list(self.sources)}
+        }
+
+
+class ModelRegistry:
+    """Indexed view over models, trained_model_features, model_accuracy and model_metadata.
+    Lazily loaded models are registered without a model and attached once loaded.
+
+    Writers go through register() and remove(), which hold a lock and then swap in freshly built
+    indexes, so lookups never take the lock and always see a consistent snapshot. columns holds
+    each model's feature_index() into passenger feature rows, linear the LinearScorer of
+    the linear models and trees the TreeEnsemble of each forest and decision tree. Cached
+    predictions of a model are invalidated in every cache whenever it is replaced or removed.
+    """
+
+    def __init__(self, models, features, accuracy, metadata, caches):
+        self.models = models
+        self.features = features
+        self.accuracy = accuracy
+        self.metadata = metadata
+        self.caches = caches
+        self.columns = {}
+        self.linear = LinearScorer([])
+        self.trees = {}
+        self.lock = threading.RLock()
+        self._names = {}
+        self._partitions = {True: [], False: []}
+
+    def register(self, model_id: str, model, features: List[str], metadata: Dict[str, Any],
+                 ensemble: Optional[TreeEnsemble] = None):
+        """Add or replace a model; metadata goes last because lookups go through it. A compiled
+        ensemble, e.g. one mapped from the model catalog, is used instead of compiling the model"""
+        with self.lock:
+            if model is not None:
+                self.models[model_id] = model
+            else:
+                self.models.pop(model_id, None)
+            self.features[model_id] = features
+            self.accuracy[model_id] = metadata["accuracy"]
+            self.columns[model_id] = feature_index(model_id, features)
+            trees = {key: value for key, value in self.trees.items() if key != model_id}
+            if TREE_KERNELS and TreeEnsemble.supports(model):
+                trees[model_id] = ensemble or TreeEnsemble(model)
+            self.trees = trees
+            self.metadata[model_id] = metadata
+            self._reindex()
+            for cache in self.caches:
+                cache.invalidate(model_id)
+
+    def remove(self, model_id: str):
+        """Remove a model; metadata goes first so lookups stop finding it before the model disappears"""
+        with self.lock:
+            self.metadata.pop(model_id, None)
+            self.models.pop(model_id, None)
+            self.features.pop(model_id, None)
+            self.accuracy.pop(model_id, None)
+            self.columns.pop(model_id, None)
+            self.trees = {key: value for key, value in self.trees.items() if key != model_id}
+            self._reindex()
+            for cache in self.caches:
+                cache.invalidate(model_id)
+
+    def attach(self, model_id: str, model):
+        """Put a lazily loaded model back in memory; cached predictions of it stay valid"""
+        with self.lock:
+            if model_id not in self.metadata:
+                return
+            self.models[model_id] = model
+            if TREE_KERNELS and TreeEnsemble.supports(model):
+                self.trees = {**self.trees, model_id: TreeEnsemble(model)}
+            self._reindex()
+
+    def detach(self, model_id: str):
+        """Drop a model from memory but keep it registered so it can be loaded again"""
+        with self.lock:
+            self.models.pop(model_id, None)
+            self.trees = {key: value for key, value in self.trees.items() if key != model_id}
+            self._reindex()
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Model ID for a model ID or a case-insensitive model name"""
+        if name in self.metadata:
+            return name
+        return self._names.get(name.lower())
+
+    def list(self, is_default: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Metadata of all models, or only the default or custom ones"""
+        if is_default is None:
+            return self._partitions[True] + self._partitions[False]
+        return self._partitions[is_default]
+
+    def _reindex(self):
+        names = {}
+        partitions = {True: [], False: []}
+        for model_id, metadata in self.metadata.items():
+            # The oldest model wins when several share a name
+            names.setdefault(metadata["name"].lower(), model_id)
+            partitions[bool(metadata["is_default"])].append(metadata)
+
+        self._names, self._partitions = names, partitions
+
+        # Export the linear models into one coefficient matrix
+        if LINEAR_KERNELS:
+            self.linear = LinearScorer(
+                (model_id, self.models[model_id], self.columns[model_id][0])
+                for model_id in self.metadata
+                if model_id in self.models and self.columns[model_id][0] is not None
+                and LinearScorer.link(self.models[model_id])
+            )
+
+
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+lookup_tables = LookupTables(LOOKUP_GRID)
+inference_executor = InferenceExecutor(INFERENCE_WORKERS, INFERENCE_QUEUE_SIZE)
+prediction_batcher = PredictionBatcher(PREDICTION_BATCH_WINDOW_MS, PREDICTION_BATCH_MAX_SIZE)
+lazy_models = LazyModelCache(int(CUSTOM_MODEL_MEMORY_MB * 2 ** 20), CUSTOM_MODEL_IDLE_SECONDS)
+registry = ModelRegistry(models, trained_model_features, model_accuracy, model_metadata,
+                         [prediction_cache, lookup_tables])
+
+
+
+class ModelCatalog:
+    """Versioned catalog of model artifacts shared by the serving workers.
+
+    The parent process publishes every default model as an uncompressed joblib file plus, for forests
+    and decision trees, the TreeEnsemble node arrays; workers load both with mmap_mode='r' so their
+    large arrays are mapped from the same page cache. Custom models are only referenced: their entry
+    points at the artifact in the manifest, which workers load through lazy_models on first use.
+    Every publish, reference or withdraw bumps the catalog version under a file lock, and sync()
+    brings a worker's registry up to the latest version.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, "catalog.json")
+        self.version = None
+        # model_id -> artifact name this process has registered
+        self.loaded = {}
+
+    def read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": 0, "models": {}}
+
+    def update(self, change):
+        """Apply change(entries) to the catalog under an exclusive lock and bump its version"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            catalog = self.read()
+            change(catalog["models"])
+            catalog["version"] += 1
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(catalog, f)
+            os.replace(tmp_path, self.path)
+        return catalog["version"]
+
+    def reset(self):
+        """Start an empty catalog; only safe before any worker is running"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.update(lambda entries: entries.clear())
+
+    def publish(self, model_id: str, model, features: List[str], metadata: Dict[str, Any]):
+        """Write a model's artifacts and add or replace it in the catalog"""
+        artifact = f"{model_id}-{uuid.uuid4().hex[:8]}"
+        joblib.dump(model, os.path.join(self.directory, f"{artifact}.joblib"))
+        trees = None
+        if TreeEnsemble.supports(model):
+            trees = f"{artifact}.trees"
+            TreeEnsemble(model).save(os.path.join(self.directory, trees))
+
+        entry = {"artifact": artifact, "trees": trees, "features": features, "metadata": metadata}
+        replaced = []
+
+        def change(entries):
+            if model_id in entries:
+                replaced.append(entries[model_id])
+            entries[model_id] = entry
+
+        self.update(change)
+        self.loaded[model_id] = artifact
+        for old in replaced:
+            self.remove_artifacts(old)
+
+    def reference(self, model_id: str, artifact: Dict[str, Any], features: List[str], metadata: Dict[str, Any]):
+        """Add or replace a model by pointing at its manifest artifact instead of writing a copy"""
+        entry = {"artifact": None, "trees": None, "model_path": artifact["model_path"],
+                 "model_sha256": artifact["model_sha256"], "features": features, "metadata": metadata}
+        replaced = []
+
+        def change(entries):
+            if model_id in entries:
+                replaced.append(entries[model_id])
+            entries[model_id] = entry
+
+        self.update(change)
+        self.loaded[model_id] = artifact["model_sha256"]
+        for old in replaced:
+            self.remove_artifacts(old)
+
+    def withdraw(self, model_id: str):
+        """Remove a model from the catalog and delete its artifacts"""
+        removed = []
+        self.update(lambda entries: removed.append(entries.pop(model_id, None)))
+        self.loaded.pop(model_id, None)
+        for old in filter(None, removed):
+            self.remove_artifacts(old)
+
+    def remove_artifacts(self, entry: Dict[str, Any]):
+        # Referenced artifacts belong to the manifest
+        if not entry["artifact"]:
+            return
+        # Workers that still map these files keep their pages until they drop the model
+        artifact_path = os.path.join(self.directory, f"{entry['artifact']}.joblib")
+        if os.path.exists(artifact_path):
+            os.remove(artifact_path)
+        if entry["trees"]:
+            shutil.rmtree(os.path.join(self.directory, entry["trees"]), ignore_errors=True)
+
+    def sync(self, registry: ModelRegistry) -> bool:
+        """Register new or replaced models and remove withdrawn ones; returns whether anything changed"""
+        catalog = self.read()
+        if catalog["version"] == self.version:
+            return False
+
+        entries = catalog["models"]
+        for model_id in [model_id for model_id in self.loaded if model_id not in entries]:
+            registry.remove(model_id)
+            lazy_models.discard(model_id)
+            del self.loaded[model_id]
+            logger.info(f"Removed {model_id} (catalog version {catalog['version']})")
+
+        for model_id, entry in entries.items():
+            artifact = entry["artifact"] or entry["model_sha256"]
+            if self.loaded.get(model_id) == artifact:
+                continue
+            try:
+                if entry["artifact"]:
+                    model = joblib.load(os.path.join(self.directory, f"{artifact}.joblib"), mmap_mode="r")
+                    ensemble = None
+                    if entry["trees"]:
+                        ensemble = TreeEnsemble.load(os.path.join(self.directory, entry["trees"]))
+                    registry.register(model_id, model, entry["features"], entry["metadata"], ensemble)
+                else:
+                    # Referenced models are loaded on first use, within the CUSTOM_MODEL_MEMORY_MB budget
+                    registry.register(model_id, None, entry["features"], entry["metadata"])
+                    lazy_models.add(model_id, manifest_loader(entry))
+                self.loaded[model_id] = artifact
+                logger.info(f"Mapped {model_id} (catalog version {catalog['version']})")
+            except FileNotFoundError:
+                # Replaced or withdrawn while we read the catalog; the next sync picks up the newer version
+                logger.warning(f"Artifacts of {model_id} disappeared, retrying on the next sync")
+                return True
+
+        self.version = catalog["version"]
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": SERVING_WORKERS > 1,
+            "workers": SERVING_WORKERS,
+            "version": self.version,
+            "models": len(self.loaded),
+            "pid": os.getpid()
+        }
+
+
+model_catalog = ModelCatalog(MODEL_CATALOG_DIR)
+
+
+class JobStore:
+    """Background job records of one kind, shared by every serving worker through the manifest database.
+
+    The process running a job keeps its record in jobs and mutates it in place; track() writes it to
+    the database every CATALOG_POLL_INTERVAL seconds while the job runs and once more when it ends,
+    so any worker can report the job's status. Lookups prefer the live record of a local job.
+    """
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.jobs = {}
+
+    def add(self, job: Dict[str, Any]):
+        """Record a newly queued job and forget the oldest finished ones once the history is full"""
+        self.jobs[job["id"]] = job
+        self.save(job)
+        conn = connect_manifest()
+        with conn:
+            conn.execute('''
+                DELETE FROM jobs WHERE id IN (
+                    SELECT id FROM jobs WHERE kind = ? AND status IN ('completed', 'failed')
+                    ORDER BY submitted_at LIMIT max(0, (SELECT COUNT(*) FROM jobs WHERE kind = ?) - ?)
+                )
+            ''', (self.kind, self.kind, MAX_TRAINING_JOBS))
+        conn.close()
+
+    def save(self, job: Dict[str, Any]):
+        record = json.dumps(job)
+        conn = connect_manifest()
+        with conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO jobs (id, kind, status, record, submitted_at) VALUES (?, ?, ?, ?, ?)
+            ''', (job["id"], self.kind, job["status"], record, job["submitted_at"]))
+        conn.close()
+
+    @contextmanager
+    def track(self, job: Dict[str, Any]):
+        """Publish a running job's record until the block exits, then once more with its outcome"""
+        stopped = threading.Event()
+
+        def publish():
+            while not stopped.wait(CATALOG_POLL_INTERVAL):
+                try:
+                    self.save(job)
+                except (RuntimeError, sqlite3.Error) as e:
+                    # The record changed while being serialized or the database was busy; retry next tick
+                    logger.debug(f"Could not publish {self.kind} job {job['id']}: {e}")
+
+        thread = threading.Thread(target=publish, name=f"{self.kind}-job-state", daemon=True)
+        thread.start()
+        try:
+            yield job
+        finally:
+            stopped.set()
+            thread.join()
+            self.save(job)
+            self.jobs.pop(job["id"], None)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if job_id in self.jobs:
+            return self.jobs[job_id]
+        conn = connect_manifest()
+        row = conn.execute("SELECT record FROM jobs WHERE id = ? AND kind = ?", (job_id, self.kind)).fetchone()
+        conn.close()
+        return json.loads(row[0]) if row else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Every recorded job, newest first"""
+        conn = connect_manifest()
+        rows = conn.execute("SELECT id, record FROM jobs WHERE kind = ? ORDER BY submitted_at DESC, rowid DESC",
+                            (self.kind,)).fetchall()
+        conn.close()
+        return [self.jobs.get(job_id) or json.loads(record) for job_id, record in rows]
+
+    def interrupt(self):
+        """Fail the jobs a previous run left queued or running; only safe before any worker is running"""
+        conn = connect_manifest()
+        with conn:
+            rows = conn.execute("SELECT record FROM jobs WHERE kind = ? AND status IN ('queued', 'running')",
+                                (self.kind,)).fetchall()
+            for (record,) in rows:
+                job = {**json.loads(record), "status": "failed", "error": "Interrupted by a restart"}
+                conn.execute("UPDATE jobs SET status = ?, record = ? WHERE id = ?",
+                             (job["status"], json.dumps(job), job["id"]))
+        conn.close()
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def __getitem__(self, job_id: str) -> Dict[str, Any]:
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+
+training_jobs = JobStore("training")
+tuning_jobs = JobStore("tuning")
+
+
+def start_catalog_sync() -> threading.Thread:
+    """Poll the model catalog so models trained or deleted by another worker show up here"""
+    def poll():
+        while True:
+            time.sleep(CATALOG_POLL_INTERVAL)
+            try:
+                model_catalog.sync(registry)
+            except Exception as e:
+                logger.error(f"Error syncing model catalog: {e}")
+
+    thread = threading.Thread(target=poll, name="catalog-sync", daemon=True)
+    thread.start()
+    return thread
+
+
+def start_idle_eviction(cache: LazyModelCache) -> Optional[threading.Thread]:
+    """Sweep the custom model cache so models that go cold are dropped even when nothing else is loaded"""
+    if not cache.idle_seconds:
+        return None
+
+    def sweep():
+        while True:
+            time.sleep(min(cache.idle_seconds / 4, 60))
+            try:
+                cache.evict()
+            except Exception as e:
+                logger.error(f"Error evicting idle models: {e}")
+
+    thread = threading.Thread(target=sweep, name="idle-eviction", daemon=True)
+    thread.start()
+    return thread
+
+
+def prepare_model_catalog():
+    """Train or load the default models once in the parent process and publish them for the workers;
+    custom models are only referenced, so the parent never loads them"""
+    load_dataset()
+    if not load_default_models_from_cache():
+        train_default_models()
+    interrupt_jobs()
+
+    model_catalog.reset()
+    for model_id, model in models.items():
+        model_catalog.publish(model_id, model, trained_model_features[model_id], model_metadata[model_id])
+    custom = load_manifest_entries(is_default=False)
+    for entry in custom:
+        model_catalog.reference(entry["id"], entry, entry["features"], entry["metadata"])
+    logger.info(f"Published {len(models)} models and {len(custom)} custom model references to "
+                f"{MODEL_CATALOG_DIR} for {SERVING_WORKERS} workers")
 
 def load_dataset():
     """Load and preprocess the Titanic dataset following notebook approach"""
-    global train_df, test_df, combined_data, feature_encoders
+    global train_df, test_df, combined_data, feature_engineer, feature_encoders, feature_bins, dataset_memory
 
     try:
-        # Load the datasets
-        train_df = pd.read_csv("data/train.csv")
-        test_df = pd.read_csv("data/test.csv")
-
-        # Store original indices
-        train_df['original_index'] = train_df.index
-        test_df['original_index'] = test_df.index
-
-        # Combine datasets for preprocessing
-        test_df['Survived'] = np.nan  # Add target column to test for combining
-        combined_data = pd.concat([train_df, test_df], sort=False).reset_index(drop=True)
-
-        # Feature engineering based on the notebook approach
-
-        # Extract titles from names
-        combined_data['Title'] = combined_data['Name'].str.extract(' ([A-Za-z]+)\.', expand=False)
-
-        # Map titles to standardized categories
-        title_mapping = {
-            'Mr': 'Mr',
-            'Miss': 'Miss',
-            'Mrs': 'Mrs',
-            'Master': 'Master',
-            'Dr': 'Rare',
-            'Rev': 'Rare',
-            'Col': 'Rare',
-            'Major': 'Rare',
-            'Mlle': 'Miss',
-            'Mme': 'Mrs',
-            'Ms': 'Miss',
-            'Lady': 'Rare',
-            'Sir': 'Rare',
-            'Capt': 'Rare',
-            'the Countess': 'Rare',
-            'Jonkheer': 'Rare',
-            'Don': 'Rare'
-        }
-        combined_data['Title'] = combined_data['Title'].map(lambda x: title_mapping.get(x, 'Rare'))
+        # Reuse the engineered dataset from disk as long as the raw CSVs are unchanged
+        cache_key = dataset_cache_key()
+        cached = load_dataset_cache(cache_key)
+
+        if cached is not None:
+            combined_data, feature_engineer, dataset_memory = cached
+        else:
+            engineered, feature_engineer = engineer_features(*read_raw_datasets())
+            combined_data, dataset_memory = compact_dataset(engineered)
+            save_dataset_cache(cache_key, combined_data, feature_engineer, dataset_memory)
+
+        feature_encoders = feature_engineer.encoders
+        feature_bins = feature_engineer.bins
+
+        # Re-split the combined data back to train and test; train rows come first, so both are
+        # row slices sharing the memory of combined_data rather than copies
+        n_train = int(combined_data['Survived'].notna().sum())
+        train_df = combined_data.iloc[:n_train]
+        test_df = combined_data.iloc[n_train:]
+
+        logger.info(f"Datasets loaded and processed: Train: {len(train_df)} records, Test: {len(test_df)} records, "
+                    f"{dataset_memory['before_bytes']} -> {dataset_memory['after_bytes']} bytes in memory")
+        return train_df, test_df, combined_data
+
+    except Exception as e:
+        logger.error(f"Error loading dataset: {e}")
+        raise
+
+
+def read_raw_datasets() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Parse the raw CSVs, reading only the columns feature engineering needs"""
+    train_raw, test_raw = (
+        pd.read_csv(path, usecols=lambda column: column in RAW_COLUMN_DTYPES, dtype=RAW_COLUMN_DTYPES)
+        for path in DATA_FILES
+    )
+    return train_raw, test_raw
+
+
+def engineer_features(train_raw: pd.DataFrame, test_raw: pd.DataFrame) -> Tuple[pd.DataFrame, "FeatureEngineer"]:
+    """Run the notebook feature engineering; returns the combined data and the fitted engineer"""
+    # Store original indices
+    train_raw['original_index'] = train_raw.index
+    test_raw['original_index'] = test_raw.index
+
+    # Combine datasets for preprocessing
+    test_raw['Survived'] = np.nan  # Add target column to test for combining
+    combined_data = pd.concat([train_raw, test_raw], sort=False).reset_index(drop=True)
+
+    # Statistics are fitted on the combined data, following the notebook
+    engineer = FeatureEngineer()
+    combined_data = engineer.fit_transform(combined_data)
+
+    return combined_data, engineer
+
+
+class FeatureEngineer:
+    """Fitted feature engineering: imputation statistics, band edges and label encoders.
+
+    fit() computes every statistic in one vectorized pass over a raw frame; transform() applies
+    them to any frame with the raw Titanic columns, so training data, bulk scoring input and
+    single passengers go through the same code.
+    """
 
-        # Create family size feature
-        combined_data['FamilySize'] = combined_data['SibSp'] + combined_data['Parch'] + 1
+    def __init__(self):
+        self.title_age_medians = {}
+        self.overall_age_median = None
+        self.embarked_mode = None
+        self.pclass_fare_medians = {}
+        self.age_band_dtype = None
+        self.fare_band_dtype = None
+        self.bins = {}
+        self.encoders = {}
 
-        # Create IsAlone feature
-        combined_data['IsAlone'] = (combined_data['FamilySize'] == 1).astype(int)
+    def fit(self, data: pd.DataFrame) -> "FeatureEngineer":
+        """Compute the imputation statistics, band edges and encoders"""
+        base = self._base_features(data)
 
-        # Calculate median ages by title - FIXED APPROACH
-        title_age_medians = combined_data.groupby('Title')['Age'].median().to_dict()
+        # Median ages by title, then the overall median for titles without any known age
+        self.title_age_medians = base.groupby('Title')['Age'].median().dropna().to_dict()
+        self.overall_age_median = float(base['Age'].median())
+        age = self._fill_age(base)
 
-        # Fill missing ages using title medians
-        for title, median_age in title_age_medians.items():
-            combined_data.loc[(combined_data['Age'].isnull()) & (combined_data['Title'] == title), 'Age'] = median_age
+        # Most common port and median fare by class
+        self.embarked_mode = base['Embarked'].mode()[0]
+        self.pclass_fare_medians = base.groupby('Pclass')['Fare'].median().dropna().to_dict()
+        fare = self._fill_fare(base)
 
-        # Fill any remaining NaN with overall median
-        overall_age_median = combined_data['Age'].median()
-        combined_data['Age'].fillna(overall_age_median, inplace=True)
+        # Age is cut into 5 equal-width bands and Fare into 4 quantile bands
+        age_bands, age_edges = pd.cut(age, 5, retbins=True)
+        fare_bands, fare_edges = pd.qcut(fare, 4, retbins=True)
+        self.age_band_dtype = age_bands.dtype
+        self.fare_band_dtype = fare_bands.dtype
+        self.bins = {'age': age_edges, 'fare': fare_edges}
+
+        # Encode categorical variables
+        self.encoders = {
+            'sex': LabelEncoder().fit(base['Sex']),
+            'embarked': LabelEncoder().fit(base['Embarked'].fillna(self.embarked_mode)),
+            'title': LabelEncoder().fit(base['Title']),
+            'cabin': LabelEncoder().fit(base['CabinLetter'])
+        }
+        return self
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Apply the fitted statistics to a frame, returning a new frame with the engineered columns"""
+        data = self._base_features(data)
+
+        # Fill missing ages and fares with the fitted medians
+        data['Age'] = self._fill_age(data)
+        data['Fare'] = self._fill_fare(data)
+        data['Embarked'] = data['Embarked'].fillna(self.embarked_mode)
 
         # Create Age bins and convert to ordinal
-        # First create the Age bands
-        combined_data['AgeBand'] = pd.cut(combined_data['Age'], 5)
-        # Then convert to numerical code
-        combined_data['AgeBin'] = combined_data['AgeBand'].cat.codes
+        data['AgeBin'] = self._band_codes(data['Age'], self.bins['age'])
+        data['AgeBand'] = pd.Categorical.from_codes(data['AgeBin'], dtype=self.age_band_dtype)
 
         # Create Age_Class interaction
-        combined_data['Age_Class'] = combined_data['Age'] * combined_data['Pclass']
+        data['Age_Class'] = data['Age'] * data['Pclass']
 
-        # Process Embarked - fill missing values with most common
-        combined_data['Embarked'].fillna(combined_data['Embarked'].mode()[0], inplace=True)
+        # Create Fare bands and convert to ordinal
+        data['FareBin'] = self._band_codes(data['Fare'], self.bins['fare'])
+        data['FareBand'] = pd.Categorical.from_codes(data['FareBin'], dtype=self.fare_band_dtype)
 
-        # Process Fare - fill missing values with median by Pclass
-        for pclass in [1, 2, 3]:
-            pclass_fare_median = combined_data.loc[combined_data['Pclass'] == pclass, 'Fare'].median()
-            combined_data.loc[
-                (combined_data['Fare'].isnull()) & (combined_data['Pclass'] == pclass), 'Fare'] = pclass_fare_median
+        # Encode categorical variables
+        data['Sex_encoded'] = self._encode('sex', data['Sex'])
+        data['Embarked_encoded'] = self._encode('embarked', data['Embarked'])
+        data['Title_encoded'] = self._encode('title', data['Title'])
+        data['Cabin_encoded'] = self._encode('cabin', data['CabinLetter'])
 
-        # Create Fare bands and convert to ordinal
-        combined_data['FareBand'] = pd.qcut(combined_data['Fare'], 4)
-        combined_data['FareBin'] = combined_data['FareBand'].cat.codes
+        return data
 
-        # Create family size categories
-        combined_data['FamilySizeGroup'] = pd.cut(combined_data['FamilySize'],
-                                               bins=[0, 1, 4, 7, 11],
-                                               labels=['Single', 'Small', 'Medium', 'Large'])
-        combined_data['FamilySizeBin'] = combined_data['FamilySizeGroup'].cat.codes
+    def fit_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(data).transform(data)
 
-        # Extract cabin letter (deck) from cabin
-        combined_data['CabinLetter'] = combined_data['Cabin'].astype(str).str[0]
-        combined_data.loc[combined_data['CabinLetter'] == 'n', 'CabinLetter'] = 'U'  # 'n' from 'nan' -> 'U' for unknown
+    @staticmethod
+    def _base_features(data: pd.DataFrame) -> pd.DataFrame:
+        """Features that need no fitted statistics"""
+        data = data.copy()
 
-        # Encode categorical variables
-        le_sex = LabelEncoder()
-        le_embarked = LabelEncoder()
-        le_title = LabelEncoder()
-        le_cabin = LabelEncoder()
-
-        combined_data['Sex_encoded'] = le_sex.fit_transform(combined_data['Sex'])
-        combined_data['Embarked_encoded'] = le_embarked.fit_transform(combined_data['Embarked'])
-        combined_data['Title_encoded'] = le_title.fit_transform(combined_data['Title'])
-        combined_data['Cabin_encoded'] = le_cabin.fit_transform(combined_data['CabinLetter'])
-
-        # Store encoders
-        feature_encoders = {
-            'sex': le_sex,
-            'embarked': le_embarked,
-            'title': le_title,
-            'cabin': le_cabin
+        # Extract titles from names and map them to standardized categories
+        if 'Name' in data:
+            titles = data['Name'].str.extract(r' ([A-Za-z]+)\.', expand=False)
+            data['Title'] = titles.map(TITLE_MAPPING).fillna('Rare')
+
+        # Create family size and IsAlone features
+        data['FamilySize'] = data['SibSp'] + data['Parch'] + 1
+        data['IsAlone'] = (data['FamilySize'] == 1).astype(int)
+
+        # Create family size categories
+        data['FamilySizeGroup'] = pd.cut(data['FamilySize'],
+                                         bins=[0, 1, 4, 7, 11],
+                                         labels=['Single', 'Small', 'Medium', 'Large'])
+        data['FamilySizeBin'] = data['FamilySizeGroup'].cat.codes
+
+        # Extract cabin letter (deck) from cabin; 'U' for unknown
+        if 'Cabin' in data:
+            data['CabinLetter'] = data['Cabin'].str[0].fillna('U')
+
+        return data
+
+    def _fill_age(self, data: pd.DataFrame) -> pd.Series:
+        return data['Age'].fillna(data['Title'].map(self.title_age_medians)).fillna(self.overall_age_median)
+
+    def _fill_fare(self, data: pd.DataFrame) -> pd.Series:
+        return data['Fare'].fillna(data['Pclass'].map(self.pclass_fare_medians))
+
+    @staticmethod
+    def _band_codes(values: pd.Series, edges: np.ndarray) -> np.ndarray:
+        """Right-closed band index of each value; values outside the fitted range go to the outer bands"""
+        codes = np.searchsorted(edges, values.to_numpy(), side='left') - 1
+        return np.clip(codes, 0, len(edges) - 2).astype(np.int8)
+
+    def _encode(self, name: str, values: pd.Series) -> np.ndarray:
+        """Label-encode values; labels not seen during fit become -1"""
+        return pd.Categorical(values, categories=self.encoders[name].classes_).codes.astype(np.int64)
+
+
+def dataset_cache_key() -> str:
+    """Hash the raw CSVs and the feature engineering version"""
+    digest = hashlib.sha256()
+    hash_data_files(digest)
+    digest.update(f"v{DATASET_CACHE_VERSION}:pandas={pd.__version__}:numpy={np.__version__}".encode())
+    return digest.hexdigest()
+
+
+def compact_dataset(data: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Cast the engineered dataset to DATASET_SCHEMA, dropping every other column; returns the compact
+    frame and a before/after memory report. A column keeps its dtype if the narrower one would change a value"""
+    columns, report = {}, {}
+    for column, dtype in DATASET_SCHEMA.items():
+        values = data[column]
+        compact = values.astype(dtype)
+        if not compact.astype(values.dtype).equals(values):
+            logger.warning(f"Keeping {column} as {values.dtype}: its values do not fit {dtype}")
+            compact = values
+        columns[column] = compact
+        report[column] = {
+            "dtype": f"{values.dtype} -> {compact.dtype}",
+            "before_bytes": int(values.memory_usage(deep=True, index=False)),
+            "after_bytes": int(compact.memory_usage(deep=True, index=False))
         }
 
-        # Re-split the combined data back to train and test
-        train_df = combined_data.loc[combined_data['Survived'].notna()].copy()
-        test_df = combined_data.loc[combined_data['Survived'].isna()].copy()
+    compact = pd.DataFrame(columns)
+    before = int(data.memory_usage(deep=True).sum())
+    after = int(compact.memory_usage(deep=True).sum())
+
+    # train_df and test_df used to be copies of the labeled and unlabeled rows; now they are views
+    labeled = data['Survived'].notna()
+    copies = int(data.loc[labeled].memory_usage(deep=True).sum() + data.loc[~labeled].memory_usage(deep=True).sum())
+    return compact, {
+        "before_bytes": before + copies,
+        "after_bytes": after,
+        "combined_data": {"before_bytes": before, "after_bytes": after},
+        "train_df_test_df": {"before_bytes": copies, "after_bytes": 0},
+        "dropped_columns": [column for column in data.columns if column not in DATASET_SCHEMA],
+        "columns": report
+    }
 
-        logger.info(f"Datasets loaded and processed: Train: {len(train_df)} records, Test: {len(test_df)} records")
-        return train_df, test_df, combined_data
+
+def save_dataset_cache(cache_key: str, data: pd.DataFrame, engineer: FeatureEngineer, memory: Dict[str, Any]):
+    """Store the engineered dataset as one .npy file per column so later starts can memory-map it"""
+    cache_dir = os.path.join(DATASET_CACHE_DIR, cache_key)
+    tmp_dir = f"{cache_dir}.tmp"
+
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        # Numeric columns are stored as-is, strings and intervals as category codes
+        columns = []
+        for i, column in enumerate(data.columns):
+            values = data[column]
+            if values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype):
+                categorical = pd.Categorical(values)
+                kind = "category" if isinstance(values.dtype, pd.CategoricalDtype) else "object"
+                columns.append((column, kind, categorical.dtype))
+                np.save(os.path.join(tmp_dir, f"{i}.npy"), categorical.codes)
+            else:
+                columns.append((column, "numeric", None))
+                np.save(os.path.join(tmp_dir, f"{i}.npy"), values.to_numpy())
+
+        joblib.dump({"columns": columns, "engineer": engineer, "memory": memory}, os.path.join(tmp_dir, "meta.pkl"))
+
+        # Publish the finished directory atomically and drop caches of older CSVs
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(tmp_dir, cache_dir)
+        for entry in os.listdir(DATASET_CACHE_DIR):
+            if entry != cache_key:
+                shutil.rmtree(os.path.join(DATASET_CACHE_DIR, entry), ignore_errors=True)
+
+        logger.info(f"Saved engineered dataset cache {cache_key[:12]}")
 
     except Exception as e:
-        logger.error(f"Error loading dataset: {e}")
-        raise
+        logger.warning(f"Could not save engineered dataset cache: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def load_dataset_cache(cache_key: str):
+    """Memory-map the engineered dataset for this cache key; returns (data, engineer, memory report) or None on a miss"""
+    cache_dir = os.path.join(DATASET_CACHE_DIR, cache_key)
+    if not os.path.exists(os.path.join(cache_dir, "meta.pkl")):
+        return None
+
+    try:
+        meta = joblib.load(os.path.join(cache_dir, "meta.pkl"))
+
+        data = {}
+        for i, (column, kind, dtype) in enumerate(meta["columns"]):
+            values = np.load(os.path.join(cache_dir, f"{i}.npy"), mmap_mode="r")
+            if kind == "numeric":
+                data[column] = values
+            elif kind == "category":
+                data[column] = pd.Categorical.from_codes(values, dtype=dtype)
+            else:
+                data[column] = pd.Categorical.from_codes(values, dtype=dtype).astype(object)
+
+        logger.info(f"Memory-mapped engineered dataset cache {cache_key[:12]}")
+        return pd.DataFrame(data, copy=False), meta["engineer"], meta["memory"]
+
+    except Exception as e:
+        logger.warning(f"Could not load engineered dataset cache: {e}")
+        return None
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch of a numeric column in bounded memory.
+
+    Values are counted exactly until there are more than max_values distinct ones; from then on each
+    value is rounded to the centre of a logarithmic bucket, so quantiles stay within relative_accuracy
+    and the number of counters only grows with the value range, not with the number of rows.
+    Quantiles and medians are computed like pandas, so exact sketches give identical results.
+    """
+
+    def __init__(self, max_values: Optional[int] = None, relative_accuracy: float = 0.005):
+        self.max_values = max_values or SKETCH_MAX_VALUES
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.values = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.bucketed = False
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.add(*np.unique(values[~np.isnan(values)], return_counts=True))
+
+    def merge(self, other: "QuantileSketch"):
+        self.bucketed = self.bucketed or other.bucketed
+        self.add(other.values, other.counts)
+
+    def add(self, values: np.ndarray, counts: np.ndarray):
+        values = np.concatenate([self.values, values])
+        counts = np.concatenate([self.counts, counts])
+        if self.bucketed:
+            values = self.bucket(values)
+
+        self.values, inverse = np.unique(values, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts, minlength=len(self.values)).astype(np.int64)
+
+        if len(self.values) > self.max_values and not self.bucketed:
+            self.bucketed = True
+            self.add(np.empty(0), np.empty(0, dtype=np.int64))
+
+    def bucket(self, values: np.ndarray) -> np.ndarray:
+        """Centre of the bucket (gamma^(i-1), gamma^i] each value falls in; idempotent"""
+        magnitude = np.abs(values)
+        positive = magnitude > 0
+        index = np.ceil(np.log(magnitude, where=positive, out=np.zeros_like(magnitude)) / np.log(self.gamma))
+        return np.where(positive, np.sign(values) * 2 * self.gamma ** index / (self.gamma + 1), 0.0)
+
+    def ranked(self, ranks: np.ndarray) -> np.ndarray:
+        """Values at the given 0-based ranks of the sorted column"""
+        return self.values[np.searchsorted(np.cumsum(self.counts), ranks, side="right")]
+
+    def median(self) -> float:
+        n = self.count
+        low, high = self.ranked(np.array([(n - 1) // 2, n // 2]))
+        return float((low + high) / 2)
+
+    def quantile(self, q) -> np.ndarray:
+        """Linearly interpolated quantiles, as numpy and pandas compute them"""
+        h = np.asarray(q, dtype=np.float64) * (self.count - 1)
+        low = np.floor(h)
+        a, b = self.ranked(low), self.ranked(np.ceil(h))
+        t = h - low
+        return np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+
+
+class StreamingStatistics:
+    """The statistics FeatureEngineer.fit computes, updated one chunk at a time in bounded memory.
+
+    Medians and fare quantiles come from QuantileSketch, age bands only need the age range, and the
+    label encoders and embarked mode from value counts. engineer() builds the FeatureEngineer these
+    statistics describe; on data with few distinct values it equals fitting on all rows at once.
+    """
+
+    CATEGORIES = ['Sex', 'Embarked', 'Title', 'CabinLetter']
+
+    def __init__(self):
+        self.rows = 0
+        self.labeled_rows = 0
+        self.age = QuantileSketch()
+        self.age_range = [np.inf, -np.inf]
+        self.age_by_title = {}
+        self.fare_by_pclass = {}
+        self.missing_fare_by_pclass = {}
+        self.value_counts = {column: {} for column in self.CATEGORIES}
+
+    def update(self, base: pd.DataFrame):
+        """Add a chunk of raw rows that went through FeatureEngineer._base_features"""
+        self.rows += len(base)
+        self.labeled_rows += int(base['Survived'].notna().sum())
+
+        ages = base['Age'].dropna()
+        self.age.update(ages)
+        if len(ages):
+            self.age_range = [min(self.age_range[0], ages.min()), max(self.age_range[1], ages.max())]
+        for title, title_ages in base.groupby('Title')['Age']:
+            self.age_by_title.setdefault(title, QuantileSketch()).update(title_ages)
+
+        for pclass, fares in base.groupby('Pclass')['Fare']:
+            self.fare_by_pclass.setdefault(pclass, QuantileSketch()).update(fares)
+            self.missing_fare_by_pclass[pclass] = self.missing_fare_by_pclass.get(pclass, 0) + int(fares.isna().sum())
+
+        for column, counts in self.value_counts.items():
+            for value, count in base[column].value_counts().items():
+                counts[value] = counts.get(value, 0) + int(count)
+
+    def engineer(self) -> FeatureEngineer:
+        engineer = FeatureEngineer()
+
+        engineer.title_age_medians = {
+            title: sketch.median() for title, sketch in self.age_by_title.items() if sketch.count
+        }
+        engineer.overall_age_median = self.age.median()
+
+        embarked = self.value_counts['Embarked']
+        engineer.embarked_mode = min(embarked, key=lambda value: (-embarked[value], value))
+        engineer.pclass_fare_medians = {
+            pclass: sketch.median() for pclass, sketch in self.fare_by_pclass.items() if sketch.count
+        }
+
+        # Fare quantiles are taken after missing fares are filled with their class median
+        fare = QuantileSketch()
+        for pclass, sketch in self.fare_by_pclass.items():
+            fare.merge(sketch)
+            if pclass in engineer.pclass_fare_medians and self.missing_fare_by_pclass[pclass]:
+                fare.add(np.array([engineer.pclass_fare_medians[pclass]]),
+                         np.array([self.missing_fare_by_pclass[pclass]]))
+
+        # Filled ages never leave the observed range, which is all equal-width bands depend on
+        age_bands, age_edges = pd.cut(np.array(self.age_range), 5, retbins=True)
+        fare_edges = fare.quantile(np.linspace(0, 1, 5))
+        engineer.age_band_dtype = age_bands.dtype
+        engineer.fare_band_dtype = pd.cut(fare_edges, fare_edges, include_lowest=True).dtype
+        engineer.bins = {'age': age_edges, 'fare': fare_edges}
+
+        engineer.encoders = {}
+        for name, column in [('sex', 'Sex'), ('embarked', 'Embarked'), ('title', 'Title'), ('cabin', 'CabinLetter')]:
+            encoder = LabelEncoder()
+            encoder.classes_ = np.array(sorted(self.value_counts[column]), dtype=object)
+            engineer.encoders[name] = encoder
+        return engineer
+
+    def describe(self) -> Dict[str, Any]:
+        engineer = self.engineer()
+        return {
+            "rows": self.rows,
+            "labeled_rows": self.labeled_rows,
+            "title_age_medians": engineer.title_age_medians,
+            "overall_age_median": engineer.overall_age_median,
+            "pclass_fare_medians": {int(pclass): median for pclass, median in engineer.pclass_fare_medians.items()},
+            "embarked_mode": engineer.embarked_mode,
+            "age_band_edges": engineer.bins['age'].tolist(),
+            "fare_band_edges": engineer.bins['fare'].tolist(),
+            "approximate": self.age.bucketed or any(sketch.bucketed for sketch in self.fare_by_pclass.values())
+        }
+
 
+class IngestStore:
+    """On-disk columnar store of ingested passenger rows, with their streaming statistics.
+
+    Each chunk is a directory with one .npy file per column, so readers memory-map only the columns
+    they need. Rows are stored as raw columns (Title and CabinLetter instead of Name and Cabin) because
+    the fitted statistics keep changing as data arrives. state.pkl lists the committed chunks and is
+    replaced atomically at the end of an upload, so a failed upload leaves no trace. Uploads hold a file
+    lock from reading the state to replacing it, so concurrent ones, from other serving workers or
+    ingest.py, queue up instead of overwriting each other; chunk names are unique, so a chunk directory
+    is never reused. The store starts with the bundled CSVs so its statistics describe all the training data.
+    """
+
+    COLUMNS = ['Survived', 'Pclass', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked', 'Title', 'CabinLetter']
+    STRING_COLUMNS = ['Sex', 'Embarked', 'Title', 'CabinLetter']
+    REQUIRED_COLUMNS = ['Pclass', 'Name', 'Sex', 'Age', 'SibSp', 'Parch', 'Fare', 'Embarked']
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @contextmanager
+    def locked(self):
+        """Exclusive lock on the store across threads and processes"""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "store.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def load_state(self) -> Optional[Dict[str, Any]]:
+        path = os.path.join(self.directory, "state.pkl")
+        return joblib.load(path) if os.path.exists(path) else None
+
+    def save_state(self, state: Dict[str, Any]):
+        path = os.path.join(self.directory, "state.pkl")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(state, tmp_path)
+        os.replace(tmp_path, path)
+
+    def open(self, chunk_rows: Optional[int] = None) -> Dict[str, Any]:
+        """The committed state, seeding an empty store with the bundled CSVs; call within locked()"""
+        state = self.load_state()
+        if state is None:
+            os.makedirs(self.directory, exist_ok=True)
+            state = {"chunks": [], "uploads": [], "statistics": StreamingStatistics()}
+            for path in DATA_FILES:
+                self.append(state, path, f"bundled:{os.path.basename(path)}", chunk_rows)
+            self.save_state(state)
+        return state
+
+    def ingest(self, source, name: str, chunk_rows: Optional[int] = None) -> Dict[str, Any]:
+        """Stream a CSV file or path into the store chunk by chunk; returns a summary of the upload"""
+        with self.locked():
+            state = self.open(chunk_rows)
+            upload = self.append(state, source, name, chunk_rows)
+            self.save_state(state)
+
+        logger.info(f"Ingested {upload['rows']} rows from {name} in {upload['chunks']} chunks")
+        return {**upload, "total_rows": state["statistics"].rows}
+
+    def append(self, state: Dict[str, Any], source, name: str, chunk_rows: Optional[int]) -> Dict[str, Any]:
+        """Write the chunks of one CSV and update the statistics in state; written chunks are removed on failure"""
+        upload = {"name": name, "rows": 0, "chunks": 0, "ingested_at": datetime.now().isoformat()}
+        written = []
+        try:
+            reader = pd.read_csv(source, usecols=lambda column: column in RAW_COLUMN_DTYPES,
+                                 dtype=RAW_COLUMN_DTYPES, chunksize=chunk_rows or INGEST_CHUNK_ROWS)
+            for chunk in reader:
+                missing = [column for column in self.REQUIRED_COLUMNS if column not in chunk]
+                if missing:
+                    raise ValueError(f"Missing columns: {', '.join(missing)}")
+                for column in ['Survived', 'Cabin']:
+                    if column not in chunk:
+                        chunk[column] = np.nan if column == 'Survived' else None
+
+                base = FeatureEngineer._base_features(chunk.reset_index(drop=True))
+                state["statistics"].update(base)
+
+                chunk_name = f"chunk-{len(state['chunks']) + len(written):06d}-{uuid.uuid4().hex[:8]}"
+                self.write_chunk(chunk_name, base)
+                written.append({"name": chunk_name, "rows": len(base)})
+                upload["rows"] += len(base)
+        except Exception:
+            for chunk in written:
+                shutil.rmtree(os.path.join(self.directory, chunk["name"]), ignore_errors=True)
+            raise
+
+        upload["chunks"] = len(written)
+        state["chunks"].extend(written)
+        state["uploads"].append(upload)
+        return upload
+
+    def write_chunk(self, chunk_name: str, base: pd.DataFrame):
+        chunk_dir = os.path.join(self.directory, chunk_name)
+        os.makedirs(chunk_dir)
+        for column in self.COLUMNS:
+            values = base[column]
+            if column in self.STRING_COLUMNS:
+                values = values.fillna("").astype(str).to_numpy(dtype=str)
+            else:
+                values = values.to_numpy(dtype=RAW_COLUMN_DTYPES[column])
+            np.save(os.path.join(chunk_dir, f"{column}.npy"), values)
+
+    def chunks(self, columns: Optional[List[str]] = None, state: Optional[Dict[str, Any]] = None):
+        """Committed chunks as frames of raw columns that FeatureEngineer.transform accepts.
+        Chunks never change once committed, so a state snapshot can be read while uploads continue"""
+        state = state or self.load_state()
+        for chunk in state["chunks"] if state else []:
+            data = {}
+            for column in columns or self.COLUMNS:
+                values = np.load(os.path.join(self.directory, chunk["name"], f"{column}.npy"), mmap_mode="r")
+                if column in self.STRING_COLUMNS:
+                    values = pd.Series(values.astype(object)).replace("", np.nan)
+                data[column] = values
+            yield pd.DataFrame(data, copy=False)
+
+    def summary(self) -> Dict[str, Any]:
+        state = self.load_state()
+        if state is None:
+            return {"rows": 0, "chunks": 0, "uploads": []}
+        return {
+            "chunks": len(state["chunks"]),
+            "uploads": state["uploads"],
+            **state["statistics"].describe()
+        }
 
 
-def preprocess_passenger_data(passenger: PassengerData) -> pd.DataFrame:
-    """Convert passenger input to features dataframe with proper feature names"""
-    data = passenger.model_dump()
+ingest_store = IngestStore(INGEST_DIR)
+
+
+def preprocess_passenger_data(passenger: PassengerData, row: Optional[np.ndarray] = None) -> np.ndarray:
+    """Write passenger input into a float64 feature row laid out as FEATURE_POSITIONS"""
+    if row is None:
+        row = np.empty(len(FEATURE_POSITIONS))
 
     # Provide default values if any are missing or None
-    data["Pclass"] = data.get("pclass") or 3
-    data["Sex"] = data.get("sex") or "male"
-    data["Age"] = data.get("age") if data.get("age") is not None else 30
-    data["SibSp"] = data.get("sibsp") if data.get("sibsp") is not None else 0
-    data["Parch"] = data.get("parch") if data.get("parch") is not None else 0
-    data["Fare"] = data.get("fare") if data.get("fare") is not None else 32.2
-    data["Embarked"] = data.get("embarked") or "S"
-    data["Title"] = data.get("title") or "Mr"
-
-    # Derived features
-    data["Age_Class"] = data["Age"] * data["Pclass"]
-
-    # Encodings
-    data["Sex_encoded"] = 0 if data["Sex"] == "male" else 1
-    data["Embarked_encoded"] = {"S": 0, "C": 1, "Q": 2}.get(data["Embarked"], 0)
-    data["Title_encoded"] = {
-        "Mr": 0, "Miss": 1, "Mrs": 2, "Master": 3, "Rare": 4
-    }.get(data["Title"], 0)
-
-    # Create feature dictionary with core features that all models use
-    feature_dict = {
-        'Pclass': data["Pclass"],
-        'Sex_encoded': data["Sex_encoded"],
-        'Age': data["Age"],
-        'SibSp': data["SibSp"],
-        'Parch': data["Parch"],
-        'Fare': data["Fare"],
-        'Embarked_encoded': data["Embarked_encoded"],
-        'Title_encoded': data["Title_encoded"],
-    }
+    row[PCLASS] = passenger.pclass or 3
+    row[SEX] = 0 if (passenger.sex or "male") == "male" else 1
+    row[AGE] = passenger.age if passenger.age is not None else 30
+    row[SIBSP] = passenger.sibsp if passenger.sibsp is not None else 0
+    row[PARCH] = passenger.parch if passenger.parch is not None else 0
+    row[FARE] = passenger.fare if passenger.fare is not None else 32.2
+    row[EMBARKED] = EMBARKED_CODES.get(passenger.embarked or "S", 0)
+    row[TITLE] = TITLE_CODES.get(passenger.title or "Mr", 0)
 
-    return pd.DataFrame([feature_dict])
+    return row
 
 
-def train_default_models():
-    """Train all default models on startup using notebook approach"""
-    global models, model_metadata, train_df, test_df
+def preprocess_passengers(passengers: List[PassengerData]) -> Tuple[np.ndarray, List[int], Dict[int, str]]:
+    """Write many passengers into one feature matrix; returns the matrix, the positions it
+    holds and the error of each passenger that could not be preprocessed"""
+    X = np.empty((len(passengers), len(FEATURE_POSITIONS)))
+    positions, errors = [], {}
 
-    if train_df is None:
-        load_dataset()
+    for position, passenger in enumerate(passengers):
+        try:
+            preprocess_passenger_data(passenger, X[len(positions)])
+            positions.append(position)
+        except Exception as e:
+            logger.warning(f"Error preprocessing passenger {position}: {e}")
+            errors[position] = str(e)
 
-    train_df['Age_Class'] = train_df['Age'] * train_df['Pclass']
-    train_df['Age*Class'] = train_df['Age'] * train_df['Pclass']
+    return X[:len(positions)], positions, errors
 
-    # Define feature columns based on the notebook
-    # feature_columns = [
-    #     'Pclass', 'Sex_encoded', 'Age', 'SibSp', 'Parch', 'Fare',
-    #     'Embarked_encoded', 'Title_encoded', 'FamilySize',
-    #     'IsAlone', 'Age_Class', 'Cabin_encoded',
-    #     'AgeBin', 'FareBin', 'FamilySizeBin'
-    # ]
 
+def feature_index(model_id: str, model_features: Optional[List[str]]):
+    """Columns of a feature row a model reads, as a slice when contiguous; returns (index, None) or (None, error)"""
+    if not model_features:
+        logger.warning(f"No feature list for model {model_id}, using basic features")
+        model_features = ['Pclass', 'Sex_encoded', 'Age', 'Fare', 'Embarked_encoded', 'Title_encoded']
 
-    core_features = [
-        'Pclass', 'Sex_encoded', 'Age', 'SibSp', 'Parch', 'Fare',
-        'Embarked_encoded', 'Title_encoded'
-    ]
+    # Extract only the features this model was trained on
+    available_features = [f for f in model_features if f in FEATURE_POSITIONS]
+    if len(available_features) < len(model_features):
+        logger.warning(f"Missing features for {model_id}: {set(model_features) - set(available_features)}")
 
-    X = train_df[core_features]
-    y = train_df['Survived']
+    if len(available_features) < 3:
+        logger.error(f"Not enough features available for {model_id}")
+        return None, {
+            "prediction": "Error",
+            "error": "Not enough features available"
+        }
+
+    # Selecting contiguous columns with a slice is a view instead of a copy
+    columns = np.array([FEATURE_POSITIONS[f] for f in available_features], dtype=np.intp)
+    if np.array_equal(columns, np.arange(columns[0], columns[0] + len(columns))):
+        return slice(int(columns[0]), int(columns[0]) + len(columns)), None
+    return columns, None
+
+
+def resolve_model(model_name: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """Find a model by name or ID; returns (model_id, None) or (None, error result)"""
+    model_id = registry.lookup(model_name)
+
+    # Default models that are still training in the background
+    if not model_id:
+        for mid, name in list(warming_models.items()):
+            if model_name.lower() == name.lower() or model_name == mid:
+                model_id = mid
+                break
+
+    if model_id in warming_models and model_id not in model_metadata:
+        logger.info(f"Model still warming up: {model_name}")
+        return None, {
+            "prediction": "Warming",
+            "status": "warming",
+            "error": f"Model '{model_name}' is warming up, please retry shortly"
+        }
+
+    if not model_id or model_id not in model_metadata:
+        logger.warning(f"Model not found: {model_name}")
+        return None, {
+            "prediction": "Error",
+            "error": f"Model '{model_name}' not found"
+        }
+
+    return model_id, None
+
+
+def infer(model, model_name: str, X: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Predict labels and probabilities with a single inference pass where the model allows it"""
+    # Binary SVC: one decision_function pass gives both the label (as in predict) and the
+    # Platt-scaled probability (as in predict_proba)
+    if isinstance(model, SVC) and getattr(model, "probability", False) and len(model.classes_) == 2:
+        decision = model.decision_function(X)
+        return model.classes_[(decision > 0).astype(int)], svc_binary_probability(model, decision)
+
+    # Everything else with probabilities predicts the most probable class
+    if hasattr(model, "predict_proba"):
+        try:
+            probabilities = model.predict_proba(X)
+            return model.classes_.take(np.argmax(probabilities, axis=1)), probabilities
+        except Exception as e:
+            logger.warning(f"Could not get probability for {model_name}: {e}")
+
+    # Models without probabilities, e.g. Perceptron
+    return model.predict(X), None
+
+
+def svc_binary_probability(model: SVC, decision: np.ndarray) -> np.ndarray:
+    """predict_proba of a binary SVC computed from its decision function, following libsvm exactly"""
+    A, B = float(model.probA_[0]), float(model.probB_[0])
+    return svc_pair_probabilities(decision, A, B)
+
+
+def svc_pair_probabilities(decision: np.ndarray, A: float, B: float) -> np.ndarray:
+    """libsvm's Platt sigmoid and pairwise coupling (multiclass_probability) for two classes, over
+    every decision value at once; each row stops iterating when it converges, as in libsvm"""
+    # libsvm's decision values have the opposite sign of sklearn's for binary problems
+    f = -np.asarray(decision, dtype=np.float64) * A + B
+    # math.exp is the C library's exp libsvm uses; np.exp can differ in the last bit
+    e = np.fromiter(map(math.exp, (-np.abs(f)).tolist()), dtype=np.float64, count=len(f))
+    r = np.where(f >= 0, e / (1.0 + e), 1.0 / (1.0 + e))
+    r = np.clip(r, 1e-7, 1 - 1e-7)
+
+    q00, q01, q11 = (1 - r) * (1 - r), -(1 - r) * r, r * r
+    p0, p1 = np.full(len(r), 0.5), np.full(len(r), 0.5)
+    active = np.ones(len(r), dtype=bool)
+
+    for _ in range(100):
+        qp0 = q00 * p0 + q01 * p1
+        qp1 = q01 * p0 + q11 * p1
+        pqp = p0 * qp0 + p1 * qp1
+        active &= np.maximum(np.abs(qp0 - pqp), np.abs(qp1 - pqp)) >= 0.005 / 2
+        if not active.any():
+            break
+
+        diff = (-qp0 + pqp) / q00
+        n0 = p0 + diff
+        pqp = (pqp + diff * (diff * q00 + 2 * qp0)) / (1 + diff) / (1 + diff)
+        qp0, qp1 = (qp0 + diff * q00) / (1 + diff), (qp1 + diff * q01) / (1 + diff)
+        n0, n1 = n0 / (1 + diff), p1 / (1 + diff)
+
+        diff = (-qp1 + pqp) / q11
+        n1 = n1 + diff
+        n0, n1 = n0 / (1 + diff), n1 / (1 + diff)
+
+        p0, p1 = np.where(active, n0, p0), np.where(active, n1, p1)
+
+    return np.column_stack([p0, p1])
+
+
+def predict_rows(model, model_name: str, X: np.ndarray) -> List[Dict[str, Any]]:
+    """Run one model over a feature matrix and format a prediction result per row"""
+    return format_predictions(*infer(model, model_name, X))
+
+
+def score_feature_rows(model_id: str, X: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Labels and probabilities of a registered model for passenger feature rows"""
+    columns, error = registry.columns[model_id]
+    if error:
+        raise ValueError(error["error"])
+
+    linear, trees = registry.linear, registry.trees
+    if model_id in linear.position:
+        return linear.predict(model_id, linear.decision(X))
+    if model_id in trees:
+        return trees[model_id].predict(X[:, columns])
+    return infer(lazy_models.get(model_id), model_id, X[:, columns])
+
+
+def start_lookup_table_build() -> threading.Thread:
+    """Score the lookup grid with every default model on a background thread"""
+    def build():
+        for metadata in registry.list(is_default=True):
+            model_id = metadata["id"]
+            model = models.get(model_id)
+            if model is None or model_id in lookup_tables.tables:
+                continue
+            try:
+                started = time.perf_counter()
+                lookup_tables.build(model_id, model, lambda X: score_feature_rows(model_id, X))
+                logger.info(f"Built lookup table for {model_id} in {time.perf_counter() - started:.1f}s")
+            except Exception as e:
+                logger.error(f"Error building lookup table for {model_id}: {e}")
+
+        logger.info(f"Lookup tables use {lookup_tables.stats()['bytes'] / 2 ** 20:.1f} MiB")
+
+    thread = threading.Thread(target=build, name="lookup-tables", daemon=True)
+    thread.start()
+    return thread
+
+
+def format_predictions(prediction_values: np.ndarray, probabilities: Optional[np.ndarray]) -> List[Dict[str, Any]]:
+    """Format labels and probabilities as one prediction result per row"""
+    results = []
+    for i, value in enumerate(prediction_values):
+        prediction = int(value)
+        probability = None
+        if probabilities is not None:
+            probability = {
+                "survived": float(probabilities[i][1]),
+                "died": float(probabilities[i][0])
+            }
+
+        results.append({
+            "prediction": "Survived" if prediction == 1 else "Did not survive",
+            "prediction_value": prediction,
+            "probability": probability
+        })
+
+    return results
+
+
+def train_default_models(order: Optional[List[str]] = None):
+    """Train all default models on startup using notebook approach"""
+    global models, model_metadata, train_df, test_df
+
+    if train_df is None:
+        load_dataset()
+
+    X = train_df[CORE_FEATURES]
+    y = train_df['Survived'].values
 
     # Feature scaling for better performance
     scaler = StandardScaler()
@@ -306,155 +2252,566 @@ def train_default_models():
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
 
-    # Store the scaler for future use
-    os.makedirs("models", exist_ok=True)
+    os.makedirs(MODEL_DIR, exist_ok=True)
 
     # Clear existing default models (to prevent accumulation)
-    for f in os.listdir("models"):
-        if f.startswith("default_") and os.path.isfile(os.path.join("models", f)):
-            os.remove(os.path.join("models", f))
+    for path in delete_manifest_entries(is_default=True):
+        if os.path.exists(path):
+            os.remove(path)
 
-        # Clean up global dictionaries
+    # Clean up global dictionaries
     for model_id in list(models.keys()):
         if model_id.startswith("default_"):
-            if model_id in models:
-                del models[model_id]
-            if model_id in model_metadata:
-                del model_metadata[model_id]
-            if model_id in trained_model_features:
-                del trained_model_features[model_id]
+            registry.remove(model_id)
 
     # Define cross-validation
     kfold = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
+    folds = list(kfold.split(X_scaled, y))
+
+    # Every CV fold and every final fit is an independent task; models are registered
+    # in the given order so the outcome does not depend on completion order
+    order = order or list(ALGORITHMS)
+    workers = TRAINING_WORKERS if TRAINING_WORKERS > 0 else os.cpu_count()
+    if workers > 1:
+        logger.info(f"Training default models across {workers} processes")
+        with process_pool(workers) as executor:
+            tasks = submit_training_tasks(executor.submit, order, X_scaled, y, folds, X_train, y_train, X_test, y_test)
+            for algo_name in order:
+                register_default_model(algo_name, tasks[algo_name], (X_test, y_test))
+    else:
+        for algo_name in order:
+            tasks = submit_training_tasks(run_inline, [algo_name], X_scaled, y, folds, X_train, y_train, X_test, y_test)
+            register_default_model(algo_name, tasks[algo_name], (X_test, y_test))
+
+    # Only cache a complete suite so a failed algorithm is retried on the next start
+    if all(f"default_{algo_name}" in models for algo_name in ALGORITHMS):
+        save_default_models_cache()
+
+    if LOOKUP_TABLES:
+        start_lookup_table_build()
+
+
+def register_default_model(algo_name: str, tasks, validation: Tuple[np.ndarray, np.ndarray]):
+    """Wait for the training tasks of a default algorithm, then persist and register the model.
+    The validation split is used to check the compact artifact predicts like the trained model"""
+    model_id = f"default_{algo_name}"
+    fold_tasks, final_task = tasks
+
+    try:
+        cv_scores = [task.result() for task in fold_tasks]
+        model, test_accuracy = final_task.result()
+    except Exception as e:
+        logger.error(f"Error training {algo_name}: {e}")
+        warming_models.pop(model_id, None)
+        return
+
+    cv_mean = np.mean(cv_scores)
+
+    # Save model to disk
+    model_path = os.path.join(MODEL_DIR, f"{model_id}.pkl")
+    artifact = save_model_artifact(model, model_path, *validation)
+
+    # Store model
+    metadata = {
+        "id": model_id,
+        "name": default_model_name(algo_name),
+        "algorithm": algo_name,
+        "features": CORE_FEATURES,
+        "accuracy": round(test_accuracy, 4),
+        "cv_accuracy": round(cv_mean, 4),
+        "cv_scores": [round(float(score), 4) for score in cv_scores],
+        "created_at": datetime.now().isoformat(),
+        "is_default": True,
+        "artifact": artifact
+    }
+    save_manifest_entry(metadata, CORE_FEATURES, model_path)
+    with registry.lock:
+        registry.register(model_id, model, CORE_FEATURES, metadata)
+        warming_models.pop(model_id, None)
 
-    # Train each algorithm
-    for algo_name, algo_class in ALGORITHMS.items():
+    logger.info(f"Trained {algo_name} with accuracy: {test_accuracy:.4f}, CV accuracy: {cv_mean:.4f}")
+
+
+def default_model_name(algo_name: str) -> str:
+    """Display name of a default model, e.g. 'Random Forest'"""
+    return algo_name.replace("_", " ").title()
+
+
+def default_training_order() -> List[str]:
+    """Default algorithms with the configured priority ones first"""
+    priority = [algo_name for algo_name in DEFAULT_TRAINING_PRIORITY if algo_name in ALGORITHMS]
+    return priority + [algo_name for algo_name in ALGORITHMS if algo_name not in priority]
+
+
+def start_default_model_warmup() -> threading.Thread:
+    """Train the default models in priority order on a background thread while the API serves"""
+    order = default_training_order()
+
+    # Mark every model as warming before the thread starts so predict() never reports them as missing
+    with registry.lock:
+        for algo_name in order:
+            warming_models[f"default_{algo_name}"] = default_model_name(algo_name)
+
+    def warm():
         try:
-            logger.info(f"Training {algo_name} model...")
-
-            # Configure algorithm parameters based on notebook
-            if algo_name == "random_forest":
-                model = algo_class(n_estimators=100, criterion="gini",
-                                   max_depth=5,
-                                   min_samples_split=10, min_samples_leaf=1,
-                                   max_features='sqrt', random_state=42)
-            elif algo_name == "decision_tree":
-                model = algo_class(criterion="gini", max_depth=5, min_samples_split=10, random_state=42)
-            elif algo_name == "knn":
-                model = algo_class(n_neighbors=5, weights="uniform", algorithm="auto", p=2)  # Use 5 neighbors
-            elif algo_name == "svm":
-                model = algo_class(kernel="linear", C=0.025, probability=True, random_state=42)  # Use linear kernel
-            elif algo_name == "logistic_regression":
-                model = algo_class(penalty="l2", C=0.1, solver="lbfgs", max_iter=1000, random_state=42)
-            elif algo_name == "perceptron":
-                model = algo_class(penalty="l2", alpha=0.0001, max_iter=1000, tol=1e-3, random_state=42)
-            elif algo_name == "sgd":
-                model = algo_class(loss="modified_huber", penalty="l2", max_iter=1000, tol=1e-3, random_state=42)
-            elif algo_name == "gaussian_nb":
-                model = algo_class()
-            else:
-                model = algo_class(random_state=42 if hasattr(algo_class, "random_state") else None)
+            train_default_models(order=order)
+            logger.info("Default models warmed up")
+        except Exception as e:
+            logger.error(f"Error warming default models: {e}")
+        finally:
+            warming_models.clear()
+
+    thread = threading.Thread(target=warm, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def process_pool(workers: int, **kwargs) -> ProcessPoolExecutor:
+    """Process pool whose workers start from a clean forkserver process: forking this multithreaded
+    server could copy a lock another thread holds into the child and deadlock it"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver"), **kwargs)
 
-            # Cross validation
-            cv_scores = cross_val_score(model, X_scaled, y, cv=kfold, scoring="accuracy")
-            cv_mean = np.mean(cv_scores)
 
-            # Train final model on full training data
-            model.fit(X_train, y_train)
+def run_inline(fn, *args) -> Future:
+    """Run a training task in the current process, returning it as a completed Future"""
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def score_cv_fold(algo_name, params, X, y, train_idx, test_idx):
+    """Fit one cross-validation fold and return its accuracy"""
+    model = ALGORITHMS[algo_name](**params)
+    model.fit(X[train_idx], y[train_idx])
+    return accuracy_score(y[test_idx], model.predict(X[test_idx]))
+
+
+def fit_final_model(algo_name, params, X_train, y_train, X_test, y_test):
+    """Fit a model on the training split and return it with its hold-out accuracy"""
+    model = ALGORITHMS[algo_name](**params)
+    model.fit(X_train, y_train)
+    return model, accuracy_score(y_test, model.predict(X_test))
+
+
+def submit_training_tasks(submit, order, X, y, folds, X_train, y_train, X_test, y_test):
+    """Submit the CV folds and the final fit of the given default algorithms"""
+    tasks = {}
+    for algo_name in order:
+        # Configure algorithm parameters based on notebook
+        params = DEFAULT_MODEL_PARAMS.get(algo_name, {})
+        logger.info(f"Training {algo_name} model...")
+        tasks[algo_name] = (
+            [submit(score_cv_fold, algo_name, params, X, y, train_idx, test_idx) for train_idx, test_idx in folds],
+            submit(fit_final_model, algo_name, params, X_train, y_train, X_test, y_test)
+        )
+    return tasks
+
+
+def hash_data_files(digest):
+    """Feed the raw CSV files into a hashlib digest"""
+    for path in DATA_FILES:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+
+
+def connect_manifest() -> sqlite3.Connection:
+    """Connect to the model manifest, creating it (and migrating legacy models) on first use"""
+    global manifest_ready
+
+    with manifest_lock:
+        if not manifest_ready:
+            created = init_manifest()
+            manifest_ready = True
+            if created:
+                migrate_legacy_models()
+
+    return sqlite3.connect(MODEL_MANIFEST_PATH)
+
+
+def init_manifest() -> bool:
+    """Create the model manifest if needed; returns whether it was just created"""
+    os.makedirs(os.path.dirname(MODEL_MANIFEST_PATH) or ".", exist_ok=True)
+    created = not os.path.exists(MODEL_MANIFEST_PATH)
+
+    conn = sqlite3.connect(MODEL_MANIFEST_PATH)
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS models (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                algorithm TEXT NOT NULL,
+                is_default INTEGER NOT NULL,
+                features TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                model_path TEXT NOT NULL,
+                model_sha256 TEXT NOT NULL,
+                scaler_path TEXT,
+                scaler_sha256 TEXT,
+                accuracy REAL,
+                cv_accuracy REAL,
+                created_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS models_is_default ON models (is_default)")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                record TEXT NOT NULL,
+                submitted_at TEXT NOT NULL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_kind ON jobs (kind, submitted_at)")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+        ''')
+    conn.close()
+
+    return created
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_manifest_entry(metadata: Dict[str, Any], features: List[str], model_path: str,
+                        scaler_path: Optional[str] = None):
+    """Record a model whose artifacts are already on disk; one transaction, so readers see all or nothing.
+    Returns the model artifact's path and checksum"""
+    model_sha256 = file_sha256(model_path)
+    conn = connect_manifest()
+    with conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO models (id, name, algorithm, is_default, features, metadata, model_path,
+                model_sha256, scaler_path, scaler_sha256, accuracy, cv_accuracy, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            metadata["id"], metadata["name"], metadata["algorithm"], int(metadata["is_default"]),
+            json.dumps(features), json.dumps(metadata), model_path, model_sha256,
+            scaler_path, file_sha256(scaler_path) if scaler_path else None,
+            metadata["accuracy"], metadata.get("cv_accuracy"), metadata["created_at"]
+        ))
+    conn.close()
+
+    return {"model_path": model_path, "model_sha256": model_sha256}
+
+
+def load_manifest_entry(model_id: str) -> Optional[Dict[str, Any]]:
+    """The manifest entry of one model, including the scaler checksum"""
+    conn = connect_manifest()
+    conn.row_factory = sqlite3.Row
+    row = conn.execute('''
+        SELECT id, features, metadata, model_path, model_sha256, scaler_path, scaler_sha256
+        FROM models WHERE id = ?
+    ''', (model_id,)).fetchone()
+    conn.close()
+
+    if row is None:
+        return None
+    return {**dict(row), "features": json.loads(row["features"]), "metadata": json.loads(row["metadata"])}
+
+
+def load_manifest_entries(is_default: bool) -> List[Dict[str, Any]]:
+    """Default or custom models recorded in the manifest, oldest first"""
+    conn = connect_manifest()
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute('''
+        SELECT id, features, metadata, model_path, model_sha256, scaler_path
+        FROM models WHERE is_default = ? ORDER BY created_at, id
+    ''', (int(is_default),)).fetchall()
+    conn.close()
+
+    return [{**dict(row), "features": json.loads(row["features"]), "metadata": json.loads(row["metadata"])}
+            for row in rows]
+
+
+def delete_manifest_entries(model_id: Optional[str] = None, is_default: Optional[bool] = None) -> List[str]:
+    """Remove one model, or every default or custom model, from the manifest; returns their artifact paths.
+    Removing default models also forgets the default cache key, so a partial suite is never reused"""
+    conn = connect_manifest()
+    with conn:
+        if model_id is not None:
+            where, args = "id = ?", (model_id,)
+        else:
+            where, args = "is_default = ?", (int(is_default),)
+        rows = conn.execute(f"SELECT model_path, scaler_path FROM models WHERE {where}", args).fetchall()
+        conn.execute(f"DELETE FROM models WHERE {where}", args)
+        if is_default:
+            conn.execute("DELETE FROM settings WHERE key = 'default_cache_key'")
+    conn.close()
+
+    return [path for row in rows for path in row if path]
+
+
+def get_manifest_setting(key: str) -> Optional[str]:
+    conn = connect_manifest()
+    row = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def set_manifest_setting(key: str, value: str):
+    conn = connect_manifest()
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, value))
+    conn.close()
+
+
+def load_artifact(path: str, sha256: str):
+    """Load a joblib artifact after checking it against the checksum in the manifest"""
+    started = time.perf_counter()
+    if file_sha256(path) != sha256:
+        raise ValueError(f"Checksum mismatch for {path}")
+
+    model = joblib.load(path)
+    if isinstance(model, CompactArtifact):
+        model = model.restore()
+
+    artifact_load_seconds[path] = time.perf_counter() - started
+    return model
+
+
+class CompactArtifact:
+    """Compact on-disk form of a fitted model, restored by load_artifact.
+
+    When float32 is enabled, the large float64 arrays (coefficients, Gaussian NB statistics, SVM
+    support vectors, KNN training points) are stored as float32. A KNN's KD or ball tree holds its
+    own copy of the training points, so it is left out and rebuilt from them. Decision trees and
+    forests are pickled unchanged and rely on compression alone. restore() converts everything
+    back to float64, which is what sklearn predicts with.
+    """
+
+    FLOAT32_ATTRIBUTES = ("coef_", "theta_", "var_", "support_vectors_", "_fit_X")
+    NEIGHBOR_TREES = {"kd_tree": KDTree, "ball_tree": BallTree}
+
+    def __init__(self, model, float32: bool):
+        self.float32 = []
+        self.model = self.compact(model, float32)
+
+    def compact(self, model, float32: bool):
+        shell = copy.copy(model)
+        if isinstance(model, KNeighborsClassifier) and model._fit_method in self.NEIGHBOR_TREES:
+            shell._tree = None
+        if float32:
+            for name in self.FLOAT32_ATTRIBUTES:
+                value = vars(model).get(name)
+                if isinstance(value, np.ndarray) and value.dtype == np.float64:
+                    setattr(shell, name, value.astype(np.float32))
+                    self.float32.append(name)
+        return shell
+
+    def restore(self):
+        model = self.model
+        for name in self.float32:
+            setattr(model, name, np.ascontiguousarray(getattr(model, name), dtype=np.float64))
+
+        # Same construction as KNeighborsClassifier.fit, over the restored training points
+        if isinstance(model, KNeighborsClassifier) and model._fit_method in self.NEIGHBOR_TREES:
+            model._tree = self.NEIGHBOR_TREES[model._fit_method](
+                model._fit_X, model.leaf_size, metric=model.effective_metric_, **model.effective_metric_params_)
+        return model
+
+
+def save_model_artifact(model, path: str, X_check: np.ndarray, y_check: np.ndarray) -> Dict[str, Any]:
+    """Write a model as a compressed CompactArtifact and return its artifact metadata.
+
+    The compact model must predict the same labels as the float64 model on the check rows;
+    otherwise float32 storage is dropped for this model.
+    """
+    reference = model.predict(X_check)
+    parity = None
+    for float32 in ([True, False] if ARTIFACT_FLOAT32 else [False]):
+        artifact = CompactArtifact(model, float32)
+        restored = pickle.loads(pickle.dumps(artifact)).restore()
+        compact_predictions = restored.predict(X_check)
+        parity = {
+            "rows": len(X_check),
+            "label_agreement": float(np.mean(compact_predictions == reference)),
+            "accuracy": round(accuracy_score(y_check, reference), 4),
+            "compact_accuracy": round(accuracy_score(y_check, compact_predictions), 4)
+        }
+        if parity["label_agreement"] == 1.0:
+            break
+        logger.warning(f"float32 storage changes predictions of {path}, keeping float64")
+
+    joblib.dump(artifact, path, compress=ARTIFACT_COMPRESSION)
+    return {
+        "path": path,
+        "format": "compact",
+        "float32": artifact.float32,
+        "compression": ARTIFACT_COMPRESSION,
+        "disk_bytes": os.path.getsize(path),
+        "parity": parity
+    }
 
-            # Calculate accuracy on test set
-            y_pred = model.predict(X_test)
-            test_accuracy = accuracy_score(y_test, y_pred)
 
-            # Store model
-            model_id = f"default_{algo_name}"
-            models[model_id] = model
-            trained_model_features[model_id] = core_features
-            model_accuracy[model_id] = round(test_accuracy, 4)
-            model_metadata[model_id] = {
+def migrate_legacy_models():
+    """Record models saved before the manifest existed; runs once, when the manifest is created"""
+    if os.path.exists(LEGACY_DEFAULT_CACHE_PATH):
+        try:
+            with open(LEGACY_DEFAULT_CACHE_PATH) as f:
+                cache = json.load(f)
+            for model_id, metadata in cache["models"].items():
+                save_manifest_entry(metadata, metadata["features"], os.path.join(MODEL_DIR, f"{model_id}.pkl"))
+            set_manifest_setting("default_cache_key", cache["cache_key"])
+            os.remove(LEGACY_DEFAULT_CACHE_PATH)
+        except Exception as e:
+            logger.warning(f"Could not migrate the default model cache: {e}")
+
+    if not os.path.isdir(MODEL_DIR):
+        return
+    for model_file in os.listdir(MODEL_DIR):
+        if not model_file.startswith("custom_") or not model_file.endswith(".pkl") \
+                or model_file.endswith(("_scaler.pkl", "_features.pkl")):
+            continue
+
+        model_id = model_file[:-len(".pkl")]
+        model_path = os.path.join(MODEL_DIR, model_file)
+        scaler_path = os.path.join(MODEL_DIR, f"{model_id}_scaler.pkl")
+        features_path = os.path.join(MODEL_DIR, f"{model_id}_features.pkl")
+        try:
+            with open(features_path, "rb") as f:
+                features = pickle.load(f)
+
+            # Recompute the test accuracy on the same split run_training used
+            if train_df is None:
+                load_dataset()
+            model, scaler = joblib.load(model_path), joblib.load(scaler_path)
+            X_scaled = scaler.transform(train_df[features])
+            _, X_test, _, y_test = train_test_split(X_scaled, train_df['Survived'], test_size=0.2, random_state=42)
+
+            save_manifest_entry({
                 "id": model_id,
-                "name": algo_name.replace("_", " ").title(),
-                "algorithm": algo_name,
-                "features": core_features,
-                "accuracy": round(test_accuracy, 4),
-                "cv_accuracy": round(cv_mean, 4),
-                "created_at": datetime.now().isoformat(),
-                "is_default": True
-            }
+                "name": model_id.replace("custom_", "").rsplit("_", 2)[0].replace("_", " ").title(),
+                "algorithm": next((name for name, algo in ALGORITHMS.items() if type(model) is algo), "unknown"),
+                "features": features,
+                "accuracy": round(accuracy_score(y_test, model.predict(X_test)), 4),
+                "created_at": datetime.fromtimestamp(os.path.getmtime(model_path)).isoformat(),
+                "is_default": False
+            }, features, model_path, scaler_path)
+            os.remove(features_path)
+            logger.info(f"Migrated legacy model {model_id} to the manifest")
+        except Exception as e:
+            logger.warning(f"Could not migrate legacy model {model_id}: {e}")
+
+
+def default_models_cache_key() -> str:
+    """Hash the training data, default hyperparameters and library versions"""
+    digest = hashlib.sha256()
+
+    # Preprocessing statistics are computed over both files, so both are part of the key
+    hash_data_files(digest)
+
+    config = {
+        "params": DEFAULT_MODEL_PARAMS,
+        "features": CORE_FEATURES,
+        "dataset_version": DATASET_CACHE_VERSION,
+        "versions": {
+            "python": platform.python_version(),
+            "sklearn": sklearn.__version__,
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "joblib": joblib.__version__
+        }
+    }
+    digest.update(json.dumps(config, sort_keys=True).encode())
+
+    return digest.hexdigest()
 
 
-            # Save model to disk
-            model_path = f"models/{model_id}.pkl"
-            # features_path = f"models/{model_id}_features.pkl"
-            # metadata_path = f"models/{model_id}_metadata.pkl"
+def save_default_models_cache():
+    """Record the cache key of the trained default models; their entries are already in the manifest"""
+    cache_key = default_models_cache_key()
+    set_manifest_setting("default_cache_key", cache_key)
+    logger.info(f"Saved default model cache with key {cache_key[:12]}")
 
-            joblib.dump(model, model_path)
 
-            # with open(features_path, "wb") as f:
-            #     pickle.dump(feature_columns, f)
-            #
-            # with open(metadata_path, "wb") as f:
-            #     pickle.dump(model_metadata, f)
+def load_default_models_from_cache() -> bool:
+    """Load the default models from disk if the cache key still matches"""
+    try:
+        cache_key = default_models_cache_key()
+        if get_manifest_setting("default_cache_key") != cache_key:
+            logger.info("Default model cache is missing or stale, retraining")
+            return False
 
-            logger.info(f"Trained {algo_name} with accuracy: {test_accuracy:.4f}, CV accuracy: {cv_mean:.4f}")
+        entries = load_manifest_entries(is_default=True)
+        if {entry["id"] for entry in entries} != {f"default_{algo_name}" for algo_name in ALGORITHMS}:
+            logger.info("Default model cache is incomplete, retraining")
+            return False
+
+        loaded = {entry["id"]: load_artifact(entry["model_path"], entry["model_sha256"]) for entry in entries}
+
+    except Exception as e:
+        logger.warning(f"Could not load default model cache: {e}")
+        return False
+
+    for entry in entries:
+        registry.register(entry["id"], loaded[entry["id"]], entry["features"], entry["metadata"])
+
+    logger.info(f"Loaded {len(loaded)} default models from cache {cache_key[:12]}")
+    return True
+
+
+def load_custom_models():
+    """Register the custom models recorded in the manifest; each is loaded on first use"""
+    for entry in load_manifest_entries(is_default=False):
+        model_id = entry["id"]
+        registry.register(model_id, None, entry["features"], entry["metadata"])
+        lazy_models.add(model_id, manifest_loader(entry))
+        logger.info(f"Registered custom model: {model_id}")
+
+
+def interrupt_jobs():
+    """Mark the training and tuning jobs a previous run never finished as failed"""
+    for jobs in (training_jobs, tuning_jobs):
+        jobs.interrupt()
 
-        except Exception as e:
-            logger.error(f"Error training {algo_name}: {e}")
 
+def manifest_loader(entry: Dict[str, Any]):
+    """Load function of a manifest entry for LazyModelCache"""
+    return lambda: load_artifact(entry["model_path"], entry["model_sha256"])
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize models on startup - training default models fresh each time"""
+    """Initialize models on startup - reusing cached default models when nothing changed"""
     global models, model_metadata, trained_model_features
 
     logger.info("Starting Model Backend...")
 
-    # Always train default models fresh at startup
-    train_default_models()
+    # Serving workers map the models the parent process published instead of loading their own
+    if SERVING_WORKERS > 1 and os.getenv("MODEL_CATALOG_WORKER") == "1":
+        model_catalog.sync(registry)
+        start_catalog_sync()
+        start_idle_eviction(lazy_models)
+        return
 
-    # Load any custom models
-    if os.path.exists("models"):
-        for model_file in os.listdir("models"):
-            if model_file.endswith(".pkl") and not model_file.endswith("_scaler.pkl") and not model_file.endswith(
-                    "_features.pkl"):
-                model_id = model_file.replace(".pkl", "")
+    # Only retrain default models when the data, hyperparameters or library versions changed
+    cache_hit = load_default_models_from_cache()
+    if not cache_hit and STARTUP_MODE != "background":
+        train_default_models()
+    elif cache_hit and LOOKUP_TABLES:
+        start_lookup_table_build()
 
-                # Skip default models as we just trained them
-                if model_id.startswith("default_"):
-                    continue
-
-                try:
-                    model = joblib.load(f"models/{model_file}")
-                    models[model_id] = model
-
-                    # Load associated features
-                    features_path = f"models/{model_id}_features.pkl"
-                    if os.path.exists(features_path):
-                        with open(features_path, "rb") as f:
-                            trained_model_features[model_id] = pickle.load(f)
-                        logger.info(f"Loaded custom model: {model_id}")
-                    else:
-                        logger.warning(f"No feature list found for {model_id}; using fallback")
-                        trained_model_features[model_id] = [
-                            'Pclass', 'Sex_encoded', 'Age', 'Fare',
-                            'Embarked_encoded', 'Title_encoded'
-                        ]
-
-                    # Create metadata for custom model
-                    if model_id not in model_metadata:
-                        model_metadata[model_id] = {
-                            "id": model_id,
-                            "name": model_id.replace("custom_", "").replace("_", " ").title(),
-                            "algorithm": model_id.split("_")[1] if len(model_id.split("_")) > 1 else "unknown",
-                            "features": trained_model_features[model_id],
-                            "accuracy": model_accuracy[model_id],  # Default
-                            "created_at": datetime.now().isoformat(),
-                            "is_default": False
-                        }
+    load_custom_models()
+    interrupt_jobs()
+    start_idle_eviction(lazy_models)
 
-                except Exception as e:
-                    logger.error(f"Error loading custom model {model_id}: {e}")
+    # In background mode the port is bound right away and default models become ready one by one
+    if not cache_hit and STARTUP_MODE == "background":
+        start_default_model_warmup()
 
 
 @app.get("/")
@@ -467,87 +2824,136 @@ async def health_check():
     return {"status": "healthy", "models_loaded": len(models)}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Report which default models are ready; 503 while any are still warming up"""
+    pending = list(warming_models)
+    ready = list(model_metadata)
+    body = {
+        "status": "warming" if pending else "ready",
+        "ready_models": ready,
+        "warming_models": pending
+    }
+    return JSONResponse(status_code=503 if pending else 200, content=body)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Runtime counters of the inference path"""
+    return {
+        "prediction_cache": prediction_cache.stats(),
+        "lookup_tables": lookup_tables.stats(),
+        "prediction_batching": prediction_batcher.stats(),
+        "inference_executor": inference_executor.stats(),
+        "model_catalog": model_catalog.stats(),
+        "custom_models": lazy_models.stats(),
+        "dataset_memory": {key: value for key, value in dataset_memory.items() if key != "columns"}
+    }
+
+
+async def run_inference(fn, *args):
+    """Run CPU-bound work on the inference executor so the event loop keeps serving"""
+    return await asyncio.wrap_future(inference_executor.submit(fn, *args))
+
+
+def overloaded(error: InferenceQueueFull) -> HTTPException:
+    """503 telling the client when to retry a request the inference executor had no room for"""
+    logger.warning(f"Rejecting request: {error}")
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": str(INFERENCE_RETRY_AFTER)})
+
+
+def score_passenger(X: np.ndarray, pending: Dict[str, Tuple[str, Any]], linear: LinearScorer,
+                    trees: Dict[str, TreeEnsemble]) -> Dict[str, Dict[str, Any]]:
+    """Run the models of a prediction request over its feature row; linear models share one matmul"""
+    results, decision = {}, None
+    for model_name, (model_id, columns) in pending.items():
+        try:
+            if model_id in linear.position:
+                if decision is None:
+                    decision = linear.decision(X)
+                results[model_name] = format_predictions(*linear.predict(model_id, decision))[0]
+            elif model_id in trees:
+                results[model_name] = format_predictions(*trees[model_id].predict(X[:, columns]))[0]
+            else:
+                results[model_name] = predict_rows(lazy_models.get(model_id), model_name, X[:, columns])[0]
+        except Exception as e:
+            logger.error(f"Error predicting with {model_name}: {e}")
+            results[model_name] = {
+                "prediction": "Error",
+                "error": str(e)
+            }
+    return results
+
+
 @app.post("/api/predict", response_model=PredictionResponse)
 async def predict(request: PredictionRequest):
     """Make survival predictions using specified models"""
     try:
         if train_df is None:
-            load_dataset()
+            await run_inference(load_dataset)
 
         logger.info(f"Received prediction request for models: {request.model_names}")
 
-        # Preprocess passenger data to standard format
-        passenger_features = preprocess_passenger_data(request.passenger)
-        logger.info(f"Processed passenger features: {list(passenger_features.columns)}")
+        # Preprocess passenger data to a single feature row
+        X = preprocess_passenger_data(request.passenger)[np.newaxis, :]
 
         predictions = {}
+        # Read cache versions before the model snapshots so results of replaced models are never stored
+        cache_versions = prediction_cache.versions.copy()
+        linear, trees = registry.linear, registry.trees
+        pending, coalesced = {}, {}
 
         for model_name in request.model_names:
             try:
-                # Find the model by name or ID
-                model_id = None
-                for mid, metadata in model_metadata.items():
-                    if model_name.lower() == metadata["name"].lower() or model_name == mid:
-                        model_id = mid
-                        break
+                model_id, error = resolve_model(model_name)
+                if error:
+                    predictions[model_name] = error
+                    continue
 
-                if not model_id or model_id not in models:
-                    logger.warning(f"Model not found: {model_name}")
-                    predictions[model_name] = {
-                        "prediction": "Error",
-                        "error": f"Model '{model_name}' not found"
-                    }
+                columns, error = registry.columns[model_id]
+                if error:
+                    predictions[model_name] = error
                     continue
 
-                model = models[model_id]
-
-                # Get the exact features this model was trained on
-                model_features = trained_model_features.get(model_id)
-                if not model_features:
-                    logger.warning(f"No feature list for model {model_id}, using basic features")
-                    model_features = ['Pclass', 'Sex_encoded', 'Age', 'Fare', 'Embarked_encoded', 'Title_encoded']
-
-                # Extract only the features this model was trained on
-                available_features = [f for f in model_features if f in passenger_features.columns]
-                if len(available_features) < len(model_features):
-                    logger.warning(f"Missing features for {model_id}: {set(model_features) - set(available_features)}")
-
-                if len(available_features) < 3:
-                    logger.error(f"Not enough features available for {model_id}")
-                    predictions[model_name] = {
-                        "prediction": "Error",
-                        "error": "Not enough features available"
-                    }
+                # Repeated passenger profiles are answered from the prediction cache
+                cache_key = prediction_cache.key(model_id, X[0])
+                cached = prediction_cache.get(cache_key)
+                if cached is not None:
+                    predictions[model_name] = cached
                     continue
 
-                # Create a new dataframe with only the needed features, without feature names
-                # This prevents the sklearn warning about feature names
-                X = passenger_features[available_features].values
+                table = lookup_tables.lookup(model_id, X)
+                if table is not None:
+                    predictions[model_name] = format_predictions(*table)[0]
+                    prediction_cache.put(cache_key, predictions[model_name], cache_versions.get(model_id, 0))
+                    continue
 
-                # Make prediction
-                prediction = int(model.predict(X)[0])
+                pending[model_name] = (model_id, columns)
+                if PREDICTION_BATCHING:
+                    coalesced[model_name] = prediction_batcher.submit(model_id, model_name, X[0])
 
-                # Get probability if available
-                probability = None
-                if hasattr(model, "predict_proba"):
-                    try:
-                        proba = model.predict_proba(X)[0]
-                        probability = {
-                            "survived": float(proba[1]),
-                            "died": float(proba[0])
-                        }
-                    except Exception as e:
-                        logger.warning(f"Could not get probability for {model_name}: {e}")
-
-                # Store prediction result
+            except Exception as e:
+                logger.error(f"Error predicting with {model_name}: {e}")
                 predictions[model_name] = {
-                    "prediction": "Survived" if prediction == 1 else "Did not survive",
-                    "prediction_value": prediction,
-                    "probability": probability
+                    "prediction": "Error",
+                    "error": str(e)
                 }
 
-                logger.info(f"Successful prediction with {model_name}: {prediction}")
+        # Run the remaining models, either coalesced with other requests or together on the executor
+        computed = {}
+        if pending and not PREDICTION_BATCHING:
+            computed = await run_inference(score_passenger, X, pending, linear, trees)
 
+        for model_name, (model_id, _) in pending.items():
+            try:
+                result = await coalesced[model_name] if PREDICTION_BATCHING else computed[model_name]
+                predictions[model_name] = result
+                if result.get("prediction") == "Error":
+                    continue
+                prediction_cache.put(prediction_cache.key(model_id, X[0]), result, cache_versions.get(model_id, 0))
+                logger.info(f"Successful prediction with {model_name}: {result['prediction_value']}")
+            except InferenceQueueFull:
+                raise
             except Exception as e:
                 logger.error(f"Error predicting with {model_name}: {e}")
                 predictions[model_name] = {
@@ -555,36 +2961,115 @@ async def predict(request: PredictionRequest):
                     "error": str(e)
                 }
 
+        # Keep the requested model order
+        predictions = {model_name: predictions[model_name] for model_name in request.model_names}
         return PredictionResponse(predictions=predictions)
 
+    except InferenceQueueFull as e:
+        raise overloaded(e)
     except Exception as e:
         logger.error(f"Error making prediction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(request: BatchPredictionRequest):
+    """Make survival predictions for many passengers, running each model once over all of them"""
+    if len(request.passengers) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch size is limited to {MAX_BATCH_SIZE} passengers")
+
+    try:
+        return await run_inference(run_batch_prediction, request)
+
+    except InferenceQueueFull as e:
+        raise overloaded(e)
+    except Exception as e:
+        logger.error(f"Error making batch prediction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def run_batch_prediction(request: BatchPredictionRequest) -> BatchPredictionResponse:
+    """Score a batch prediction request (blocking, runs on the inference executor)"""
+    if train_df is None:
+        load_dataset()
+
+    logger.info(f"Received batch prediction request for {len(request.passengers)} passengers "
+                f"and models: {request.model_names}")
+
+    predictions = [{} for _ in request.passengers]
+    linear, trees, decision = registry.linear, registry.trees, None
+
+    # Build one feature matrix; passengers that fail to preprocess only affect their own result
+    passenger_matrix, row_positions, row_errors = preprocess_passengers(request.passengers)
+    for position, error in row_errors.items():
+        predictions[position] = {
+            model_name: {"prediction": "Error", "error": error} for model_name in request.model_names
+        }
+
+    for model_name in request.model_names:
+        model_id, error = resolve_model(model_name)
+        if not error:
+            columns, error = registry.columns[model_id]
+
+        if error:
+            for position in row_positions:
+                predictions[position][model_name] = error
+            continue
+
+        X = passenger_matrix[:, columns]
+        try:
+            table = lookup_tables.lookup(model_id, passenger_matrix) if len(X) else None
+            if not len(X):
+                results = []
+            elif table is not None:
+                results = format_predictions(*table)
+            elif model_id in linear.position:
+                if decision is None:
+                    decision = linear.decision(passenger_matrix)
+                results = format_predictions(*linear.predict(model_id, decision))
+            elif model_id in trees:
+                results = format_predictions(*trees[model_id].predict(X))
+            else:
+                results = predict_rows(lazy_models.get(model_id), model_name, X)
+        except Exception as e:
+            # Fall back to one row at a time so a bad row does not fail the whole batch
+            logger.warning(f"Batch prediction with {model_name} failed, isolating rows: {e}")
+            results = []
+            for i in range(len(X)):
+                try:
+                    results.append(predict_rows(lazy_models.get(model_id), model_name, X[i:i + 1])[0])
+                except Exception as row_error:
+                    results.append({"prediction": "Error", "error": str(row_error)})
+
+        for position, result in zip(row_positions, results):
+            predictions[position][model_name] = result
+
+    return BatchPredictionResponse(predictions=predictions)
+
+
 @app.get("/api/models", response_model=List[ModelInfo])
 async def get_models(custom_only: bool = False, default_only: bool = False):
     """Get list of all available models with optional filtering"""
     if custom_only:
-        result = [metadata for model_id, metadata in model_metadata.items() if not metadata["is_default"]]
+        result = registry.list(is_default=False)
     elif default_only:
-        result = [metadata for model_id, metadata in model_metadata.items() if metadata["is_default"]]
+        result = registry.list(is_default=True)
     else:
         # Default behavior: return all models
-        result = list(model_metadata.values())
+        result = registry.list()
 
     return result
 
 @app.get("/api/models/default", response_model=List[ModelInfo])
 async def get_default_models():
     """Get list of default models only"""
-    default_models = [metadata for model_id, metadata in model_metadata.items() if metadata["is_default"]]
+    default_models = registry.list(is_default=True)
     return default_models
 
 @app.get("/api/models/custom", response_model=List[ModelInfo])
 async def get_custom_models():
     """Get list of custom models only"""
-    custom_models = [metadata for model_id, metadata in model_metadata.items() if not metadata["is_default"]]
+    custom_models = registry.list(is_default=False)
     return custom_models
 
 
@@ -592,7 +3077,10 @@ async def get_custom_models():
 async def get_features():
     """Get list of available features for training"""
     if train_df is None:
-        load_dataset()
+        try:
+            await run_inference(load_dataset)
+        except InferenceQueueFull as e:
+            raise overloaded(e)
 
     features = [
         {"name": "Pclass", "description": "Passenger class (1st, 2nd, 3rd)"},
@@ -612,120 +3100,726 @@ async def get_features():
     return {"features": features}
 
 
+@app.post("/api/data/ingest")
+async def ingest_data(file: UploadFile = File(...)):
+    """Append a passenger CSV (Titanic train.csv columns, Survived optional) to the ingested training data.
+    The upload is parsed in chunks of INGEST_CHUNK_ROWS rows, so memory does not grow with its size"""
+    try:
+        # Not on the training executor, so uploads never queue behind training jobs; the store's file
+        # lock keeps concurrent uploads from interleaving
+        return await run_in_threadpool(ingest_store.ingest, file.file, file.filename)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error ingesting {file.filename}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/data")
+async def get_ingested_data():
+    """Size, uploads and streaming feature statistics of the ingested training data"""
+    return ingest_store.summary()
+
+
+def validate_training_request(request: TrainModelRequest) -> List[str]:
+    """Check the requested algorithm and map the requested features to dataset columns"""
+    if request.algorithm not in ALGORITHMS:
+        raise HTTPException(status_code=400, detail=f"Algorithm '{request.algorithm}' not supported")
+
+    feature_columns = [FEATURE_MAPPING[f] for f in request.features if f in FEATURE_MAPPING]
+
+    if not feature_columns:
+        raise HTTPException(status_code=400, detail="No valid features specified")
+
+    return feature_columns
+
+
+def run_training(request: TrainModelRequest, progress: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Train, persist and register a custom model (blocking, runs on a training thread)"""
+    if request.out_of_core:
+        return run_out_of_core_training(request, progress if progress is not None else {})
+
+    if train_df is None:
+        load_dataset()
+
+    feature_columns = validate_training_request(request)
+
+    X = train_df[feature_columns]
+    y = train_df['Survived']
+
+    # Feature scaling
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+
+    # Define cross-validation
+    kfold = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
+
+    # Create and train model
+    algo_class = ALGORITHMS[request.algorithm]
+    model = algo_class(**CUSTOM_MODEL_PARAMS.get(request.algorithm, {}))
+
+    # Cross validation
+    cv_scores = cross_val_score(model, X_scaled, y, cv=kfold, scoring="accuracy")
+    cv_mean = np.mean(cv_scores)
+
+    # Train final model
+    model.fit(X_train, y_train)
+
+    # Calculate accuracy
+    y_pred = model.predict(X_test)
+    test_accuracy = accuracy_score(y_test, y_pred)
+
+    return save_custom_model(request, model, scaler, feature_columns, test_accuracy, cv_mean, X_test, y_test.values)
+
+
+def save_custom_model(request: TrainModelRequest, model, scaler: StandardScaler, feature_columns: List[str],
+                      test_accuracy: float, cv_mean: Optional[float], X_check: np.ndarray, y_check: np.ndarray,
+                      training: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Persist a trained custom model with its scaler, record it in the manifest and register it"""
+    # Generate unique model ID; jobs with the same name can finish within the same second
+    model_id = (f"custom_{request.model_name.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                f"_{uuid.uuid4().hex[:8]}")
+
+    metadata = {
+        "id": model_id,
+        "name": request.model_name,
+        "algorithm": request.algorithm,
+        "features": request.features,
+        "accuracy": round(test_accuracy, 4),
+        "cv_accuracy": round(cv_mean, 4) if cv_mean is not None else None,
+        "created_at": datetime.now().isoformat(),
+        "is_default": False
+    }
+    if training:
+        metadata["training"] = training
+
+    # Save model and scaler to disk, then record them in the manifest, before the model becomes visible
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    model_path = os.path.join(MODEL_DIR, f"{model_id}.pkl")
+    scaler_path = os.path.join(MODEL_DIR, f"{model_id}_scaler.pkl")
+    metadata["artifact"] = save_model_artifact(model, model_path, X_check, y_check)
+    joblib.dump(scaler, scaler_path, compress=ARTIFACT_COMPRESSION)
+    entry = save_manifest_entry(metadata, feature_columns, model_path, scaler_path)
+
+    # Register the model
+    registry.register(model_id, model, feature_columns, metadata)
+    lazy_models.add(model_id, manifest_loader(entry), model)
+
+    # Let the other serving workers map the new model
+    if SERVING_WORKERS > 1:
+        model_catalog.reference(model_id, entry, feature_columns, model_metadata[model_id])
+
+    return {
+        "message": f"Model '{request.model_name}' trained successfully",
+        "model_id": model_id,
+        "accuracy": test_accuracy,
+        "cv_accuracy": cv_mean,
+        "features_used": request.features
+    }
+
+
+def out_of_core_chunks(state: Dict[str, Any], engineer: FeatureEngineer, feature_columns: List[str]):
+    """Labeled rows of each ingested chunk as (X, y, is_test); the 20% hold-out is drawn per chunk
+    from a fixed seed, so every pass over the store sees the same split"""
+    for index, chunk in enumerate(ingest_store.chunks(state=state)):
+        labeled = chunk['Survived'].notna().to_numpy()
+        if not labeled.any():
+            yield index, None
+            continue
+
+        frame = engineer.transform(chunk.loc[labeled])
+        X = frame[feature_columns].to_numpy(dtype=np.float64)
+        y = frame['Survived'].to_numpy().astype(np.int64)
+        is_test = np.random.default_rng([42, index]).random(len(y)) < 0.2
+        yield index, (X, y, is_test)
+
+
+def run_out_of_core_training(request: TrainModelRequest, progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Train a custom model on the ingested data without loading it into memory (blocking, runs on a training thread).
+
+    The scaler is fitted in one streaming pass. Algorithms with partial_fit then train chunk by chunk;
+    the others fit on a stratified reservoir sample sized to OUT_OF_CORE_MEMORY_MB. A final pass
+    measures hold-out accuracy. progress is updated in place after every chunk.
+    """
+    feature_columns = validate_training_request(request)
+    with ingest_store.locked():
+        state = ingest_store.open()
+    engineer = state["statistics"].engineer()
+    total_chunks = len(state["chunks"])
+    incremental = request.algorithm in INCREMENTAL_ALGORITHMS
+
+    # Gaussian NB sums sufficient statistics, so a second epoch would count every row twice
+    epochs = 1 if request.algorithm == "gaussian_nb" or not incremental else OUT_OF_CORE_EPOCHS
+    progress.update({"pass": 0, "passes": epochs + 2, "chunks": total_chunks})
+
+    def scan(phase: str, epoch: int = 1):
+        progress.update({"phase": phase, "pass": progress["pass"] + 1, "epoch": epoch, "chunks_done": 0, "rows": 0})
+        for index, data in out_of_core_chunks(state, engineer, feature_columns):
+            if data is not None:
+                yield data
+                progress["rows"] += len(data[1])
+            progress["chunks_done"] = index + 1
+
+    # Pass 1: scaler statistics over every labeled row (as in-memory training does) and class counts
+    scaler = StandardScaler()
+    class_counts = {}
+    for X, y, is_test in scan("scaling"):
+        scaler.partial_fit(X)
+        for label, count in zip(*np.unique(y[~is_test], return_counts=True)):
+            class_counts[label] = class_counts.get(label, 0) + int(count)
+    if not class_counts:
+        raise HTTPException(status_code=400, detail="No labeled rows in the ingested data")
+
+    model = ALGORITHMS[request.algorithm](**CUSTOM_MODEL_PARAMS.get(request.algorithm, {}))
+    classes = np.array(sorted(class_counts))
+    training = {"mode": "out_of_core", "rows": sum(class_counts.values()), "chunks": total_chunks}
+    cv_mean = None
+
+    if incremental:
+        rng = np.random.default_rng(42)
+        for epoch in range(epochs):
+            for X, y, is_test in scan("training", epoch + 1):
+                order = rng.permutation(np.flatnonzero(~is_test))
+                if len(order):
+                    model.partial_fit(scaler.transform(X[order]), y[order], classes=classes)
+        training["epochs"] = epochs
+    else:
+        # Each class keeps a reservoir proportional to its share of the training rows
+        budget_rows = int(OUT_OF_CORE_MEMORY_MB * 1024 * 1024) // (8 * (len(feature_columns) + 1))
+        total = sum(class_counts.values())
+        sample = {
+            label: StratumReservoir(min(count, max(1, budget_rows * count // total)), len(feature_columns), int(label))
+            for label, count in class_counts.items()
+        }
+        for X, y, is_test in scan("sampling"):
+            for label, reservoir in sample.items():
+                reservoir.add(X[(y == label) & ~is_test])
+
+        X_sample = scaler.transform(np.concatenate([reservoir.rows() for reservoir in sample.values()]))
+        y_sample = np.concatenate([np.full(reservoir.size, label) for label, reservoir in sample.items()])
+        kfold = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
+        cv_mean = np.mean(cross_val_score(model, X_sample, y_sample, cv=kfold, scoring="accuracy"))
+        model.fit(X_sample, y_sample)
+        training["sample_rows"] = len(y_sample)
+        training["memory_budget_mb"] = OUT_OF_CORE_MEMORY_MB
+
+    # Final pass: hold-out accuracy, keeping a bounded slice of hold-out rows for the artifact parity check
+    correct, tested, X_check, y_check = 0, 0, [], []
+    for X, y, is_test in scan("evaluating"):
+        X_test = scaler.transform(X[is_test])
+        correct += int((model.predict(X_test) == y[is_test]).sum()) if len(X_test) else 0
+        tested += len(X_test)
+        if sum(len(rows) for rows in y_check) < MAX_BATCH_SIZE:
+            X_check.append(X_test)
+            y_check.append(y[is_test])
+
+    progress["phase"] = "saving"
+    return save_custom_model(request, model, scaler, feature_columns, correct / max(tested, 1), cv_mean,
+                             np.concatenate(X_check), np.concatenate(y_check), training)
+
+
+class StratumReservoir:
+    """Uniform sample of at most capacity rows from a stream of row blocks (reservoir sampling)"""
+
+    def __init__(self, capacity: int, width: int, seed: int):
+        self.buffer = np.empty((capacity, width))
+        self.size = 0
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, X: np.ndarray):
+        # Free slots are filled first; after that row i of the stream replaces a random slot with
+        # probability capacity / (i + 1), later rows winning repeated slots as in sequential sampling
+        fill = min(len(self.buffer) - self.size, len(X))
+        self.buffer[self.size:self.size + fill] = X[:fill]
+        self.size += fill
+        self.seen += fill
+
+        rest = X[fill:]
+        if len(rest):
+            slots = self.rng.integers(0, self.seen + np.arange(len(rest)) + 1)
+            keep = slots < len(self.buffer)
+            self.buffer[slots[keep]] = rest[keep]
+            self.seen += len(rest)
+
+    def rows(self) -> np.ndarray:
+        return self.buffer[:self.size]
+
+
+class MemoryTracker:
+    """Peak growth of the process's resident memory while a block runs, sampled from /proc/self/statm.
+
+    Sampling on a side thread leaves the training path untouched (tracemalloc slowed training several
+    times over). The measure is process-wide, so work running alongside a job is included.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.start = self.peak = None
+        self.peak_bytes = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    @staticmethod
+    def rss() -> Optional[int]:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            return None
+
+    def sample(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, self.rss())
+
+    def __enter__(self) -> "MemoryTracker":
+        self.start = self.peak = self.rss()
+        if self.start is not None:
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            self.stopped.set()
+            self.thread.join()
+            self.peak_bytes = max(self.peak, self.rss()) - self.start
+
+
+def run_training_job(job_id: str, request: TrainModelRequest) -> Dict[str, Any]:
+    """Run a queued training job and record its outcome"""
+    job = training_jobs[job_id]
+    with training_jobs.track(job):
+        job["status"] = "running"
+        job["started_at"] = datetime.now().isoformat()
+
+        tracker = MemoryTracker()
+        try:
+            with tracker:
+                result = run_training(request, job["progress"])
+            job["result"] = result
+            job["model_id"] = result["model_id"]
+            job["status"] = "completed"
+            logger.info(f"Training job {job_id} completed: {result['model_id']}")
+            return result
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            job["error"] = detail
+            job["status"] = "failed"
+            logger.error(f"Training job {job_id} failed: {detail}")
+            raise
+        finally:
+            job["peak_memory_bytes"] = tracker.peak_bytes
+            job["finished_at"] = datetime.now().isoformat()
+
+
+def submit_training_job(request: TrainModelRequest) -> Tuple[Dict[str, Any], Future]:
+    """Queue a training job on the training executor"""
+    validate_training_request(request)
+
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id,
+        "status": "queued",
+        "model_name": request.model_name,
+        "algorithm": request.algorithm,
+        "features": request.features,
+        "out_of_core": request.out_of_core,
+        "model_id": None,
+        "result": None,
+        "error": None,
+        "progress": {} if request.out_of_core else None,
+        "peak_memory_bytes": None,
+        "submitted_at": datetime.now().isoformat(),
+        "started_at": None,
+        "finished_at": None
+    }
+    training_jobs.add(job)
+
+    future = training_executor.submit(run_training_job, job_id, request)
+    logger.info(f"Queued training job {job_id} for model '{request.model_name}'")
+    return job, future
+
+
 @app.post("/api/train")
 async def train_model(request: TrainModelRequest):
     """Train a new model with specified features and algorithm"""
     try:
-        if train_df is None:
-            load_dataset()
-
-        if request.algorithm not in ALGORITHMS:
-            raise HTTPException(status_code=400, detail=f"Algorithm '{request.algorithm}' not supported")
-
-        # Map feature names to dataset columns
-        feature_mapping = {
-            "Pclass": "Pclass",
-            "Sex": "Sex_encoded",
-            "Age": "Age",
-            "SibSp": "SibSp",
-            "Parch": "Parch",
-            "Fare": "Fare",
-            "Embarked": "Embarked_encoded",
-            "Title": "Title_encoded",
-            "FamilySize": "FamilySize",
-            "IsAlone": "IsAlone",
-            "Age_Class": "Age_Class",
-            "CabinLetter": "Cabin_encoded",
-            "AgeBin": "AgeBin",
-            "FareBin": "FareBin",
-            "FamilySizeBin": "FamilySizeBin"
-        }
+        # Training runs on the training executor and the job is recorded in the manifest off the
+        # event loop, so the event loop keeps serving predictions
+        job, future = await run_in_threadpool(submit_training_job, request)
+        result = await asyncio.wrap_future(future)
+        return {**result, "job_id": job["id"]}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error training model: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        feature_columns = [feature_mapping[f] for f in request.features if f in feature_mapping]
 
-        if not feature_columns:
-            raise HTTPException(status_code=400, detail="No valid features specified")
+# Job endpoints read and write the manifest database, so they are plain functions that FastAPI runs
+# on its threadpool instead of on the event loop
+@app.post("/api/train/jobs", status_code=202)
+def create_training_job(request: TrainModelRequest):
+    """Submit a training job and return its ID immediately"""
+    job, _ = submit_training_job(request)
+    return {"job_id": job["id"], "status": job["status"]}
 
-        X = train_df[feature_columns]
-        y = train_df['Survived']
 
-        # Feature scaling
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
+@app.get("/api/train/jobs")
+def get_training_jobs():
+    """List training jobs, newest first"""
+    return training_jobs.list()
 
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
 
-        # Define cross-validation
-        kfold = StratifiedKFold(n_splits=10, shuffle=True, random_state=42)
+@app.get("/api/train/jobs/{job_id}")
+def get_training_job(job_id: str):
+    """Get the status and result of a training job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+
+    return job
+
+
+def halving_schedule(n_candidates: int, max_rows: int, factor: int, min_rows: int = 40) -> List[Tuple[int, int]]:
+    """(training rows per fit, candidates) of each successive-halving rung: every rung keeps the best
+    1/factor of the candidates and gives them factor times more rows, ending with all rows"""
+    rungs = 1
+    while factor ** rungs <= n_candidates:
+        rungs += 1
+    # Fewer rungs when the first one would fit too few rows to tell candidates apart
+    while rungs > 1 and max_rows // factor ** (rungs - 1) < min_rows:
+        rungs -= 1
+    return [(max_rows // factor ** (rungs - 1 - rung), math.ceil(n_candidates / factor ** rung)) for rung in range(rungs)]
+
+
+def init_tuning_worker(X: np.ndarray, y: np.ndarray, folds: List[Tuple[np.ndarray, np.ndarray]]):
+    """Process pool initializer: keep the search data and fold indices in the worker, so tasks only carry parameters"""
+    global tuning_data
+    tuning_data = (X, y, folds)
+
+
+def score_tuning_candidate(algo_name: str, params: Dict[str, Any], fold: int, rows: int, data=None) -> float:
+    """Fit a candidate on the first rows of a fold's (shuffled) training indices and score the whole validation fold"""
+    X, y, folds = data or tuning_data
+    train_idx, test_idx = folds[fold]
+    model = ALGORITHMS[algo_name](**params)
+    model.fit(X[train_idx[:rows]], y[train_idx[:rows]])
+    return accuracy_score(y[test_idx], model.predict(X[test_idx]))
+
+
+def tuning_candidates(request: TuneRequest) -> List[Dict[str, Any]]:
+    """Parameter sets of the search space grid, sampled down to max_candidates"""
+    grid = list(ParameterGrid(request.search_space))
+    max_candidates = request.max_candidates or TUNING_MAX_CANDIDATES
+    if len(grid) > max_candidates:
+        picked = np.random.default_rng(42).choice(len(grid), max_candidates, replace=False)
+        grid = [grid[i] for i in sorted(picked)]
+    return grid
+
 
-        # Create and train model
-        algo_class = ALGORITHMS[request.algorithm]
-        if request.algorithm == "random_forest":
-            model = algo_class(n_estimators=100, criterion="gini", max_depth=None, min_samples_split=2,
-                               min_samples_leaf=1, random_state=42)
-        elif request.algorithm == "decision_tree":
-            model = algo_class(criterion="gini", max_depth=None, random_state=42)
-        elif request.algorithm == "svm":
-            model = algo_class(kernel="rbf", gamma="auto", C=1.0, probability=True, random_state=42)
-        elif request.algorithm == "knn":
-            model = algo_class(n_neighbors=3, weights="uniform", algorithm="auto", p=2)
-        elif request.algorithm == "logistic_regression":
-            model = algo_class(penalty="l2", solver="lbfgs", max_iter=1000, random_state=42)
-        elif request.algorithm == "perceptron":
-            model = algo_class(penalty="l2", alpha=0.0001, max_iter=1000, tol=1e-3, random_state=42)
-        elif request.algorithm == "sgd":
-            model = algo_class(loss="modified_huber", penalty="l2", max_iter=1000, tol=1e-3, random_state=42)
-        elif request.algorithm == "gaussian_nb":
-            model = algo_class()
+def run_tuning(job: Dict[str, Any], request: TuneRequest, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Successive-halving search over the candidates, then train and register the best one
+    (blocking, runs on a training thread; candidate fits run on a process pool)"""
+    if train_df is None:
+        load_dataset()
+
+    train_request = TrainModelRequest(model_name=request.model_name, algorithm=request.algorithm,
+                                      features=request.features)
+    feature_columns = validate_training_request(train_request)
+
+    # Same preparation as run_training; the search only sees the training split
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(train_df[feature_columns])
+    y = train_df['Survived'].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+
+    # Fold indices are computed once and shared by every candidate; shuffling the training indices
+    # makes the first rows of each fold a random subsample for the early rungs
+    rng = np.random.default_rng(42)
+    kfold = StratifiedKFold(n_splits=TUNING_CV_FOLDS, shuffle=True, random_state=42)
+    folds = [(rng.permutation(train_idx), test_idx) for train_idx, test_idx in kfold.split(X_train, y_train)]
+
+    base_params = CUSTOM_MODEL_PARAMS.get(request.algorithm, {})
+    schedule = halving_schedule(len(candidates), min(len(train_idx) for train_idx, _ in folds), request.halving_factor)
+    job["progress"] = {"rung": 0, "rungs": len(schedule), "candidates": len(candidates)}
+
+    workers = min(TUNING_WORKERS, os.cpu_count()) if TUNING_WORKERS > 0 else os.cpu_count()
+    if workers > 1:
+        executor = process_pool(workers, initializer=init_tuning_worker, initargs=(X_train, y_train, folds))
+        submit = executor.submit
+    else:
+        executor = None
+        submit = lambda fn, *args: run_inline(fn, *args, (X_train, y_train, folds))
+
+    active, rows_fitted = list(range(len(candidates))), 0
+    try:
+        for rung, (rows, keep) in enumerate(schedule):
+            active = active[:keep]
+            job["progress"].update({"rung": rung + 1, "rows": rows, "candidates": len(active),
+                                    "tasks_done": 0, "tasks": len(active) * len(folds)})
+
+            tasks = {
+                index: [submit(score_tuning_candidate, request.algorithm, {**base_params, **candidates[index]}, fold, rows)
+                        for fold in range(len(folds))]
+                for index in active
+            }
+            scores = {}
+            for index, fold_tasks in tasks.items():
+                try:
+                    scores[index] = float(np.mean([task.result() for task in fold_tasks]))
+                except Exception as e:
+                    logger.warning(f"Tuning candidate {candidates[index]} failed: {e}")
+                job["progress"]["tasks_done"] += len(fold_tasks)
+            rows_fitted += len(active) * len(folds) * rows
+
+            # Best first; ties keep grid order so the search is deterministic
+            active = sorted(scores, key=lambda index: (-scores[index], index))
+            job["rungs"].append({
+                "rung": rung + 1,
+                "rows": rows,
+                "leaderboard": [{"params": candidates[index], "cv_accuracy": round(scores[index], 4)} for index in active]
+            })
+            if not active:
+                raise HTTPException(status_code=400, detail="Every candidate configuration failed")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    best = active[0]
+    params = {**base_params, **candidates[best]}
+    model, test_accuracy = fit_final_model(request.algorithm, params, X_train, y_train, X_test, y_test)
+
+    search = {
+        "candidates": len(candidates),
+        "rungs": len(schedule),
+        "halving_factor": request.halving_factor,
+        # Cost relative to evaluating the whole grid on all rows of every fold
+        "rows_fitted": rows_fitted,
+        "full_grid_rows": len(candidates) * len(folds) * schedule[-1][0],
+    }
+    search["cost_ratio"] = round(search["rows_fitted"] / search["full_grid_rows"], 4)
+    training = {"mode": "tuned", "params": candidates[best], "search": search}
+
+    result = save_custom_model(train_request, model, scaler, feature_columns, test_accuracy, scores[best],
+                               X_test, y_test, training)
+    return {**result, "params": candidates[best], "search": search}
+
+
+def run_tuning_job(job_id: str, request: TuneRequest, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Run a queued tuning job and record its outcome"""
+    job = tuning_jobs[job_id]
+    with tuning_jobs.track(job):
+        job["status"] = "running"
+        job["started_at"] = datetime.now().isoformat()
+
+        tracker = MemoryTracker()
+        try:
+            with tracker:
+                result = run_tuning(job, request, candidates)
+            job["result"] = result
+            job["model_id"] = result["model_id"]
+            job["status"] = "completed"
+            logger.info(f"Tuning job {job_id} completed: {result['model_id']} with {result['params']}")
+            return result
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            job["error"] = detail
+            job["status"] = "failed"
+            logger.error(f"Tuning job {job_id} failed: {detail}")
+            raise
+        finally:
+            job["peak_memory_bytes"] = tracker.peak_bytes
+            job["finished_at"] = datetime.now().isoformat()
+
+
+def submit_tuning_job(request: TuneRequest) -> Tuple[Dict[str, Any], Future]:
+    """Validate a search request and queue it on the training executor"""
+    validate_training_request(TrainModelRequest(model_name=request.model_name, algorithm=request.algorithm,
+                                                features=request.features))
+    valid_params = ALGORITHMS[request.algorithm]().get_params()
+    if not request.search_space:
+        raise HTTPException(status_code=400, detail="Empty search space")
+    for name, values in request.search_space.items():
+        if name not in valid_params:
+            raise HTTPException(status_code=400, detail=f"Unknown parameter '{name}' for {request.algorithm}")
+        if not values:
+            raise HTTPException(status_code=400, detail=f"No values to try for '{name}'")
+    if request.halving_factor < 2:
+        raise HTTPException(status_code=400, detail="halving_factor must be at least 2")
+    if request.max_candidates is not None and request.max_candidates < 1:
+        raise HTTPException(status_code=400, detail="max_candidates must be at least 1")
+    candidates = tuning_candidates(request)
+
+    job_id = uuid.uuid4().hex
+    job = {
+        "id": job_id,
+        "status": "queued",
+        "model_name": request.model_name,
+        "algorithm": request.algorithm,
+        "features": request.features,
+        "search_space": request.search_space,
+        "model_id": None,
+        "result": None,
+        "error": None,
+        "progress": None,
+        "rungs": [],
+        "peak_memory_bytes": None,
+        "submitted_at": datetime.now().isoformat(),
+        "started_at": None,
+        "finished_at": None
+    }
+    tuning_jobs.add(job)
+
+    future = training_executor.submit(run_tuning_job, job_id, request, candidates)
+    logger.info(f"Queued tuning job {job_id} for {request.algorithm} over {len(candidates)} candidates")
+    return job, future
+
+
+@app.post("/api/tune", status_code=202)
+def create_tuning_job(request: TuneRequest):
+    """Start a successive-halving hyperparameter search; the best configuration is registered as a model"""
+    job, _ = submit_tuning_job(request)
+    return {"job_id": job["id"], "status": job["status"]}
+
+
+@app.get("/api/tune")
+def get_tuning_jobs():
+    """List tuning jobs, newest first"""
+    return tuning_jobs.list()
+
+
+@app.get("/api/tune/{job_id}")
+def get_tuning_job(job_id: str):
+    """Get the progress, per-rung leaderboard and result of a tuning job"""
+    job = tuning_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tuning job not found")
+
+    return job
+
+
+def engineer_passengers(passengers: List[PassengerData]) -> pd.DataFrame:
+    """Engineer passenger input like the training data; missing numbers get the fitted medians"""
+    if feature_engineer is None:
+        load_dataset()
+
+    raw = pd.DataFrame({
+        'Pclass': [passenger.pclass or 3 for passenger in passengers],
+        'Sex': [passenger.sex or "male" for passenger in passengers],
+        'Age': [passenger.age for passenger in passengers],
+        'SibSp': [passenger.sibsp or 0 for passenger in passengers],
+        'Parch': [passenger.parch or 0 for passenger in passengers],
+        'Fare': [passenger.fare for passenger in passengers],
+        'Embarked': [passenger.embarked or "S" for passenger in passengers],
+        'Title': [passenger.title or "Mr" for passenger in passengers],
+        'CabinLetter': [passenger.cabin_letter or "U" for passenger in passengers]
+    }).astype({'Age': float, 'Fare': float})
+    return feature_engineer.transform(raw)
+
+
+@contextmanager
+def incremental_update_lock():
+    """Serialize incremental updates across serving workers, so concurrent ones never lose each other's rows.
+    flock locks belong to each open() of the lock file, so threads of one process exclude each other too"""
+    os.makedirs(os.path.dirname(MODEL_MANIFEST_PATH) or ".", exist_ok=True)
+    with open(f"{MODEL_MANIFEST_PATH}.update.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def run_incremental_update(model_id: str, request: IncrementalUpdateRequest) -> Dict[str, Any]:
+    """Update a custom model with new labeled rows through partial_fit and persist it as a new version
+    (blocking, runs on the threadpool). The work scales with the new rows, not the training set"""
+    with incremental_update_lock():
+        entry = load_manifest_entry(model_id)
+        if entry is None or model_id not in model_metadata:
+            raise HTTPException(status_code=404, detail="Model not found")
+
+        metadata = entry["metadata"]
+        if metadata["is_default"]:
+            raise HTTPException(status_code=400, detail="Cannot update default models")
+        if metadata["algorithm"] not in INCREMENTAL_ALGORITHMS:
+            raise HTTPException(status_code=400, detail=f"Only {', '.join(INCREMENTAL_ALGORITHMS)} models can be "
+                                                        f"updated incrementally")
+
+        y = np.array([passenger.survived for passenger in request.passengers])
+
+        # Another worker may have saved a newer version than the one in memory here
+        if model_metadata[model_id].get("version", 1) == metadata.get("version", 1):
+            model = lazy_models.get(model_id)
         else:
-            model = algo_class(random_state=42 if hasattr(algo_class, "random_state") else None)
-
-        # Cross validation
-        cv_scores = cross_val_score(model, X_scaled, y, cv=kfold, scoring="accuracy")
-        cv_mean = np.mean(cv_scores)
-
-        # Train final model
-        model.fit(X_train, y_train)
-
-        # Calculate accuracy
-        y_pred = model.predict(X_test)
-        test_accuracy = accuracy_score(y_test, y_pred)
-
-        # Generate unique model ID
-        model_id = f"custom_{request.model_name.lower().replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-
-        # Store model
-        models[model_id] = model
-        trained_model_features[model_id] = feature_columns
-        model_metadata[model_id] = {
-            "id": model_id,
-            "name": request.model_name,
-            "algorithm": request.algorithm,
-            "features": request.features,
-            "accuracy": round(test_accuracy, 4),
-            "cv_accuracy": round(cv_mean, 4),
-            "created_at": datetime.now().isoformat(),
-            "is_default": False
+            model = load_artifact(entry["model_path"], entry["model_sha256"])
+        if not set(y) <= set(model.classes_):
+            raise HTTPException(status_code=400, detail=f"survived must be one of {model.classes_.tolist()}")
+
+        # New rows go through the feature engineering and scaler the training rows went through
+        features = entry["features"]
+        scaler = load_artifact(entry["scaler_path"], entry["scaler_sha256"])
+        X = scaler.transform(engineer_passengers(request.passengers)[features])
+
+        # Update a copy so predictions keep using the current version until the new one is registered
+        accuracy_before = accuracy_score(y, model.predict(X))
+        updated = copy.deepcopy(model)
+        updated.partial_fit(X, y)
+        accuracy_after = accuracy_score(y, updated.predict(X))
+
+        version = metadata.get("version", 1) + 1
+        model_path = os.path.join(MODEL_DIR, f"{model_id}_v{version}.pkl")
+        metadata = {
+            **metadata,
+            "version": version,
+            "updated_at": datetime.now().isoformat(),
+            "incremental_rows": metadata.get("incremental_rows", 0) + len(y),
+            "last_update": {
+                "rows": len(y),
+                "accuracy_before": round(accuracy_before, 4),
+                "accuracy_after": round(accuracy_after, 4)
+            },
+            "artifact": save_model_artifact(updated, model_path, X, y)
         }
+        saved = save_manifest_entry(metadata, features, model_path, entry["scaler_path"])
+
+        registry.register(model_id, updated, features, metadata)
+        lazy_models.add(model_id, manifest_loader(saved), updated)
+        if SERVING_WORKERS > 1:
+            model_catalog.reference(model_id, saved, features, metadata)
+
+        if entry["model_path"] != model_path and os.path.exists(entry["model_path"]):
+            os.remove(entry["model_path"])
+
+    logger.info(f"Updated {model_id} to version {version} with {len(y)} rows")
+    return {
+        "message": f"Model '{model_id}' updated with {len(y)} rows",
+        "model_id": model_id,
+        "version": version,
+        **metadata["last_update"]
+    }
 
-        # Save model and scaler to disk
-        os.makedirs("models", exist_ok=True)
-        joblib.dump(model, f"models/{model_id}.pkl")
-        joblib.dump(scaler, f"models/{model_id}_scaler.pkl")
-        with open(f"models/{model_id}_features.pkl", "wb") as f:
-            pickle.dump(feature_columns, f)
 
-        return {
-            "message": f"Model '{request.model_name}' trained successfully",
-            "model_id": model_id,
-            "accuracy": test_accuracy,
-            "cv_accuracy": cv_mean,
-            "features_used": request.features
-        }
+@app.post("/api/models/{model_id}/update")
+async def update_model(model_id: str, request: IncrementalUpdateRequest):
+    """Update an SGD, Perceptron or Gaussian NB custom model with new labeled passengers"""
+    if not request.passengers:
+        raise HTTPException(status_code=400, detail="No passengers to learn from")
+    if len(request.passengers) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Updates are limited to {MAX_BATCH_SIZE} passengers; "
+                                                    f"send larger sets in several requests")
 
+    try:
+        # Updates are small, so they do not queue behind training jobs; incremental_update_lock
+        # serializes them across threads and workers
+        return await run_in_threadpool(run_incremental_update, model_id, request)
+
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error training model: {e}")
+        logger.error(f"Error updating model: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -733,7 +3827,7 @@ async def train_model(request: TrainModelRequest):
 async def delete_model(model_id: str):
     """Delete a trained model"""
     try:
-        if model_id not in models:
+        if model_id not in model_metadata:
             raise HTTPException(status_code=404, detail="Model not found")
 
         # Don't allow deletion of default models
@@ -741,18 +3835,15 @@ async def delete_model(model_id: str):
             raise HTTPException(status_code=400, detail="Cannot delete default models")
 
         # Remove from memory
-        del models[model_id]
-        del model_metadata[model_id]
-
-        # Remove from disk
-        model_path = f"models/{model_id}.pkl"
-        scaler_path = f"models/{model_id}_scaler.pkl"
-
-        if os.path.exists(model_path):
-            os.remove(model_path)
+        registry.remove(model_id)
+        lazy_models.discard(model_id)
+        if SERVING_WORKERS > 1:
+            model_catalog.withdraw(model_id)
 
-        if os.path.exists(scaler_path):
-            os.remove(scaler_path)
+        # Remove from the manifest, then from disk
+        for path in delete_manifest_entries(model_id=model_id):
+            if os.path.exists(path):
+                os.remove(path)
 
         return {"message": f"Model '{model_id}' deleted successfully"}
 
@@ -767,10 +3858,25 @@ async def get_model_details(model_id: str):
     if model_id not in model_metadata:
         raise HTTPException(status_code=404, detail="Model not found")
 
-    return model_metadata[model_id]
+    details = {**model_metadata[model_id], **lazy_models.describe(model_id)}
+
+    # On-disk size and parity come from the manifest, load time and resident size from this process
+    artifact = details.get("artifact")
+    if artifact:
+        details["artifact"] = {**artifact, "load_seconds": artifact_load_seconds.get(artifact["path"])}
+    model = models.get(model_id)
+    if details.get("resident_bytes") is None and model is not None:
+        details["resident_bytes"] = model_nbytes(model)
+
+    return details
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=5001)
\ No newline at end of file
+    if SERVING_WORKERS > 1:
+        prepare_model_catalog()
+        os.environ["MODEL_CATALOG_WORKER"] = "1"
+        uvicorn.run("main:app", host="0.0.0.0", port=5001, workers=SERVING_WORKERS)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=5001)
\ No newline at end of file
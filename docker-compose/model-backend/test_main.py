@@ -1,9 +1,55 @@
+import asyncio
+import os
+import shutil
+import sqlite3
+import threading
+import time
 import pytest
+import numpy as np
+import pandas as pd
 from fastapi.testclient import TestClient
+import main
 from main import app
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True)
+def model_store(monkeypatch, tmp_path):
+    """Keep the artifacts, manifest rows and ingested data each test writes in its own directory"""
+    monkeypatch.setattr(main, "MODEL_DIR", str(tmp_path / "models"))
+    monkeypatch.setattr(main, "MODEL_MANIFEST_PATH", str(tmp_path / "models" / "manifest.db"))
+    monkeypatch.setattr(main, "manifest_ready", False)
+    monkeypatch.setattr(main, "DATASET_CACHE_DIR", str(tmp_path / "dataset_cache"))
+    monkeypatch.setattr(main, "ingest_store", main.IngestStore(str(tmp_path / "ingested")))
+    monkeypatch.setattr(main, "model_catalog", main.ModelCatalog(str(tmp_path / "catalog")))
+    os.makedirs(main.MODEL_DIR)
+    return tmp_path
+
+@pytest.fixture(scope="session")
+def trained_default_models(tmp_path_factory):
+    """Default models trained once per session into their own directory; tests get copies through default_models"""
+    directory = tmp_path_factory.mktemp("default_models")
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(main, "MODEL_DIR", str(directory))
+        patch.setattr(main, "MODEL_MANIFEST_PATH", str(directory / "manifest.db"))
+        patch.setattr(main, "manifest_ready", False)
+        patch.setattr(main, "DATASET_CACHE_DIR", str(directory / "dataset_cache"))
+        main.train_default_models()
+    return directory
+
+@pytest.fixture
+def default_models(trained_default_models, model_store):
+    """Every default model, recorded in this test's manifest and loaded from it"""
+    for path in trained_default_models.glob("*.pkl"):
+        shutil.copy(path, main.MODEL_DIR)
+    shutil.copy(trained_default_models / "manifest.db", main.MODEL_MANIFEST_PATH)
+    conn = sqlite3.connect(main.MODEL_MANIFEST_PATH)
+    with conn:
+        conn.execute("UPDATE models SET model_path = replace(model_path, ?, ?), metadata = replace(metadata, ?, ?)",
+                     (str(trained_default_models), main.MODEL_DIR) * 2)
+    conn.close()
+    assert main.load_default_models_from_cache()
+
 def test_root():
     response = client.get("/")
     assert response.status_code == 200
@@ -18,4 +64,881 @@ def test_get_features():
     response = client.get("/api/features")
     assert response.status_code == 200
     assert "features" in response.json()
-    
+
+
+def test_default_models_cache_key_tracks_hyperparameters(monkeypatch):
+    key = main.default_models_cache_key()
+    assert key == main.default_models_cache_key()
+
+    params = {**main.DEFAULT_MODEL_PARAMS, "knn": {**main.DEFAULT_MODEL_PARAMS["knn"], "n_neighbors": 7}}
+    monkeypatch.setattr(main, "DEFAULT_MODEL_PARAMS", params)
+    assert main.default_models_cache_key() != key
+
+def test_default_models_loaded_from_cache():
+    main.train_default_models()
+    trained = {model_id: dict(metadata) for model_id, metadata in main.model_metadata.items()}
+
+    for model_id in list(main.models):
+        main.registry.remove(model_id)
+    assert main.load_default_models_from_cache()
+    assert main.model_metadata == trained
+    assert len(main.model_metadata["default_svm"]["cv_scores"]) == 10
+
+def test_parallel_training_matches_sequential(monkeypatch):
+    main.train_default_models()
+    sequential = {model_id: metadata["cv_scores"] for model_id, metadata in main.model_metadata.items()}
+
+    monkeypatch.setattr(main, "TRAINING_WORKERS", 2)
+    main.train_default_models()
+    parallel = {model_id: metadata["cv_scores"] for model_id, metadata in main.model_metadata.items()}
+
+    assert list(parallel) == list(sequential)
+    assert parallel == sequential
+
+def test_training_job_lifecycle():
+    response = client.post("/api/train/jobs", json={
+        "model_name": "Job Test",
+        "algorithm": "gaussian_nb",
+        "features": ["Pclass", "Sex", "Age"]
+    })
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    for _ in range(100):
+        job = client.get(f"/api/train/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.1)
+
+    assert job["status"] == "completed"
+    assert job["model_id"] in main.models
+    assert any(j["id"] == job_id for j in client.get("/api/train/jobs").json())
+    client.delete(f"/api/models/{job['model_id']}")
+
+def test_training_job_rejects_unknown_algorithm():
+    response = client.post("/api/train/jobs", json={
+        "model_name": "Bad", "algorithm": "xgboost", "features": ["Age"]
+    })
+    assert response.status_code == 400
+    assert client.get("/api/train/jobs/unknown").status_code == 404
+
+def test_train_waits_for_job():
+    response = client.post("/api/train", json={
+        "model_name": "Sync Test",
+        "algorithm": "decision_tree",
+        "features": ["Pclass", "Sex", "Fare"]
+    })
+    assert response.status_code == 200
+    assert response.json()["job_id"] in main.training_jobs
+    client.delete(f"/api/models/{response.json()['model_id']}")
+
+def test_same_name_models_get_distinct_ids():
+    request = main.TrainModelRequest(model_name="Dup", algorithm="gaussian_nb", features=["Pclass", "Sex"])
+    first, second = main.run_training(request), main.run_training(request)
+    assert first["model_id"] != second["model_id"]
+    assert first["model_id"] in main.model_metadata and second["model_id"] in main.model_metadata
+    for result in (first, second):
+        client.delete(f"/api/models/{result['model_id']}")
+
+def test_default_training_order_puts_priority_first():
+    order = main.default_training_order()
+    assert order[:2] == ["random_forest", "svm"]
+    assert sorted(order) == sorted(main.ALGORITHMS)
+
+def test_predict_reports_warming_models(monkeypatch):
+    monkeypatch.setitem(main.warming_models, "default_warming_test", "Warming Test")
+    response = client.post("/api/predict", json={
+        "passenger": {"pclass": 1, "sex": "female", "age": 30},
+        "model_names": ["Warming Test"]
+    })
+    assert response.json()["predictions"]["Warming Test"]["status"] == "warming"
+
+    ready = client.get("/ready")
+    assert ready.status_code == 503
+    assert "default_warming_test" in ready.json()["warming_models"]
+
+def test_background_warmup_registers_all_defaults():
+    main.start_default_model_warmup().join()
+    assert not main.warming_models
+    assert client.get("/ready").status_code == 200
+    assert all(f"default_{algo_name}" in main.models for algo_name in main.ALGORITHMS)
+
+def test_engineered_dataset_cache_is_memory_mapped():
+    engineered, engineer = main.engineer_features(*main.read_raw_datasets())
+    computed, memory = main.compact_dataset(engineered)
+    main.save_dataset_cache(main.dataset_cache_key(), computed, engineer, memory)
+
+    cached, cached_engineer, cached_memory = main.load_dataset_cache(main.dataset_cache_key())
+    assert isinstance(cached["Age"].values, np.memmap)
+    pd.testing.assert_frame_equal(cached, computed)
+    np.testing.assert_array_equal(cached_engineer.bins["fare"], engineer.bins["fare"])
+    assert cached_memory == memory
+
+def test_dataset_uses_compact_schema():
+    engineered, _ = main.engineer_features(*main.read_raw_datasets())
+    main.load_dataset()
+
+    assert list(main.combined_data.columns) == list(main.DATASET_SCHEMA)
+    assert "Name" not in main.combined_data and "FareBand" not in main.combined_data
+    assert main.combined_data["Pclass"].dtype == np.int8 and main.combined_data["Sex"].dtype == "category"
+    for column in main.DATASET_SCHEMA:
+        pd.testing.assert_series_equal(main.combined_data[column], engineered[column], check_dtype=False,
+                                       check_categorical=False)
+
+    # train_df and test_df are views of combined_data
+    assert np.shares_memory(main.train_df["Age"].values, main.combined_data["Age"].values)
+    assert np.shares_memory(main.test_df["Pclass"].values, main.combined_data["Pclass"].values)
+    assert len(main.train_df) == 891 and main.train_df["Survived"].notna().all() and main.test_df["Survived"].isna().all()
+
+    memory = main.dataset_memory
+    assert memory["after_bytes"] < memory["before_bytes"] / 4
+    assert memory["train_df_test_df"]["after_bytes"] == 0
+    assert client.get("/metrics").json()["dataset_memory"]["after_bytes"] == memory["after_bytes"]
+
+def test_feature_engineer_applies_fitted_statistics_to_new_rows():
+    engineer = main.FeatureEngineer().fit(pd.concat(main.read_raw_datasets()))
+    rows = pd.DataFrame([
+        {"Pclass": 1, "Sex": "female", "Age": None, "SibSp": 1, "Parch": 0, "Fare": None,
+         "Embarked": None, "Title": "Mrs", "CabinLetter": "C"},
+        {"Pclass": 3, "Sex": "male", "Age": 95.0, "SibSp": 0, "Parch": 0, "Fare": 7.0,
+         "Embarked": "Q", "Title": "Mr", "CabinLetter": "U"}
+    ])
+
+    transformed = engineer.transform(rows)
+    assert transformed["Age"][0] == engineer.title_age_medians["Mrs"]
+    assert transformed["Fare"][0] == engineer.pclass_fare_medians[1]
+    assert transformed["Embarked"][0] == engineer.embarked_mode
+    assert list(transformed["AgeBin"]) == [2, 4]
+    assert list(transformed["FareBin"]) == [3, 0]
+
+def test_batch_prediction_matches_single_predictions(default_models):
+    passengers = [
+        {"pclass": 1, "sex": "female", "age": 29, "sibsp": 0, "parch": 0, "fare": 211.3, "embarked": "S", "title": "Miss"},
+        {"pclass": 3, "sex": "male", "age": 22, "sibsp": 1, "parch": 0, "fare": 7.25, "embarked": "S", "title": "Mr"},
+        {"pclass": 2}
+    ]
+    model_names = ["Random Forest", "Perceptron", "default_knn", "Missing Model"]
+
+    response = client.post("/api/predict/batch", json={"passengers": passengers, "model_names": model_names})
+    assert response.status_code == 200
+    batch = response.json()["predictions"]
+
+    assert len(batch) == len(passengers)
+    for passenger, result in zip(passengers, batch):
+        single = client.post("/api/predict", json={"passenger": passenger, "model_names": model_names})
+        assert result == single.json()["predictions"]
+    assert batch[0]["Missing Model"]["prediction"] == "Error"
+
+def test_registry_indexes_names_and_partitions():
+    metadata = {"id": "custom_registry_test", "name": "Registry Test", "algorithm": "gaussian_nb",
+                "features": ["Age"], "accuracy": 0.5, "created_at": "", "is_default": False}
+    main.registry.register("custom_registry_test", object(), ["Age"], metadata)
+
+    assert main.registry.lookup("REGISTRY test") == "custom_registry_test"
+    assert main.registry.lookup("custom_registry_test") == "custom_registry_test"
+    assert metadata in main.registry.list(is_default=False)
+    assert metadata not in main.registry.list(is_default=True)
+
+    main.registry.remove("custom_registry_test")
+    assert main.registry.lookup("Registry Test") is None
+    assert "custom_registry_test" not in main.models
+    assert metadata not in main.registry.list()
+
+def test_feature_rows_use_fixed_positions_and_defaults():
+    row = main.preprocess_passenger_data(main.PassengerData(pclass=1, sex="female", age=20, embarked="C", title="Mrs"))
+    assert row.dtype == np.float64
+    assert list(row) == [1, 1, 20, 0, 0, 32.2, 1, 2]
+
+    passengers = [main.PassengerData(pclass=2), main.PassengerData(sex="female", fare=80)]
+    X, positions, errors = main.preprocess_passengers(passengers)
+    assert positions == [0, 1] and not errors
+    np.testing.assert_array_equal(X, np.stack([main.preprocess_passenger_data(p) for p in passengers]))
+
+def test_feature_index_selects_model_columns():
+    columns, error = main.feature_index("default_test", main.CORE_FEATURES)
+    assert columns == slice(0, len(main.CORE_FEATURES)) and error is None
+
+    columns, _ = main.feature_index("custom_test", ["Age", "Sex_encoded", "Fare", "FamilySize"])
+    assert list(columns) == [main.AGE, main.SEX, main.FARE]
+
+    columns, error = main.feature_index("custom_test", ["Age", "FamilySize"])
+    assert columns is None and error["prediction"] == "Error"
+
+def test_single_pass_inference_matches_predict_and_predict_proba(default_models):
+    main.load_dataset()
+    X = main.train_df[main.CORE_FEATURES].values
+    X = np.vstack([X, np.random.default_rng(0).normal(0, 10, (500, X.shape[1]))])
+    rbf_svm = main.SVC(**main.CUSTOM_MODEL_PARAMS["svm"]).fit(X[:891], main.train_df["Survived"])
+
+    for model_id, model in [*main.models.items(), ("custom_rbf_svm", rbf_svm)]:
+        labels, probabilities = main.infer(model, model_id, X)
+        np.testing.assert_array_equal(labels, model.predict(X))
+        if hasattr(model, "predict_proba"):
+            np.testing.assert_array_equal(probabilities, model.predict_proba(X))
+        else:
+            assert probabilities is None
+
+def test_linear_scorer_matches_sklearn(default_models):
+    main.load_dataset()
+    X = main.train_df[main.CORE_FEATURES].values
+    X = np.vstack([X, np.random.default_rng(0).normal(0, 10, (500, X.shape[1]))])
+    y = main.train_df["Survived"]
+    subset = ["Age", "Sex_encoded", "Fare"]
+    columns, _ = main.feature_index("custom_subset", subset)
+    huber = main.SGDClassifier(loss="modified_huber", random_state=42).fit(X[:891, columns], y)
+
+    linear_ids = [model_id for model_id in main.models if main.LinearScorer.link(main.models[model_id])]
+    assert "default_logistic_regression" in linear_ids and "default_random_forest" not in linear_ids
+    scorer = main.LinearScorer(
+        [(model_id, main.models[model_id], slice(None)) for model_id in linear_ids] + [("custom_subset", huber, columns)]
+    )
+    decision = scorer.decision(X)
+
+    for model_id, model, features in [*((m, main.models[m], X) for m in linear_ids), ("custom_subset", huber, X[:, columns])]:
+        labels, probabilities = scorer.predict(model_id, decision)
+        np.testing.assert_allclose(decision[:, scorer.position[model_id]], model.decision_function(features), atol=1e-9)
+        np.testing.assert_array_equal(labels, model.predict(features))
+        if hasattr(model, "predict_proba"):
+            np.testing.assert_allclose(probabilities, model.predict_proba(features), atol=1e-9)
+        else:
+            assert probabilities is None
+
+def test_tree_ensemble_matches_sklearn(default_models):
+    main.load_dataset()
+    X = main.train_df[main.CORE_FEATURES].values
+    X = np.vstack([X, np.random.default_rng(0).normal(0, 10, (500, X.shape[1]))])
+    y = main.train_df["Survived"]
+    unbounded = main.RandomForestClassifier(**main.CUSTOM_MODEL_PARAMS["random_forest"]).fit(X[:891], y)
+
+    assert set(main.registry.trees) == {"default_random_forest", "default_decision_tree"}
+    for model in [main.models["default_random_forest"], main.models["default_decision_tree"], unbounded]:
+        labels, probabilities = main.TreeEnsemble(model).predict(X)
+        np.testing.assert_array_equal(labels, model.predict(X))
+        np.testing.assert_array_equal(probabilities, model.predict_proba(X))
+
+def test_prediction_cache_hits_and_invalidation(default_models):
+    cache = main.prediction_cache
+    passenger = {"pclass": 3, "sex": "male", "age": 41.5, "fare": 13.0, "embarked": "S", "title": "Mr"}
+    request = {"passenger": passenger, "model_names": ["default_random_forest"]}
+    client.post("/api/predict", json=request)
+    hits = cache.hits
+
+    response = client.post("/api/predict", json=request)
+    assert response.status_code == 200
+    assert cache.hits == hits + 1
+    assert client.get("/metrics").json()["prediction_cache"]["hits"] == cache.hits
+
+    key = cache.key("default_random_forest", main.preprocess_passenger_data(main.PassengerData(**passenger)))
+    assert cache.get(key) == response.json()["predictions"]["default_random_forest"]
+    version = cache.version("default_random_forest")
+    main.registry.register("default_random_forest", main.models["default_random_forest"], main.CORE_FEATURES,
+                           main.model_metadata["default_random_forest"])
+    assert cache.get(key) is None
+
+    # Results computed before the model changed are not stored
+    cache.put(key, {"prediction": "stale"}, version)
+    assert cache.get(key) is None
+
+
+def test_prediction_cache_evicts_least_recently_used_and_expires():
+    cache = main.PredictionCache(max_entries=2, ttl=0)
+    rows = [np.array([float(i)]) for i in range(3)]
+    for i, row in enumerate(rows[:2]):
+        cache.put(cache.key("m", row), {"value": i}, 0)
+    cache.get(cache.key("m", rows[0]))
+    cache.put(cache.key("m", rows[2]), {"value": 2}, 0)
+    assert cache.get(cache.key("m", rows[1])) is None
+    assert cache.get(cache.key("m", rows[0])) == {"value": 0}
+    assert cache.evictions == 1
+
+    cache.ttl = 1e-9
+    time.sleep(0.01)
+    assert cache.get(cache.key("m", rows[0])) is None
+
+def test_lookup_tables_answer_grid_rows(default_models):
+    grid = {**main.LOOKUP_GRID, main.AGE: [5, 30, 60], main.FARE: [10, 32.2]}
+    tables = main.LookupTables(grid, chunk_size=100)
+    for model_id in ["default_random_forest", "default_perceptron", "default_svm"]:
+        tables.build(model_id, main.models[model_id], lambda X: main.score_feature_rows(model_id, X))
+
+    X = np.vstack(list(tables.points()))
+    assert len(X) == tables.size
+    for model_id in ["default_random_forest", "default_perceptron", "default_svm"]:
+        labels, probabilities = tables.lookup(model_id, X)
+        expected_labels, expected_probabilities = main.score_feature_rows(model_id, X)
+        np.testing.assert_array_equal(labels, expected_labels)
+        if expected_probabilities is None:
+            assert probabilities is None
+        else:
+            # The survival probability is exactly the model's; died is derived as 1 - survived
+            np.testing.assert_array_equal(probabilities[:, 1], expected_probabilities[:, 1])
+            np.testing.assert_allclose(probabilities[:, 0], expected_probabilities[:, 0], rtol=0, atol=1e-15)
+        np.testing.assert_array_equal(tables.lookup(model_id, X[7:8])[0], expected_labels[7:8])
+
+    off_grid = X[:2].copy()
+    off_grid[1, main.AGE] = 31
+    assert tables.lookup("default_random_forest", off_grid) is None
+    assert tables.lookup("default_knn", X[:1]) is None
+    assert tables.stats()["bytes"] == 2 * tables.size * (1 + 8) + tables.size
+
+    tables.invalidate("default_random_forest")
+    assert tables.lookup("default_random_forest", X[:1]) is None
+
+def test_prediction_batcher_coalesces_concurrent_rows(default_models):
+    batcher = main.PredictionBatcher(window_ms=50, max_batch_size=64)
+    X = main.train_df[main.CORE_FEATURES].values[:20].astype(np.float64)
+
+    async def submit_all():
+        futures = [batcher.submit(model_id, model_id, row)
+                   for row in X for model_id in ["default_random_forest", "default_svm", "default_knn"]]
+        return await asyncio.gather(*futures)
+
+    results = asyncio.run(submit_all())
+    assert batcher.stats()["batches"] == 1 and batcher.stats()["rows"] == 60
+    for i, model_id in enumerate(["default_random_forest", "default_svm", "default_knn"]):
+        assert results[i::3] == main.format_predictions(*main.score_feature_rows(model_id, X))
+
+
+def test_predict_with_batching_enabled(default_models, monkeypatch):
+    monkeypatch.setattr(main, "PREDICTION_BATCHING", True)
+    monkeypatch.setattr(main.prediction_cache, "max_entries", 0)
+    passenger = {"pclass": 2, "sex": "female", "age": 33.3, "fare": 21.7, "embarked": "Q", "title": "Mrs"}
+    model_names = ["default_knn", "Unknown Model", "default_random_forest"]
+
+    response = client.post("/api/predict", json={"passenger": passenger, "model_names": model_names})
+    assert response.status_code == 200
+    predictions = response.json()["predictions"]
+    assert list(predictions) == model_names
+    X = main.preprocess_passenger_data(main.PassengerData(**passenger))[np.newaxis, :]
+    assert predictions["default_knn"] == main.format_predictions(*main.score_feature_rows("default_knn", X))[0]
+    assert predictions["Unknown Model"]["prediction"] == "Error"
+    assert client.get("/metrics").json()["prediction_batching"]["rows"] >= 2
+
+def test_inference_executor_rejects_when_queue_is_full(default_models, monkeypatch):
+    executor = main.InferenceExecutor(workers=1, queue_size=1)
+    release = main.threading.Event()
+    running = [executor.submit(release.wait), executor.submit(release.wait)]
+    with pytest.raises(main.InferenceQueueFull):
+        executor.submit(release.wait)
+    assert executor.stats()["running"] == 1 and executor.stats()["queued"] == 1
+
+    monkeypatch.setattr(main, "inference_executor", executor)
+    passenger = {"pclass": 1, "sex": "female", "age": 12.5, "fare": 99.1}
+    response = client.post("/api/predict", json={"passenger": passenger, "model_names": ["default_knn"]})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(main.INFERENCE_RETRY_AFTER)
+    response = client.post("/api/predict/batch", json={"passengers": [passenger], "model_names": ["default_knn"]})
+    assert response.status_code == 503
+    assert client.get("/health").status_code == 200
+
+    release.set()
+    for future in running:
+        future.result(timeout=5)
+    assert client.post("/api/predict", json={"passenger": passenger, "model_names": ["default_knn"]}).status_code == 200
+    assert client.get("/metrics").json()["inference_executor"]["rejected"] == 3
+
+def test_model_catalog_shares_models_between_workers(default_models, tmp_path):
+    parent = main.ModelCatalog(str(tmp_path / "catalog"))
+    parent.reset()
+    for model_id in ["default_random_forest", "default_knn"]:
+        parent.publish(model_id, main.models[model_id], main.CORE_FEATURES, main.model_metadata[model_id])
+
+    worker_models = {}
+    worker_registry = main.ModelRegistry(worker_models, {}, {}, {}, [])
+    worker = main.ModelCatalog(str(tmp_path / "catalog"))
+    assert worker.sync(worker_registry) and not worker.sync(worker_registry)
+    assert set(worker_models) == {"default_random_forest", "default_knn"}
+
+    # Forest node arrays are memory-mapped, not rebuilt
+    ensemble = worker_registry.trees["default_random_forest"]
+    assert isinstance(ensemble.value, np.memmap)
+    X = main.train_df[main.CORE_FEATURES].values
+    np.testing.assert_array_equal(ensemble.predict(X)[1], main.models["default_random_forest"].predict_proba(X))
+    np.testing.assert_array_equal(worker_models["default_knn"].predict(X), main.models["default_knn"].predict(X))
+
+    parent.withdraw("default_knn")
+    parent.publish("default_random_forest", main.models["default_decision_tree"], main.CORE_FEATURES,
+                   main.model_metadata["default_random_forest"])
+    assert worker.sync(worker_registry)
+    assert set(worker_models) == {"default_random_forest"}
+    assert isinstance(worker_models["default_random_forest"], main.DecisionTreeClassifier)
+    assert worker.version == parent.read()["version"]
+    assert len(list((tmp_path / "catalog").glob("*.joblib"))) == 1
+
+def test_model_catalog_maps_custom_models_on_first_use(default_models, monkeypatch):
+    request = main.TrainModelRequest(model_name="Catalog Tree", algorithm="decision_tree", features=main.CORE_FEATURES)
+    model_id = main.run_training(request)["model_id"]
+    model = main.models[model_id]
+    model_path = main.load_manifest_entry(model_id)["model_path"]
+
+    # The parent only references custom models; it never deserializes them
+    loads = []
+    load_artifact = main.load_artifact
+    monkeypatch.setattr(main, "load_artifact", lambda path, sha256: loads.append(path) or load_artifact(path, sha256))
+    main.prepare_model_catalog()
+    assert model_path not in loads
+    assert not [name for name in os.listdir(main.model_catalog.directory) if name.startswith(model_id)]
+
+    worker_models = {}
+    worker_registry = main.ModelRegistry(worker_models, {}, {}, {}, [])
+    worker = main.ModelCatalog(main.model_catalog.directory)
+    try:
+        main.lazy_models.discard(model_id)
+        assert worker.sync(worker_registry)
+        # Registered without being loaded, so the custom model memory budget applies in workers too
+        assert model_id in worker_registry.metadata and model_id not in worker_models
+        assert not main.lazy_models.describe(model_id)["resident"]
+
+        X = main.train_df[main.trained_model_features[model_id]].values
+        np.testing.assert_array_equal(main.lazy_models.get(model_id).predict(X), model.predict(X))
+        assert loads.count(model_path) == 1
+
+        main.model_catalog.withdraw(model_id)
+        assert worker.sync(worker_registry)
+        assert main.lazy_models.describe(model_id) == {}
+        # Withdrawing a reference leaves the manifest artifact in place
+        assert os.path.exists(model_path)
+    finally:
+        client.delete(f"/api/models/{model_id}")
+
+def test_job_status_is_shared_between_workers():
+    response = client.post("/api/train/jobs", json={
+        "model_name": "Shared Job", "algorithm": "gaussian_nb", "features": ["Pclass", "Sex"]
+    })
+    job_id = response.json()["job_id"]
+
+    # Another worker has no local record of the job and reads it from the manifest
+    other_worker = main.JobStore("training")
+    assert other_worker.get(job_id)["status"] in ("queued", "running", "completed")
+
+    deadline = time.time() + 60
+    while other_worker.get(job_id)["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.1)
+    job = other_worker.get(job_id)
+    assert job["status"] == "completed" and job["result"]["model_id"] == job["model_id"]
+    assert job_id in {record["id"] for record in other_worker.list()}
+    assert other_worker.get("unknown") is None
+    client.delete(f"/api/models/{job['model_id']}")
+
+def test_custom_models_reload_from_manifest():
+    response = client.post("/api/train", json={
+        "model_name": "Manifest Test",
+        "algorithm": "gaussian_nb",
+        "features": ["Pclass", "Sex", "Age"]
+    })
+    model_id = response.json()["model_id"]
+    metadata = dict(main.model_metadata[model_id])
+    assert not os.path.exists(os.path.join(main.MODEL_DIR, f"{model_id}_features.pkl"))
+
+    # Simulate a restart
+    main.registry.remove(model_id)
+    main.load_custom_models()
+    assert main.model_metadata[model_id] == metadata
+    assert main.model_accuracy[model_id] == metadata["accuracy"]
+    assert main.trained_model_features[model_id] == ["Pclass", "Sex_encoded", "Age"]
+
+    client.delete(f"/api/models/{model_id}")
+    assert model_id not in {entry["id"] for entry in main.load_manifest_entries(is_default=False)}
+    assert not any(name.startswith(model_id) for name in os.listdir(main.MODEL_DIR))
+
+
+def test_manifest_migrates_legacy_custom_models():
+    main.load_dataset()
+    features = ["Pclass", "Sex_encoded", "Fare"]
+    scaler = main.StandardScaler().fit(main.train_df[features])
+    X_train, X_test, y_train, y_test = main.train_test_split(
+        scaler.transform(main.train_df[features]), main.train_df["Survived"], test_size=0.2, random_state=42)
+    model = main.DecisionTreeClassifier(max_depth=3).fit(X_train, y_train)
+
+    model_id = "custom_legacy_test_20240101_120000"
+    main.joblib.dump(model, os.path.join(main.MODEL_DIR, f"{model_id}.pkl"))
+    main.joblib.dump(scaler, os.path.join(main.MODEL_DIR, f"{model_id}_scaler.pkl"))
+    with open(os.path.join(main.MODEL_DIR, f"{model_id}_features.pkl"), "wb") as f:
+        main.pickle.dump(features, f)
+
+    # The test's manifest does not exist yet, so the first access creates it and migrates the files
+    [entry] = [entry for entry in main.load_manifest_entries(is_default=False) if entry["id"] == model_id]
+    assert entry["features"] == features
+    assert entry["metadata"]["name"] == "Legacy Test"
+    assert entry["metadata"]["algorithm"] == "decision_tree"
+    assert entry["metadata"]["accuracy"] == round(main.accuracy_score(y_test, model.predict(X_test)), 4)
+    assert not os.path.exists(os.path.join(main.MODEL_DIR, f"{model_id}_features.pkl"))
+
+def test_manifest_is_created_once_by_concurrent_first_use(monkeypatch, tmp_path):
+    # The manifest can live outside a model directory that does not exist yet
+    monkeypatch.setattr(main, "MODEL_DIR", str(tmp_path / "missing"))
+    monkeypatch.setattr(main, "MODEL_MANIFEST_PATH", str(tmp_path / "manifest" / "manifest.db"))
+    migrations = []
+    migrate_legacy_models = main.migrate_legacy_models
+    monkeypatch.setattr(main, "migrate_legacy_models",
+                        lambda: migrations.append(time.sleep(0.05)) or migrate_legacy_models())
+
+    with main.ThreadPoolExecutor(max_workers=4) as pool:
+        counts = list(pool.map(lambda _: len(main.load_manifest_entries(is_default=False)), range(4)))
+    assert counts == [0] * 4 and len(migrations) == 1
+    assert not os.path.exists(main.MODEL_DIR)
+
+def test_custom_models_load_lazily_within_budget(default_models, monkeypatch):
+    knn, tree = main.models["default_knn"], main.models["default_decision_tree"]
+    cache = main.LazyModelCache(budget_bytes=main.model_nbytes(knn) + 1, idle_seconds=0)
+    monkeypatch.setattr(main, "lazy_models", cache)
+    loads = []
+
+    def source(model):
+        def load():
+            loads.append(model)
+            time.sleep(0.05)
+            return model
+        return load
+
+    for model_id, model in [("custom_lazy_knn", knn), ("custom_lazy_tree", tree)]:
+        metadata = {**main.model_metadata["default_knn"], "id": model_id, "name": model_id, "is_default": False}
+        main.registry.register(model_id, None, main.CORE_FEATURES, metadata)
+        cache.add(model_id, source(model))
+
+    try:
+        assert "custom_lazy_knn" not in main.models
+        with main.ThreadPoolExecutor(max_workers=4) as pool:
+            assert all(model is knn for model in pool.map(cache.get, ["custom_lazy_knn"] * 4))
+        assert loads == [knn] and "custom_lazy_knn" in main.models
+
+        details = client.get("/api/models/custom_lazy_knn").json()
+        assert details["resident"] and details["resident_bytes"] == main.model_nbytes(knn)
+        assert details["load_seconds"] >= 0.05
+
+        # Loading the tree goes over budget, so the least recently used KNN is evicted
+        response = client.post("/api/predict", json={"passenger": {"pclass": 1}, "model_names": ["custom_lazy_tree"]})
+        assert response.json()["predictions"]["custom_lazy_tree"]["prediction_value"] in (0, 1)
+        assert "custom_lazy_tree" in main.models and "custom_lazy_knn" not in main.models
+        assert cache.evictions == 1 and not client.get("/api/models/custom_lazy_knn").json()["resident"]
+    finally:
+        for model_id in ["custom_lazy_knn", "custom_lazy_tree"]:
+            main.registry.remove(model_id)
+            cache.discard(model_id)
+
+def test_idle_custom_models_are_evicted_without_other_access(default_models, monkeypatch):
+    cache = main.LazyModelCache(budget_bytes=2 ** 30, idle_seconds=0.2)
+    monkeypatch.setattr(main, "lazy_models", cache)
+    metadata = {**main.model_metadata["default_knn"], "id": "custom_idle_knn", "name": "custom_idle_knn",
+                "is_default": False}
+    main.registry.register("custom_idle_knn", None, main.CORE_FEATURES, metadata)
+    cache.add("custom_idle_knn", lambda: main.models["default_knn"])
+
+    try:
+        assert main.start_idle_eviction(cache) is not None
+        cache.get("custom_idle_knn")
+        assert "custom_idle_knn" in main.models
+
+        # Nothing else touches the cache; the sweep alone drops the cold model
+        deadline = time.time() + 5
+        while "custom_idle_knn" in main.models and time.time() < deadline:
+            time.sleep(0.05)
+        assert "custom_idle_knn" not in main.models
+        assert cache.evictions == 1 and not cache.describe("custom_idle_knn")["resident"]
+        assert main.start_idle_eviction(main.LazyModelCache(budget_bytes=0, idle_seconds=0)) is None
+    finally:
+        main.registry.remove("custom_idle_knn")
+        cache.discard("custom_idle_knn")
+
+def test_compact_artifacts_match_float64_models(default_models, tmp_path, monkeypatch):
+    X = main.train_df[main.CORE_FEATURES].values
+    y = main.train_df["Survived"].values
+
+    for model_id in ["default_random_forest", "default_knn", "default_logistic_regression"]:
+        model = main.models[model_id]
+        path = str(tmp_path / f"{model_id}.pkl")
+        artifact = main.save_model_artifact(model, path, X, y)
+        plain = tmp_path / f"{model_id}_plain.pkl"
+        main.joblib.dump(model, plain)
+
+        assert artifact["parity"]["label_agreement"] == 1.0
+        assert artifact["disk_bytes"] == os.path.getsize(path) < os.path.getsize(plain)
+        restored = main.load_artifact(path, main.file_sha256(path))
+        np.testing.assert_array_equal(restored.predict(X), model.predict(X))
+        np.testing.assert_allclose(restored.predict_proba(X), model.predict_proba(X), atol=1e-6)
+        assert main.artifact_load_seconds[path] > 0
+
+    # Uncompressed, a KNN keeps only float32 training points: its KD tree is rebuilt, not stored
+    monkeypatch.setattr(main, "ARTIFACT_COMPRESSION", 0)
+    knn = main.models["default_knn"]
+    artifact = main.save_model_artifact(knn, str(tmp_path / "knn.pkl"), X, y)
+    main.joblib.dump(knn, tmp_path / "knn_plain.pkl")
+    assert artifact["float32"] == ["_fit_X"]
+    assert artifact["disk_bytes"] < os.path.getsize(tmp_path / "knn_plain.pkl") / 3
+    restored = main.load_artifact(artifact["path"], main.file_sha256(artifact["path"]))
+    assert isinstance(restored._tree, main.KDTree)
+    np.testing.assert_array_equal(restored.predict_proba(X), knn.predict_proba(X))
+
+    details = client.get("/api/models/default_random_forest").json()
+    assert details["artifact"]["disk_bytes"] > 0 and details["artifact"]["format"] == "compact"
+    assert details["resident_bytes"] == main.model_nbytes(main.models["default_random_forest"])
+
+def test_incremental_update_persists_new_version(default_models):
+    response = client.post("/api/train", json={
+        "model_name": "Incremental Test",
+        "algorithm": "sgd",
+        "features": ["Pclass", "Sex", "Age", "Fare"]
+    })
+    model_id = response.json()["model_id"]
+    model = main.models[model_id]
+    coef = model.coef_.copy()
+
+    passengers = [
+        {"pclass": 1, "sex": "female", "age": 30, "fare": 80, "survived": 1},
+        {"pclass": 3, "sex": "male", "age": 25, "fare": 7.5, "survived": 0}
+    ]
+    try:
+        response = client.post(f"/api/models/{model_id}/update", json={"passengers": passengers})
+        assert response.status_code == 200
+        assert response.json()["version"] == 2 and response.json()["rows"] == 2
+
+        # The served model is a new object; the previous version was never mutated
+        updated = main.models[model_id]
+        assert updated is not model and np.array_equal(model.coef_, coef)
+        assert not np.array_equal(updated.coef_, coef)
+
+        entry = main.load_manifest_entry(model_id)
+        assert entry["model_path"] == os.path.join(main.MODEL_DIR, f"{model_id}_v2.pkl")
+        assert not os.path.exists(os.path.join(main.MODEL_DIR, f"{model_id}.pkl"))
+        assert entry["metadata"]["incremental_rows"] == 2
+        restored = main.load_artifact(entry["model_path"], entry["model_sha256"])
+        np.testing.assert_allclose(restored.coef_, updated.coef_, rtol=1e-6)
+
+        response = client.post("/api/predict", json={"passenger": passengers[0], "model_names": [model_id]})
+        assert response.json()["predictions"][model_id]["prediction_value"] in (0, 1)
+
+        response = client.post("/api/models/default_sgd/update", json={"passengers": passengers})
+        assert response.status_code == 400
+    finally:
+        client.delete(f"/api/models/{model_id}")
+    assert not any(name.startswith(model_id) for name in os.listdir(main.MODEL_DIR))
+
+def test_incremental_update_builds_on_other_workers_version():
+    response = client.post("/api/train", json={
+        "model_name": "Shared Update Test", "algorithm": "gaussian_nb", "features": ["Pclass", "Sex", "Age"]
+    })
+    model_id = response.json()["model_id"]
+    stale_model, stale_metadata = main.models[model_id], dict(main.model_metadata[model_id])
+    passengers = [{"pclass": 1, "sex": "female", "age": 30, "survived": 1},
+                  {"pclass": 3, "sex": "male", "age": 25, "survived": 0}]
+    try:
+        # Several updates at once, then one through a worker still serving version 1
+        with main.ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(lambda _: client.post(f"/api/models/{model_id}/update", json={"passengers": passengers}),
+                          range(3)))
+        main.registry.register(model_id, stale_model, main.trained_model_features[model_id], stale_metadata)
+        response = client.post(f"/api/models/{model_id}/update", json={"passengers": passengers})
+        assert response.json()["version"] == 5
+
+        entry = main.load_manifest_entry(model_id)
+        assert entry["metadata"]["incremental_rows"] == 8
+        assert main.load_artifact(entry["model_path"], entry["model_sha256"]).class_count_.sum() == \
+            stale_model.class_count_.sum() + 8
+    finally:
+        client.delete(f"/api/models/{model_id}")
+
+def test_incremental_update_does_not_wait_for_training():
+    response = client.post("/api/train", json={
+        "model_name": "Busy Update Test", "algorithm": "gaussian_nb", "features": ["Pclass", "Sex"]
+    })
+    model_id = response.json()["model_id"]
+    release = threading.Event()
+    busy = [main.training_executor.submit(release.wait, 30) for _ in range(main.TRAINING_JOB_WORKERS)]
+    try:
+        response = client.post(f"/api/models/{model_id}/update",
+                               json={"passengers": [{"pclass": 1, "sex": "female", "survived": 1}]})
+        assert response.status_code == 200 and response.json()["version"] == 2
+        assert not any(future.done() for future in busy)
+    finally:
+        release.set()
+        client.delete(f"/api/models/{model_id}")
+
+def test_incremental_update_rejects_batch_algorithms():
+    response = client.post("/api/train", json={
+        "model_name": "Batch Only Test",
+        "algorithm": "decision_tree",
+        "features": ["Pclass", "Sex", "Fare"]
+    })
+    model_id = response.json()["model_id"]
+    try:
+        response = client.post(f"/api/models/{model_id}/update",
+                               json={"passengers": [{"pclass": 1, "survived": 1}]})
+        assert response.status_code == 400
+        assert client.post("/api/models/missing_model/update",
+                           json={"passengers": [{"pclass": 1, "survived": 1}]}).status_code == 404
+    finally:
+        client.delete(f"/api/models/{model_id}")
+
+def test_streaming_statistics_match_feature_engineer():
+    main.load_dataset()
+    statistics = main.StreamingStatistics()
+    for path in main.DATA_FILES:
+        for chunk in pd.read_csv(path, usecols=lambda column: column in main.RAW_COLUMN_DTYPES,
+                                 dtype=main.RAW_COLUMN_DTYPES, chunksize=97):
+            if "Survived" not in chunk:
+                chunk["Survived"] = np.nan
+            statistics.update(main.FeatureEngineer._base_features(chunk))
+
+    engineer, reference = statistics.engineer(), main.feature_engineer
+    assert engineer.title_age_medians == reference.title_age_medians
+    assert engineer.pclass_fare_medians == reference.pclass_fare_medians
+    assert engineer.embarked_mode == reference.embarked_mode
+    np.testing.assert_array_equal(engineer.bins["fare"], reference.bins["fare"])
+    raw = pd.read_csv("data/train.csv", usecols=lambda column: column in main.RAW_COLUMN_DTYPES,
+                      dtype=main.RAW_COLUMN_DTYPES)
+    pd.testing.assert_frame_equal(engineer.transform(raw), reference.transform(raw))
+
+def test_quantile_sketch_stays_bounded():
+    values = np.random.default_rng(0).lognormal(3, 1, 100000)
+    sketch = main.QuantileSketch(max_values=500)
+    for chunk in np.array_split(values, 10):
+        sketch.update(chunk)
+
+    assert sketch.bucketed and len(sketch.values) < 2000 and sketch.count == len(values)
+    np.testing.assert_allclose(sketch.quantile([0.25, 0.5, 0.75]), np.quantile(values, [0.25, 0.5, 0.75]), rtol=0.005)
+
+def test_ingest_csv_in_chunks(monkeypatch):
+    store = main.ingest_store
+    monkeypatch.setattr(main, "INGEST_CHUNK_ROWS", 100)
+
+    upload = pd.read_csv("data/train.csv").head(250).to_csv(index=False)
+    response = client.post("/api/data/ingest", files={"file": ("extra.csv", upload, "text/csv")})
+    assert response.status_code == 200
+    assert response.json()["rows"] == 250 and response.json()["chunks"] == 3
+    assert response.json()["total_rows"] == 1309 + 250
+
+    summary = client.get("/api/data").json()
+    assert summary["rows"] == 1309 + 250 and summary["labeled_rows"] == 891 + 250
+    assert [upload["name"] for upload in summary["uploads"]] == ["bundled:train.csv", "bundled:test.csv", "extra.csv"]
+    assert sum(len(chunk) for chunk in store.chunks(["Age"])) == 1309 + 250
+
+    # A bad upload is rejected without changing the store
+    response = client.post("/api/data/ingest", files={"file": ("bad.csv", "Pclass,Sex\n1,male\n", "text/csv")})
+    assert response.status_code == 400
+    assert client.get("/api/data").json()["chunks"] == summary["chunks"]
+
+def test_ingest_does_not_wait_for_training():
+    # Occupy every training executor thread, like long-running training jobs
+    release = threading.Event()
+    busy = [main.training_executor.submit(release.wait, 30) for _ in range(main.TRAINING_JOB_WORKERS)]
+    try:
+        upload = pd.read_csv("data/train.csv").head(50).to_csv(index=False)
+        response = client.post("/api/data/ingest", files={"file": ("extra.csv", upload, "text/csv")})
+        assert response.status_code == 200 and response.json()["rows"] == 50
+        assert not any(future.done() for future in busy)
+    finally:
+        release.set()
+
+def test_concurrent_ingest_processes_keep_every_chunk(tmp_path):
+    store = main.IngestStore(str(tmp_path / "ingested"))
+    path = tmp_path / "extra.csv"
+    pd.read_csv("data/train.csv").head(250).to_csv(path, index=False)
+
+    # Separate processes, like two serving workers or ingest.py next to the server
+    with main.ProcessPoolExecutor(max_workers=3) as pool:
+        uploads = list(pool.map(store.ingest, [str(path)] * 3, ["a.csv", "b.csv", "c.csv"], [100] * 3))
+    assert all(upload["rows"] == 250 for upload in uploads)
+
+    summary = store.summary()
+    assert summary["rows"] == 1309 + 3 * 250
+    assert sorted(upload["name"] for upload in summary["uploads"][2:]) == ["a.csv", "b.csv", "c.csv"]
+    names = [chunk["name"] for chunk in store.load_state()["chunks"]]
+    assert len(set(names)) == len(names) and sorted(os.listdir(store.directory)) == sorted(names + ["state.pkl", "store.lock"])
+    assert sum(len(chunk) for chunk in store.chunks(["Age"])) == 1309 + 3 * 250
+
+def test_out_of_core_training_streams_ingested_chunks(monkeypatch):
+    monkeypatch.setattr(main, "INGEST_CHUNK_ROWS", 200)
+    features = ["Pclass", "Sex", "Age", "Fare", "Title"]
+
+    response = client.post("/api/train", json={
+        "model_name": "Out Of Core SGD", "algorithm": "sgd", "features": features, "out_of_core": True
+    })
+    assert response.status_code == 200
+    model_id = response.json()["model_id"]
+    try:
+        job = main.training_jobs[response.json()["job_id"]]
+        assert job["progress"]["pass"] == job["progress"]["passes"] == main.OUT_OF_CORE_EPOCHS + 2
+        assert job["progress"]["chunks_done"] == job["progress"]["chunks"] == 8
+        assert job["peak_memory_bytes"] is not None
+        assert main.model_metadata[model_id]["training"]["epochs"] == main.OUT_OF_CORE_EPOCHS
+        assert response.json()["accuracy"] > 0.7
+    finally:
+        client.delete(f"/api/models/{model_id}")
+
+def test_out_of_core_training_subsamples_within_budget(monkeypatch):
+    monkeypatch.setattr(main, "OUT_OF_CORE_MEMORY_MB", 0.01)
+    features = ["Pclass", "Sex", "Age", "Fare", "Title"]
+
+    response = client.post("/api/train", json={
+        "model_name": "Out Of Core Tree", "algorithm": "decision_tree", "features": features, "out_of_core": True
+    })
+    model_id = response.json()["model_id"]
+    try:
+        training = main.model_metadata[model_id]["training"]
+        budget_rows = int(0.01 * 1024 * 1024) // (8 * (len(features) + 1))
+        assert budget_rows - 2 <= training["sample_rows"] <= budget_rows < training["rows"]
+        assert response.json()["cv_accuracy"] is not None
+    finally:
+        client.delete(f"/api/models/{model_id}")
+
+def test_stratum_reservoir_is_uniform():
+    reservoir = main.StratumReservoir(capacity=100, width=1, seed=0)
+    for block in np.array_split(np.arange(10000, dtype=float)[:, None], 37):
+        reservoir.add(block)
+
+    rows = reservoir.rows()[:, 0]
+    assert reservoir.size == 100 and reservoir.seen == 10000 and len(np.unique(rows)) == 100
+    assert 3000 < rows.mean() < 7000
+
+def test_halving_schedule():
+    assert main.halving_schedule(27, 810, 3, min_rows=30) == [(30, 27), (90, 9), (270, 3), (810, 1)]
+    assert main.halving_schedule(16, 569, 3) == [(63, 16), (189, 6), (569, 2)]
+    # The first rung would fit fewer than min_rows rows, so the search starts one rung later
+    assert main.halving_schedule(27, 810, 3, min_rows=40) == [(90, 27), (270, 9), (810, 3)]
+    assert main.halving_schedule(1, 500, 3) == [(500, 1)]
+
+def test_tuning_job_registers_best_configuration(monkeypatch):
+    monkeypatch.setattr(main, "TUNING_WORKERS", 1)
+    response = client.post("/api/tune", json={
+        "model_name": "Tuned Tree",
+        "algorithm": "decision_tree",
+        "features": ["Pclass", "Sex", "Age", "Fare"],
+        "search_space": {"max_depth": [2, 3, 4, 5, None], "min_samples_leaf": [1, 5]}
+    })
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    deadline = time.time() + 120
+    while main.tuning_jobs[job_id]["status"] in ("queued", "running") and time.time() < deadline:
+        time.sleep(0.1)
+    job = client.get(f"/api/tune/{job_id}").json()
+    assert job["status"] == "completed"
+
+    model_id = job["model_id"]
+    try:
+        # 10 candidates, 3 rungs keeping a third of them each time, at a fraction of the full grid's cost
+        assert [len(rung["leaderboard"]) for rung in job["rungs"]] == [10, 4, 2]
+        assert job["rungs"][0]["rows"] < job["rungs"][-1]["rows"]
+        assert job["result"]["search"]["cost_ratio"] < 0.5
+        best = job["rungs"][-1]["leaderboard"][0]
+        assert job["result"]["params"] == best["params"]
+        assert main.models[model_id].get_params()["max_depth"] == best["params"]["max_depth"]
+        assert main.model_metadata[model_id]["training"]["params"] == best["params"]
+    finally:
+        client.delete(f"/api/models/{model_id}")
+
+def test_tuning_rejects_unknown_parameters():
+    response = client.post("/api/tune", json={
+        "model_name": "Bad Search", "algorithm": "svm", "features": ["Pclass", "Sex"],
+        "search_space": {"C": [0.1, 1], "depth": [3]}
+    })
+    assert response.status_code == 400
+
+    jobs = len(main.tuning_jobs.list())
+    for max_candidates in (0, -1):
+        response = client.post("/api/tune", json={
+            "model_name": "Bad Search", "algorithm": "svm", "features": ["Pclass", "Sex"],
+            "search_space": {"C": [0.1, 1]}, "max_candidates": max_candidates
+        })
+        assert response.status_code == 400 and "max_candidates" in response.json()["detail"]
+    assert len(main.tuning_jobs.list()) == jobs
@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from fastapi import Body
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Dict, Optional, Any
 import hashlib
 import secrets
@@ -13,6 +14,7 @@ import json
 from datetime import datetime, timedelta
 import logging
 import requests
+import asyncio
 import os
 
 # Configure logging
@@ -36,6 +38,11 @@ security = HTTPBearer(auto_error=False)
 # Model Backend URL
 MODEL_BACKEND_URL = os.getenv("MODEL_BACKEND_URL", "http://model-backend:5001")
 
+# How often to poll the Model Backend while waiting for a training job
+TRAINING_POLL_INTERVAL = float(os.getenv("TRAINING_POLL_INTERVAL", "1.0"))
+# How long to wait for a training job before handing its ID back to the client to poll
+TRAINING_TIMEOUT = float(os.getenv("TRAINING_TIMEOUT", "600"))
+
 
 # Data models
 class UserRegistration(BaseModel):
@@ -72,6 +79,11 @@ class PredictionRequest(BaseModel):
     model_names: List[str]
 
 
+class BatchPredictionRequest(BaseModel):
+    passengers: List[PassengerData]
+    model_names: List[str]
+
+
 class PredictionHistoryItem(BaseModel):
     id: int
     pclass: int
@@ -390,15 +402,80 @@ async def delete_model(model_id: str, admin_user: Dict = Depends(get_admin_user)
 async def train_model(request: TrainModelRequest, admin_user: Dict = Depends(get_admin_user)):
     """Train a new model (admin only)"""
     try:
-        response = requests.post(f"{MODEL_BACKEND_URL}/api/train", json=request.model_dump())
+        # Submit a training job and wait for it without blocking the event loop
+        response = await run_in_threadpool(
+            requests.post, f"{MODEL_BACKEND_URL}/api/train/jobs", json=request.model_dump()
+        )
         response.raise_for_status()
-        return response.json()
-
+        job_id = response.json()["job_id"]
+
+        deadline = asyncio.get_running_loop().time() + TRAINING_TIMEOUT
+        while True:
+            if asyncio.get_running_loop().time() >= deadline:
+                raise HTTPException(
+                    status_code=504,
+                    detail={"message": "Training is still running; poll the training job for its result",
+                            "job_id": job_id}
+                )
+            await asyncio.sleep(TRAINING_POLL_INTERVAL)
+            response = await run_in_threadpool(requests.get, f"{MODEL_BACKEND_URL}/api/train/jobs/{job_id}")
+            response.raise_for_status()
+            job = response.json()
+
+            if job["status"] == "completed":
+                return {**job["result"], "job_id": job_id}
+            if job["status"] == "failed":
+                raise RuntimeError(job["error"])
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error training model: {e}")
         raise HTTPException(status_code=500, detail="Error training model")
 
 
+@app.post("/api/models/train/jobs")
+async def create_training_job(request: TrainModelRequest, admin_user: Dict = Depends(get_admin_user)):
+    """Submit a training job and return its ID immediately (admin only)"""
+    try:
+        response = await run_in_threadpool(
+            requests.post, f"{MODEL_BACKEND_URL}/api/train/jobs", json=request.model_dump()
+        )
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logger.error(f"Error submitting training job: {e}")
+        raise HTTPException(status_code=500, detail="Error submitting training job")
+
+
+@app.get("/api/models/train/jobs")
+async def get_training_jobs(admin_user: Dict = Depends(get_admin_user)):
+    """List training jobs (admin only)"""
+    try:
+        response = await run_in_threadpool(requests.get, f"{MODEL_BACKEND_URL}/api/train/jobs")
+        response.raise_for_status()
+        return response.json()
+    except Exception as e:
+        logger.error(f"Error fetching training jobs: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching training jobs")
+
+
+@app.get("/api/models/train/jobs/{job_id}")
+async def get_training_job(job_id: str, admin_user: Dict = Depends(get_admin_user)):
+    """Get the status of a training job (admin only)"""
+    try:
+        response = await run_in_threadpool(requests.get, f"{MODEL_BACKEND_URL}/api/train/jobs/{job_id}")
+        if response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Training job not found")
+        response.raise_for_status()
+        return response.json()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching training job: {e}")
+        raise HTTPException(status_code=500, detail="Error fetching training job")
+
+
 @app.get("/api/features")
 async def get_features():
     """Get available features for training"""
@@ -423,6 +500,21 @@ def get_current_user_or_none(credentials: Optional[HTTPAuthorizationCredentials]
         return None
 
 
+def format_passenger_data(passenger: PassengerData) -> Dict[str, Any]:
+    """Fill in defaults for optional passenger fields before sending them to the Model Backend"""
+    return {
+        "pclass": passenger.pclass,
+        "sex": passenger.sex,
+        "age": passenger.age if passenger.age is not None else 30,
+        "sibsp": passenger.sibsp,
+        "parch": passenger.parch,
+        "fare": passenger.fare,
+        "embarked": passenger.embarked or "S",
+        "title": passenger.title or "Mr",
+        "cabin_letter": passenger.cabin_letter or "U"
+    }
+
+
 @app.post("/api/predict")
 async def predict_survival(
         request: PredictionRequest = Body(...),
@@ -461,17 +553,7 @@ async def predict_survival(
                 logger.warning(f"Couldn't verify model restrictions: {str(e)}")
 
         # Ensure passenger data is properly formatted
-        passenger_data = {
-            "pclass": request.passenger.pclass,
-            "sex": request.passenger.sex,
-            "age": request.passenger.age if request.passenger.age is not None else 30,
-            "sibsp": request.passenger.sibsp,
-            "parch": request.passenger.parch,
-            "fare": request.passenger.fare,
-            "embarked": request.passenger.embarked or "S",
-            "title": request.passenger.title or "Mr",
-            "cabin_letter": request.passenger.cabin_letter or "U"
-        }
+        passenger_data = format_passenger_data(request.passenger)
 
         # Send data to model backend
         logger.info(f"Sending prediction request with data: {passenger_data}")
@@ -522,6 +604,26 @@ async def predict_survival(
         raise HTTPException(status_code=500, detail=f"Error making prediction: {str(e)}")
 
 
+@app.post("/api/predict/batch")
+async def predict_survival_batch(request: BatchPredictionRequest, current_user: Dict = Depends(get_current_user)):
+    """Make survival predictions for many passengers in one call (not saved to history)"""
+    try:
+        response = await run_in_threadpool(requests.post, f"{MODEL_BACKEND_URL}/api/predict/batch", json={
+            "passengers": [format_passenger_data(passenger) for passenger in request.passengers],
+            "model_names": request.model_names
+        })
+        if response.status_code == 400:
+            raise HTTPException(status_code=400, detail=response.json().get("detail", "Invalid batch request"))
+        response.raise_for_status()
+        return response.json()
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error making batch prediction: {e}")
+        raise HTTPException(status_code=500, detail=f"Error making batch prediction: {str(e)}")
+
+
 # Prediction history endpoints
 @app.get("/api/history", response_model=List[PredictionHistoryItem])
 async def get_prediction_history(current_user: Dict = Depends(get_current_user)):
@@ -111,7 +111,7 @@ import pytest
 import sqlite3
 from fastapi.testclient import TestClient
 from unittest.mock import patch
-from main import app, init_database, hash_password, get_current_user
+from main import app, init_database, hash_password, get_current_user, get_admin_user
 
 
 
@@ -209,3 +209,25 @@ def test_health_check():
     res = client.get("/health")
     assert res.status_code == 200
     assert res.json()["status"] == "healthy"
+
+
+@patch("main.requests.get")
+@patch("main.requests.post")
+def test_train_model_times_out_with_job_id(mock_post, mock_get, monkeypatch):
+    monkeypatch.setattr("main.TRAINING_TIMEOUT", 0.05)
+    monkeypatch.setattr("main.TRAINING_POLL_INTERVAL", 0.01)
+    mock_post.return_value.status_code = 202
+    mock_post.return_value.json.return_value = {"job_id": "job123", "status": "queued"}
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.json.return_value = {"id": "job123", "status": "running"}
+
+    app.dependency_overrides[get_admin_user] = lambda: {"id": 1, "email": "admin@example.com", "is_admin": True}
+    try:
+        res = client.post("/api/models/train", json={
+            "model_name": "Slow", "algorithm": "random_forest", "features": ["Age"]
+        })
+    finally:
+        app.dependency_overrides.pop(get_admin_user)
+
+    assert res.status_code == 504
+    assert res.json()["detail"]["job_id"] == "job123"